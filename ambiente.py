@@ -0,0 +1,187 @@
+import contextlib
+import io
+
+import numpy as np
+
+import config as cfg
+from caminhos import DIRECOES
+from mapa import Mapa
+from simulacao import JOGANDO, Simulacao
+
+try:
+    import pygame
+except ImportError:  # Sem pygame só a observação em canais está disponível
+    pygame = None
+
+# Canais da observação
+PAREDES = 0
+PONTOS = 1
+POWERUPS = 2
+PACMAN = 3
+FANTASMAS = 4
+ASSUSTADOS = 5
+NUM_CANAIS = 6
+
+# Ações: os índices de DIRECOES (Cima, Baixo, Esquerda, Direita) ou NADA
+NADA = 4
+ACOES = list(DIRECOES) + [None]
+
+PENALIDADE_MORTE = 500  # Descontada da recompensa a cada vida perdida
+MAX_TICKS = 5 * 60 * 60  # Partidas mais longas que isso são cortadas
+
+# Cor de cada tile na observação em pixels, do fundo para a frente
+PALETA = np.array(
+    [cfg.PRETO, cfg.AZUL, cfg.BRANCO, cfg.BRANCO, cfg.VERMELHO, cfg.AZUL, cfg.AMARELO],
+    dtype=np.uint8,
+)
+ORDEM_PINTURA = (PAREDES, PONTOS, POWERUPS, FANTASMAS, ASSUSTADOS, PACMAN)
+
+
+# Ambiente no estilo Gym em volta de Simulacao, para treinar e avaliar bots.
+#
+# A observação é um array (NUM_CANAIS, lin, col) de 0/1 alocado uma vez só.
+# self.canais[c] são visões sobre ele e step() devolve sempre o mesmo array,
+# então quem for guardar observações precisa copiá-las. Paredes e itens são
+# atualizados por um observador do mapa (só a célula que mudou); Pacman e
+# fantasmas são apagados e marcados de novo a cada tick.
+#
+# Com pixels=True, observarPixels() devolve uma visão (altura, largura, 3)
+# da superfície do pygame, sem cópia. Se 'tela' for dada (a tela do jogo),
+# a visão é dela; senão o ambiente pinta uma imagem simples dos canais, com
+# 'escala' pixels por tile.
+class AmbientePacman:
+    def __init__(
+        self,
+        arquivo: str,
+        pixels: bool = False,
+        tela=None,
+        escala: int = 4,
+        maxTicks: int = MAX_TICKS,
+    ) -> None:
+        # As mensagens do mapa não interessam durante o treino
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.mapa = Mapa(arquivo)
+        self.nomeMapa = arquivo.replace("\\", "/").split("/")[-1]
+        self.maxTicks = maxTicks
+        self.sim = None
+
+        # Itens originais (índice -> caractere), para recomeçar sem ler o
+        # arquivo de novo
+        itens = self.mapa.itens
+        self.itensIniciais = dict.fromkeys(itens.pontos, ".")
+        self.itensIniciais.update(dict.fromkeys(itens.powerups, "0"))
+
+        lin, col = self.mapa.lin, self.mapa.col
+        self.observacao = np.zeros((NUM_CANAIS, lin, col), dtype=np.uint8)
+        self.canais = [self.observacao[c] for c in range(NUM_CANAIS)]
+        grade = np.frombuffer(bytes(self.mapa.grade), dtype=np.uint8)
+        self.canais[PAREDES][:] = (grade == ord("#")).reshape(lin, col)
+        for x, y in self.mapa.posicoesItens():
+            self._marcarCelula(x, y, self.mapa.conteudo(x, y))
+        self.mapa.adicionarObservador(self.aoAlterarMapa)
+        self.ocupadas = []  # (canal, y, x) marcados por entidades no último tick
+
+        self.tela = None
+        self.pixels = None
+        self.escala = escala
+        if pixels:
+            self._prepararPixels(tela)
+
+    def _prepararPixels(self, tela) -> None:
+        if pygame is None:
+            raise RuntimeError("A observação em pixels precisa do pygame")
+        self.desenharPixels = tela is None
+        if tela is None:
+            tela = pygame.Surface(
+                (self.mapa.col * self.escala, self.mapa.lin * self.escala), 0, 32
+            )
+        self.tela = tela
+        # pixels3d é (largura, altura, 3); a transposta é uma visão, não cópia
+        self.pixels = pygame.surfarray.pixels3d(tela).transpose(1, 0, 2)
+        if self.desenharPixels:
+            # A pintura usa a mesma memória como inteiros de 32 bits, vista como
+            # (lin, escala, col, escala): cada tile é pintado por broadcast
+            e = self.escala
+            inteiros = pygame.surfarray.pixels2d(tela).transpose(1, 0)
+            self.blocos = inteiros.reshape(self.mapa.lin, e, self.mapa.col, e)
+            self.paleta = np.array(
+                [tela.map_rgb(tuple(cor)) for cor in PALETA], dtype=inteiros.dtype
+            )
+
+    def _marcarCelula(self, x: int, y: int, char: str) -> None:
+        self.canais[PAREDES][y, x] = char == "#"
+        self.canais[PONTOS][y, x] = char == "."
+        self.canais[POWERUPS][y, x] = char == "0"
+
+    # Observador do mapa: só a célula alterada muda nos canais
+    def aoAlterarMapa(self, x: int, y: int, antigo: str, novo: str) -> None:
+        self._marcarCelula(x, y, novo)
+
+    # Recomeça a partida e retorna a primeira observação
+    def reset(self, seed: int = None) -> np.ndarray:
+        if self.sim:
+            self.sim.encerrar()
+
+        # Devolve os pontos comidos ao mapa (os canais acompanham pelo observador)
+        col = self.mapa.col
+        for i, char in self.itensIniciais.items():
+            if i not in self.mapa.itens:
+                self.mapa.atualizarConteudo(i % col, i // col, char)
+
+        self.sim = Simulacao(self.mapa, self.nomeMapa, semente=seed)
+        self._marcarEntidades()
+        return self.observacao
+
+    # Avança um tick. Retorna (observação, recompensa, fim, info)
+    def step(self, acao: int):
+        sim = self.sim
+        pontosAntes = sim.pacman.pontos
+        eventos = sim.step(ACOES[acao])
+        self._marcarEntidades()
+
+        mortes = sum(1 for e in eventos if e[0] == "morte")
+        recompensa = sim.pacman.pontos - pontosAntes - PENALIDADE_MORTE * mortes
+        fim = sim.estado != JOGANDO or sim.ticks >= self.maxTicks
+        info = {
+            "eventos": eventos,
+            "estado": sim.estado,
+            "pontos": sim.pacman.pontos,
+            "vidas": sim.pacman.vidas,
+            "ticks": sim.ticks,
+        }
+        return self.observacao, recompensa, fim, info
+
+    def _marcarEntidades(self) -> None:
+        for canal, y, x in self.ocupadas:
+            self.canais[canal][y, x] = 0
+        self.ocupadas.clear()
+
+        lin, col = self.mapa.lin, self.mapa.col
+        entidades = [(PACMAN, self.sim.pacman)]
+        for fantasma in self.sim.fantasmas:
+            entidades.append(
+                (ASSUSTADOS if fantasma.assustado else FANTASMAS, fantasma)
+            )
+        for canal, entidade in entidades:
+            x, y = entidade.getPosGrad()
+            if 0 <= x < col and 0 <= y < lin:
+                self.canais[canal][y, x] = 1
+                self.ocupadas.append((canal, y, x))
+
+    # Observação em pixels (altura, largura, 3), uma visão da superfície
+    def observarPixels(self) -> np.ndarray:
+        if self.pixels is None:
+            raise RuntimeError("Ambiente criado sem pixels=True")
+        if self.desenharPixels:
+            codigo = np.zeros((self.mapa.lin, self.mapa.col), dtype=np.uint8)
+            for cor, canal in enumerate(ORDEM_PINTURA, start=1):
+                codigo[self.canais[canal] == 1] = cor
+            self.blocos[:] = self.paleta[codigo][:, None, :, None]
+        return self.pixels
+
+    def close(self) -> None:
+        if self.sim:
+            self.sim.encerrar()
+        self.mapa.removerObservador(self.aoAlterarMapa)
+        self.pixels = None  # Libera a trava da superfície
+        self.blocos = None
@@ -0,0 +1,255 @@
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import salvamento
+from salvamento import ErroSave, Leitor
+from simulacao import Simulacao
+
+# Autosave contínuo em dois arquivos:
+#
+#   <base>.sav     foto completa da partida (o formato de salvamento.py)
+#   <base>.diario  registros pequenos, só acrescentados, do que mudou depois
+#                  da foto: itens comidos, mortes e fotos periódicas do
+#                  Pacman e dos fantasmas
+#
+# A cada COMPACTAR registros o diário é compactado numa foto nova. Para
+# recuperar, lê-se a foto e aplicam-se os registros em ordem, parando no
+# primeiro incompleto ou com checksum errado (a escrita que a queda cortou).
+# O primeiro registro do diário traz o CRC da foto que ele continua, então
+# um diário que sobrou de outra foto (queda no meio da compactação) é
+# ignorado.
+#
+# Na thread do jogo só se montam os bytes (registros e, na compactação, a
+# foto serializada); as escritas vão em ordem para uma thread própria, como
+# os saves manuais em salvamento.TrabalhadorArquivos.
+
+# Cabeçalho de cada registro: tipo, tamanho do conteúdo, CRC32 do conteúdo
+REGISTRO = struct.Struct("<BII")
+
+INICIO = 0  # CRC32 do arquivo da foto
+COMIDO = 1  # Tick, índice da célula, pontos do Pacman depois de comer
+MORTE = 2  # Tick, vidas restantes
+ENTIDADES = 3  # Tick, powerupAtivo, powerupTimer + salvamento.empacotarEntidades
+
+CONTEUDO_INICIO = struct.Struct("<I")
+CONTEUDO_COMIDO = struct.Struct("<IIi")
+CONTEUDO_MORTE = struct.Struct("<IB")
+CONTEUDO_TICK = struct.Struct("<IBi")
+
+# Eventos que mudam as entidades de uma vez (mortes voltam todos ao início,
+# o powerup assusta os fantasmas): o tick deles leva também uma foto das
+# entidades, sem esperar a periódica
+EVENTOS_ENTIDADES = ("morte", "powerup", "fantasma_comido")
+
+AMOSTRAS = 10000  # Ticks recentes guardados para o p99 do relatório
+
+
+def _registro(tipo: int, conteudo: bytes) -> bytes:
+    return REGISTRO.pack(tipo, len(conteudo), zlib.crc32(conteudo)) + conteudo
+
+
+class Autosave:
+    def __init__(
+        self, base: str, ticksEntidades: int = 60, compactar: int = 600
+    ) -> None:
+        self.caminhoFoto = base + salvamento.EXTENSAO
+        self.caminhoDiario = base + ".diario"
+        self.ticksEntidades = ticksEntidades  # Intervalo das fotos das entidades
+        self.compactar = compactar  # Registros até a próxima foto completa
+        self.ativo = False  # Se há uma partida sendo registrada
+        self.registros = 0  # Registros no diário desde a última foto
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self.arquivo = None  # Diário aberto para acrescentar (só na thread)
+
+        # Métricas (custo na thread do jogo)
+        self.ticks = 0
+        self.escritas = 0
+        self.tempoEscritaNs = 0
+        self.tempoMaximoNs = 0
+        self.amostras = deque(maxlen=AMOSTRAS)
+        self.compactacoes = 0
+
+    # Começa o autosave de uma partida: grava a foto e um diário vazio. Uma
+    # partida que o formato de save não guarda (paredes mudadas) fica sem
+    # autosave, e o antigo é apagado para não voltar numa recuperação
+    def iniciar(self, sim: Simulacao) -> None:
+        try:
+            foto = salvamento.serializar(sim)
+        except ErroSave as e:
+            print(f"Autosave desligado nesta partida: {e}")
+            self.descartar()
+            return
+        self._enviar(self._gravarFoto, foto)
+        self.ativo = True
+        self.registros = 0
+        self.compactacoes += 1
+
+    # Registra os eventos de um tick. Chamado depois de cada sim.step
+    def registrar(self, sim: Simulacao, eventos: list) -> None:
+        if not self.ativo:
+            return
+        inicio = time.perf_counter_ns()
+        self.ticks += 1
+        registros = []
+        for evento in eventos:
+            if evento[0] in ("ponto", "powerup"):
+                indice = sim.mapa.indice(evento[1], evento[2])
+                conteudo = CONTEUDO_COMIDO.pack(sim.ticks, indice, sim.pacman.pontos)
+                registros.append(_registro(COMIDO, conteudo))
+            elif evento[0] == "morte":
+                conteudo = CONTEUDO_MORTE.pack(sim.ticks, max(sim.pacman.vidas, 0))
+                registros.append(_registro(MORTE, conteudo))
+
+        fotografar = sim.ticks % self.ticksEntidades == 0
+        if fotografar or any(e[0] in EVENTOS_ENTIDADES for e in eventos):
+            partes = [CONTEUDO_TICK.pack(sim.ticks, sim.powerupAtivo, sim.powerupTimer)]
+            partes += salvamento.empacotarEntidades(sim)
+            registros.append(_registro(ENTIDADES, b"".join(partes)))
+
+        if registros:
+            self._escrever(sim, registros)
+        custo = time.perf_counter_ns() - inicio
+        self.tempoEscritaNs += custo
+        self.tempoMaximoNs = max(self.tempoMaximoNs, custo)
+        self.amostras.append(custo)
+
+    def _escrever(self, sim: Simulacao, registros: list) -> None:
+        if self.registros + len(registros) > self.compactar:
+            self.iniciar(sim)  # A foto nova já contém este tick
+        else:
+            self._enviar(self._acrescentar, b"".join(registros))
+            self.registros += len(registros)
+        self.escritas += 1
+
+    def _enviar(self, tarefa, *argumentos) -> Future:
+        futuro = self.executor.submit(tarefa, *argumentos)
+        futuro.add_done_callback(_avisarErro)
+        return futuro
+
+    # Na thread: troca a foto e começa um diário novo que a continua
+    def _gravarFoto(self, foto: bytes) -> None:
+        self._fecharArquivo()
+        pasta = os.path.dirname(self.caminhoFoto)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        salvamento.gravarAtomico(self.caminhoFoto, foto)
+        inicio = _registro(INICIO, CONTEUDO_INICIO.pack(zlib.crc32(foto)))
+        salvamento.gravarAtomico(self.caminhoDiario, inicio)
+        self.arquivo = open(self.caminhoDiario, "ab")
+
+    # Na thread: uma escrita por tick; flush entrega ao sistema operacional
+    def _acrescentar(self, registros: bytes) -> None:
+        if self.arquivo is not None:
+            self.arquivo.write(registros)
+            self.arquivo.flush()
+
+    def _fecharArquivo(self) -> None:
+        if self.arquivo is not None:
+            self.arquivo.close()
+            self.arquivo = None
+
+    def _remover(self) -> None:
+        self._fecharArquivo()
+        for caminho in (self.caminhoFoto, self.caminhoDiario):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+    # Espera as escritas pendentes
+    def esperar(self) -> None:
+        self.executor.submit(lambda: None).result()
+
+    # A partida acabou (ou foi abandonada): não há o que recuperar. Os
+    # arquivos são apagados na thread, depois das escritas pendentes
+    def descartar(self) -> None:
+        self.ativo = False
+        self._enviar(self._remover)
+
+    # Termina as escritas pendentes e fecha o diário, que fica no disco
+    def encerrar(self) -> None:
+        self.ativo = False
+        self.executor.submit(self._fecharArquivo)
+        self.executor.shutdown(wait=True)
+
+    def existe(self) -> bool:
+        return os.path.exists(self.caminhoFoto)
+
+    # Reconstrói os dados da partida (no formato de salvamento.desserializar)
+    # a partir da foto e do diário. Retorna também quantos registros valeram
+    def recuperar(self) -> tuple:
+        self.esperar()
+        with open(self.caminhoFoto, "rb") as arq:
+            foto = arq.read()
+        dados = salvamento.desserializar(foto)
+
+        try:
+            with open(self.caminhoDiario, "rb") as arq:
+                diario = arq.read()
+        except FileNotFoundError:
+            return dados, 0
+
+        aplicados = 0
+        for tipo, conteudo in _lerRegistros(diario):
+            if aplicados == 0:
+                # O diário precisa continuar exatamente esta foto
+                if tipo != INICIO or conteudo != CONTEUDO_INICIO.pack(zlib.crc32(foto)):
+                    break
+            else:
+                _aplicar(dados, tipo, conteudo)
+            aplicados += 1
+        return dados, max(aplicados - 1, 0)
+
+    # Custo na thread do jogo: média e máximo da partida, p99 dos últimos
+    # AMOSTRAS ticks
+    def relatorio(self) -> str:
+        media = self.tempoEscritaNs / max(self.ticks, 1) / 1000
+        amostras = sorted(self.amostras) or [0]
+        p99 = amostras[min(len(amostras) - 1, len(amostras) * 99 // 100)] / 1000
+        return (
+            f"Autosave: {self.ticks} ticks, {self.escritas} escritas, "
+            f"{self.compactacoes} fotos completas; por tick: média {media:.1f} us, "
+            f"p99 {p99:.1f} us, máximo {self.tempoMaximoNs / 1000:.1f} us"
+        )
+
+
+# Registros completos e íntegros do diário, em ordem
+def _lerRegistros(diario: bytes):
+    pos = 0
+    while pos + REGISTRO.size <= len(diario):
+        tipo, tamanho, crc = REGISTRO.unpack_from(diario, pos)
+        conteudo = diario[pos + REGISTRO.size : pos + REGISTRO.size + tamanho]
+        if len(conteudo) != tamanho or zlib.crc32(conteudo) != crc:
+            return  # Escrita cortada pela queda: o resto não vale
+        yield tipo, conteudo
+        pos += REGISTRO.size + tamanho
+
+
+def _aplicar(dados: dict, tipo: int, conteudo: bytes) -> None:
+    if tipo == COMIDO:
+        _, indice, pontos = CONTEUDO_COMIDO.unpack(conteudo)
+        dados["pontos"].discard(indice)
+        dados["powerups"].discard(indice)
+        dados["pacman"]["pontos"] = pontos
+    elif tipo == MORTE:
+        _, vidas = CONTEUDO_MORTE.unpack(conteudo)
+        dados["pacman"]["vidas"] = vidas
+    elif tipo == ENTIDADES:
+        leitor = Leitor(conteudo)
+        ticks, powerupAtivo, powerupTimer = leitor.ler(CONTEUDO_TICK)
+        dados["ticks"] = ticks
+        dados["powerupAtivo"] = bool(powerupAtivo)
+        dados["powerupTimer"] = powerupTimer
+        salvamento.lerEntidades(leitor, dados)
+    else:
+        raise ErroSave(f"Registro desconhecido no diário: {tipo}")
+
+
+# Erros de disco na thread não podem passar em silêncio
+def _avisarErro(futuro: Future) -> None:
+    erro = futuro.exception()
+    if erro is not None:
+        print(f"Erro no autosave: {erro}")
@@ -0,0 +1,2 @@
+# Medições de desempenho, fora dos módulos do jogo. Cada script roda a partir
+# da raiz do repositório, como módulo: python -m benchmarks.bench_<módulo>
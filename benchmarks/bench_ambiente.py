@@ -0,0 +1,33 @@
+import sys
+import time
+
+import numpy as np
+
+from ambiente import NADA, AmbientePacman
+
+# Mede a vazão do ambiente em steps por segundo, com ações aleatórias
+# Uso: python -m benchmarks.bench_ambiente [fase] [steps] [--pixels]
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    arquivo = argumentos[0] if argumentos else "fases/fase3.txt"
+    total = int(argumentos[1]) if len(argumentos) > 1 else 20000
+    comPixels = "--pixels" in sys.argv
+
+    ambiente = AmbientePacman(arquivo, pixels=comPixels)
+    sorteio = np.random.default_rng(0)
+    ambiente.reset(seed=0)
+    partidas = 1
+    inicio = time.perf_counter()
+    for i in range(total):
+        acao = int(sorteio.integers(0, 4)) if i % 20 == 0 else NADA
+        _, _, fim, _ = ambiente.step(acao)
+        if comPixels:
+            ambiente.observarPixels()
+        if fim:
+            ambiente.reset(seed=i)
+            partidas += 1
+    duracao = time.perf_counter() - inicio
+    ambiente.close()
+
+    print(f"{total} steps ({partidas} partidas) em {duracao:.2f} s")
+    print(f"Vazão: {total / duracao:,.0f} steps por segundo")
@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+
+from autosave import Autosave
+from simulacao import Simulacao
+
+# Mede o custo por tick do autosave numa partida simulada (média, p99 e
+# máximo na thread do jogo), numa pasta temporária
+# Uso: python -m benchmarks.bench_autosave [fase] [ticks]
+if __name__ == "__main__":
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else "fases/fase3.txt"
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    sim = Simulacao.deArquivo(arquivo, semente=0)
+    with tempfile.TemporaryDirectory() as pasta:
+        autosave = Autosave(os.path.join(pasta, "bench_autosave"))
+        autosave.iniciar(sim)
+        for tick in range(total):
+            eventos = sim.step((1, 0) if tick % 40 < 20 else (0, 1))
+            autosave.registrar(sim, eventos)
+            if sim.estado != "jogando":
+                break
+        print(autosave.relatorio())
+        dados, aplicados = autosave.recuperar()
+        print(f"Recuperado no tick {dados['ticks']} com {aplicados} registros")
+        autosave.descartar()
+        autosave.encerrar()
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+import time
+
+import salvamento
+from catalogo import Catalogo
+from simulacao import Simulacao
+
+# Mede abrir o menu com muitos saves: índice em dia, índice refeito do zero
+# e, para comparar, carregar cada save inteiro. Os saves vão para uma pasta
+# temporária
+# Uso: python -m benchmarks.bench_catalogo [saves]
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sim = Simulacao.deArquivo("fases/fase3.txt", semente=0)
+    dados = salvamento.serializar(sim)
+    sim.encerrar()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for i in range(total):
+            caminho = os.path.join(pasta, f"slot{i:05}{salvamento.EXTENSAO}")
+            with open(caminho, "wb") as arq:
+                arq.write(dados)
+
+        inicio = time.perf_counter()
+        Catalogo(pasta).carregar()
+        print(f"{total} saves, índice refeito: {time.perf_counter() - inicio:.3f} s")
+
+        inicio = time.perf_counter()
+        catalogo = Catalogo(pasta).carregar()
+        catalogo.ordenados("pontos")
+        print(f"{total} saves, índice em dia: {time.perf_counter() - inicio:.3f} s")
+
+        inicio = time.perf_counter()
+        for slot in catalogo.slots:
+            salvamento.carregar(os.path.join(pasta, slot))
+        print(f"{total} saves, lendo cada um: {time.perf_counter() - inicio:.3f} s")
@@ -0,0 +1,69 @@
+import random
+import sys
+import time
+
+from colisoes import HashEspacial
+from entidades import Retangulo
+
+# Compara a fase larga com o teste de todos contra o Pacman, com n fantasmas
+# espalhados num mapa que cresce junto (densidade constante)
+# Uso: python -m benchmarks.bench_colisoes [fantasmas] [ticks]
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    tile = 32
+    lado = max(8, int((total * 4) ** 0.5)) * tile
+    sorteio = random.Random(0)
+    rects = [
+        Retangulo(sorteio.randrange(lado), sorteio.randrange(lado), tile, tile)
+        for _ in range(total)
+    ]
+    pacman = Retangulo(lado // 2, lado // 2, tile, tile)
+
+    def andar():
+        for rect in rects:
+            rect.x = (rect.x + sorteio.choice((-2, 0, 2))) % lado
+            rect.y = (rect.y + sorteio.choice((-2, 0, 2))) % lado
+
+    def forcaBruta():
+        hitbox = pacman.inflate(-10, -10)
+        return [
+            i for i, r in enumerate(rects) if hitbox.colliderect(r.inflate(-10, -10))
+        ]
+
+    espacial = HashEspacial(tile)
+
+    def comHash():
+        for i, rect in enumerate(rects):
+            espacial.atualizar(i, rect)
+        hitbox = pacman.inflate(-10, -10)
+        return [
+            i
+            for i in espacial.consultar(pacman)
+            if hitbox.colliderect(rects[i].inflate(-10, -10))
+        ]
+
+    # Só a consulta (o custo que cresce com o total na força bruta)
+    def consultaHash():
+        hitbox = pacman.inflate(-10, -10)
+        return [
+            i
+            for i in espacial.consultar(pacman)
+            if hitbox.colliderect(rects[i].inflate(-10, -10))
+        ]
+
+    tempos = {forcaBruta: 0.0, comHash: 0.0, consultaHash: 0.0}
+    for _ in range(ticks):
+        andar()
+        pacman.x = sorteio.randrange(lado)
+        pacman.y = sorteio.randrange(lado)
+        resultados = []
+        for funcao in tempos:
+            inicio = time.perf_counter()
+            resultados.append(funcao())
+            tempos[funcao] += time.perf_counter() - inicio
+        assert resultados[0] == resultados[1] == resultados[2]
+
+    print(f"{total} fantasmas, {ticks} ticks")
+    for funcao, duracao in tempos.items():
+        print(f"{funcao.__name__}: {duracao / ticks * 1e6:.1f} us por tick")
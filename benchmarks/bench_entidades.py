@@ -0,0 +1,50 @@
+import sys
+import time
+import tracemalloc
+
+from caminhos import CampoDistancia
+from entidades import ArmazemFantasmas, Fantasma, np
+from mapa import Mapa
+
+# Mede a memória por fantasma no armazém e o tempo de update de 1000
+# fantasmas, em lote e um a um pelas fachadas
+# Uso: python -m benchmarks.bench_entidades [fase] [fantasmas] [ticks]
+if __name__ == "__main__":
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else "fases/fase3.txt"
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    ticks = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+    mapa = Mapa(arquivo)
+    inicios = mapa.posicaoInicialFantasmas or [(1, 1)]
+
+    def criar() -> ArmazemFantasmas:
+        loja = ArmazemFantasmas()
+        for i in range(total):
+            fantasma = Fantasma(*inicios[i % len(inicios)], loja=loja)
+            fantasma.tempoPreso = 0
+        return loja
+
+    tracemalloc.start()
+    loja = criar()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    campo = CampoDistancia(mapa)
+    campo.atualizar(*(mapa.posicaoInicialPacman or (1, 1)))
+
+    inicio = time.perf_counter()
+    for _ in range(ticks):
+        loja.update(mapa, campo)
+    emLote = time.perf_counter() - inicio
+
+    loja = criar()
+    inicio = time.perf_counter()
+    for _ in range(ticks):
+        for fantasma in loja.fantasmas:
+            fantasma.update(mapa, campo)
+    umAUm = time.perf_counter() - inicio
+
+    por1000 = 1000 / total / ticks * 1e3
+    print(f"{total} fantasmas, {ticks} ticks (NumPy: {np is not None})")
+    print(f"Memória por fantasma: {memoria / total:.0f} bytes")
+    print(f"Update de 1000 fantasmas: em lote {emLote * por1000:.2f} ms, ", end="")
+    print(f"um a um {umAUm * por1000:.2f} ms")
@@ -0,0 +1,28 @@
+import sys
+import time
+
+import numpy as np
+
+from lote import JOGANDO, SimulacaoLote
+
+# Mede a vazão do lote em ticks de partida por segundo, com entradas aleatórias
+# Uso: python -m benchmarks.bench_lote [fase] [partidas] [ticks]
+if __name__ == "__main__":
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else "fases/fase3.txt"
+    partidas = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    ticks = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    lote = SimulacaoLote.deArquivo(arquivo, partidas, semente=0)
+    sorteio = np.random.default_rng(0)
+    total = 0
+    inicio = time.perf_counter()
+    for i in range(ticks):
+        entradas = None
+        if i % 20 == 0:
+            entradas = sorteio.integers(0, 4, partidas)
+        total += lote.step(entradas)
+        lote.reiniciar(lote.estado != JOGANDO)
+    duracao = time.perf_counter() - inicio
+
+    print(f"{partidas} partidas x {ticks} ticks em {duracao:.2f} s")
+    print(f"Vazão: {total / duracao:,.0f} ticks de partida por segundo")
@@ -0,0 +1,68 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from mapa import Mapa
+
+# Compara a grade plana com a lista de listas de caracteres usada antes, em
+# memória e em velocidade de consulta, num mapa sintético de lado x lado
+# Uso: python -m benchmarks.bench_mapa [lado] [consultas]
+if __name__ == "__main__":
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    sorteio = random.Random(0)
+    linhas = []
+    for y in range(lado):
+        borda = y == 0 or y == lado - 1
+        linhas.append(
+            [
+                "#" if borda or x in (0, lado - 1) or sorteio.random() < 0.3 else "."
+                for x in range(lado)
+            ]
+        )
+    celulas = [
+        (sorteio.randrange(lado), sorteio.randrange(lado)) for _ in range(consultas)
+    ]
+
+    # Lista de listas (como era): passagem e vizinhos lidos caractere a caractere
+    tracemalloc.start()
+    matriz = [linha[:] for linha in linhas]
+    memoriaMatriz = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def podeMoverMatriz(x, y):
+        if x < 0 or x >= lado or y < 0 or y >= lado:
+            return False
+        return matriz[y][x] != "#"
+
+    def vizinhosMatriz(x, y):
+        if matriz[y][x] == "#":
+            return []
+        candidatos = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
+        return [(nx, ny) for nx, ny in candidatos if matriz[ny][nx] != "#"]
+
+    # Grade plana com máscara de saídas (sem montar a tabela de caminhos)
+    mapa = Mapa.__new__(Mapa)
+    mapa.lin, mapa.col, mapa._visao = lado, lado, None
+    tracemalloc.start()
+    mapa._montarGrade(linhas)
+    memoriaGrade = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def medir(funcao):
+        inicio = time.perf_counter()
+        for x, y in celulas:
+            funcao(x, y)
+        return (time.perf_counter() - inicio) / consultas * 1e9
+
+    visao = mapa.matriz
+    print(f"Mapa {lado} x {lado}, {consultas} consultas aleatórias")
+    print(f"Memória: lista de listas {memoriaMatriz / 2**20:.1f} MiB, ", end="")
+    print(f"grade + saídas {memoriaGrade / 2**20:.1f} MiB")
+    print(f"podeMover: lista {medir(podeMoverMatriz):.0f} ns, ", end="")
+    print(f"grade {medir(mapa.passavel):.0f} ns")
+    print(f"vizinhos: lista {medir(vizinhosMatriz):.0f} ns, ", end="")
+    print(f"saídas {medir(mapa.vizinhos):.0f} ns")
+    print(f"matriz[y][x]: lista {medir(lambda x, y: matriz[y][x]):.0f} ns, ", end="")
+    print(f"visão {medir(lambda x, y: visao[y][x]):.0f} ns")
@@ -0,0 +1,52 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from placar import Placar
+
+# Enche um placar de teste, numa pasta temporária, e mede gravação, top-K e
+# posição
+# Uso: python -m benchmarks.bench_placar [partidas]
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as pasta:
+        placar = Placar(os.path.join(pasta, "placar_bench.db"))
+        sorteio = random.Random(0)
+        mapas = [f"fase{i}.txt" for i in range(1, 4)]
+
+        inicio = time.perf_counter()
+        for lote in range(0, total, 100000):
+            partidas = [
+                (f"J{sorteio.randrange(1000)}", sorteio.randrange(0, 5000, 10), m, 0.0)
+                for m in sorteio.choices(mapas, k=min(100000, total - lote))
+            ]
+            placar.registrarVarias(partidas)
+        placar.executor.submit(lambda: None).result()
+        print(f"{total} partidas gravadas em {time.perf_counter() - inicio:.1f} s")
+
+        inicio = time.perf_counter_ns()
+        placar.registrar("Teste", 2500, "fase1.txt")
+        print(
+            f"registrar (sem esperar): {(time.perf_counter_ns() - inicio) / 1000:.0f} us"
+        )
+        inicio = time.perf_counter_ns()
+        placar.registrar("Teste", 2500, "fase1.txt").result()
+        print(
+            f"registrar (até o disco): {(time.perf_counter_ns() - inicio) / 1000:.0f} us"
+        )
+
+        for descricao, funcao in (
+            ("top 10 geral", lambda: placar.topo(10)),
+            ("top 10 fase2", lambda: placar.topo(10, mapa="fase2.txt")),
+            ("página 1000 fase2", lambda: placar.topo(10, 10000, "fase2.txt")),
+            ("posição geral", lambda: placar.posicao(2500)),
+            ("posição fase1", lambda: placar.posicao(2500, "fase1.txt")),
+            ("total geral", lambda: placar.total()),
+        ):
+            inicio = time.perf_counter_ns()
+            funcao()
+            print(f"{descricao}: {(time.perf_counter_ns() - inicio) / 1000:.0f} us")
+
+        placar.encerrar()
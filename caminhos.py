@@ -0,0 +1,658 @@
+import array
+import heapq
+import os
+import struct
+from collections import OrderedDict, deque
+
+import config as cfg
+
+# Valor usado para células inalcançáveis na tabela de distâncias
+INFINITO = 0xFFFF
+# Valor usado quando não existe próximo passo (alvo inalcançável ou já no alvo)
+SEM_PASSO = 255
+
+# Direções na mesma ordem do BFS original: Cima, Baixo, Esquerda, Direita
+DIRECOES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Um plano de CampoDistancia.planejar tem no máximo 'passos' * este fator células
+FATOR_LIMITE_PLANO = 4
+
+# Cabeçalho do arquivo de cache: assinatura, versão do formato, linhas, colunas
+_CABECALHO = struct.Struct("<4sHII")
+_ASSINATURA = b"PCAM"
+_VERSAO_CACHE = 1
+
+
+# Tabela de próximos passos e distâncias entre todas as células do mapa.
+# Cada "linha" da tabela é uma árvore de BFS enraizada no destino: para cada
+# origem ela guarda a distância até o destino e a direção do primeiro passo.
+# Em mapas grandes demais para a tabela completa, guarda apenas as árvores
+# usadas recentemente (LRU) e calcula as demais sob demanda.
+class TabelaCaminhos:
+    def __init__(self, mapa, chaveCache: str = None) -> None:
+        self.lin = mapa.lin
+        self.col = mapa.col
+        self.n = self.lin * self.col
+
+        # Grade plana de passagem (1 = livre, 0 = parede ou fora da linha)
+        self.livre = mapa.mascaraLivre()
+
+        # Tabela completa (n x n) ou None quando o mapa é grande demais
+        self.distancias = None
+        self.passos = None
+
+        # Cache LRU de árvores de BFS para o modo sem tabela completa
+        self.arvores = OrderedDict()
+        self.capacidadeLRU = cfg.CAPACIDADE_LRU_CAMINHOS
+
+        self.completa = self.n <= cfg.LIMITE_TABELA_CAMINHOS
+        if self.completa:
+            caminhoCache = self._caminhoCache(chaveCache)
+            if not self._lerCache(caminhoCache):
+                self._construirTabela()
+                self._gravarCache(caminhoCache)
+
+    # Converte (x, y) em índice da grade plana
+    def indice(self, x: int, y: int) -> int:
+        return y * self.col + x
+
+    # Verifica se a célula (x, y) está dentro do mapa e não é parede
+    def passavel(self, x: int, y: int) -> bool:
+        if x < 0 or x >= self.col or y < 0 or y >= self.lin:
+            return False
+        return self.livre[y * self.col + x] == 1
+
+    # BFS a partir do destino preenchendo distância e direção do primeiro passo
+    # de cada origem. Como o grafo é não direcionado, o pai de uma célula na
+    # árvore é justamente o próximo passo dela em direção ao destino.
+    def _bfs(self, destino: int, dist, passo, base: int = 0) -> None:
+        col = self.col
+        livre = self.livre
+        dist[base + destino] = 0
+        fila = deque([destino])
+
+        while fila:
+            atual = fila.popleft()
+            cx = atual % col
+            dAtual = dist[base + atual] + 1
+
+            for d, (dx, dy) in enumerate(DIRECOES):
+                nx = cx + dx
+                if nx < 0 or nx >= col:
+                    continue
+                viz = atual + dy * col + dx
+                if viz < 0 or viz >= self.n or not livre[viz]:
+                    continue
+                if dist[base + viz] != INFINITO:
+                    continue
+                dist[base + viz] = dAtual
+                # O vizinho anda na direção oposta a d para chegar em 'atual'
+                passo[base + viz] = d ^ 1
+                fila.append(viz)
+
+    # Constrói a tabela completa com um BFS por célula livre
+    def _construirTabela(self) -> None:
+        n = self.n
+        self.distancias = array.array("H", [INFINITO]) * (n * n)
+        self.passos = bytearray([SEM_PASSO]) * (n * n)
+        for destino in range(n):
+            if self.livre[destino]:
+                self._bfs(destino, self.distancias, self.passos, destino * n)
+
+    # Retorna (distâncias, passos) da árvore enraizada no destino
+    def arvore(self, destino: int):
+        if self.completa:
+            inicio = destino * self.n
+            fim = inicio + self.n
+            return (
+                memoryview(self.distancias)[inicio:fim],
+                memoryview(self.passos)[inicio:fim],
+            )
+
+        if destino in self.arvores:
+            self.arvores.move_to_end(destino)
+            return self.arvores[destino]
+
+        dist = array.array("H", [INFINITO]) * self.n
+        passo = bytearray([SEM_PASSO]) * self.n
+        if self.livre[destino]:
+            self._bfs(destino, dist, passo)
+
+        self.arvores[destino] = (dist, passo)
+        if len(self.arvores) > self.capacidadeLRU:
+            self.arvores.popitem(last=False)  # Descarta a menos usada
+        return dist, passo
+
+    # Distância em passos entre duas células ou None se não houver caminho
+    def distancia(self, origem: tuple, destino: tuple):
+        if not self.passavel(*origem) or not self.passavel(*destino):
+            return None
+        dist, _ = self.arvore(self.indice(*destino))
+        valor = dist[self.indice(*origem)]
+        return None if valor == INFINITO else valor
+
+    # Próxima célula no caminho mais curto da origem até o destino
+    def proximoPasso(self, origem: tuple, destino: tuple):
+        if origem == destino:
+            return None
+        if not self.passavel(*origem) or not self.passavel(*destino):
+            return None
+
+        _, passo = self.arvore(self.indice(*destino))
+        d = passo[self.indice(*origem)]
+        if d == SEM_PASSO:
+            return None
+
+        dx, dy = DIRECOES[d]
+        return origem[0] + dx, origem[1] + dy
+
+    # --- REPARO INCREMENTAL ---
+
+    # Observador do mapa: mantém a tabela válida quando uma parede surge ou some.
+    # Só as células cujo caminho muda são recalculadas em cada árvore.
+    def aoAlterarMapa(self, x: int, y: int, antigo: str, novo: str) -> None:
+        livreAntes = antigo != "#"
+        livreDepois = novo != "#"
+        if livreAntes == livreDepois:
+            return  # Pontos e power-ups não mudam os caminhos
+
+        celula = self.indice(x, y)
+        self.livre[celula] = 1 if livreDepois else 0
+
+        if self.completa:
+            n = self.n
+            for destino in range(n):
+                if destino == celula or not self.livre[destino]:
+                    continue
+                self._repararArvore(self.distancias, self.passos, destino * n, celula)
+            self._refazerArvore(self.distancias, self.passos, celula * n, celula)
+        else:
+            # A árvore da própria célula alterada é descartada e refeita sob demanda
+            self.arvores.pop(celula, None)
+            for dist, passo in self.arvores.values():
+                self._repararArvore(dist, passo, 0, celula)
+
+    # Recria do zero a árvore enraizada em 'destino'
+    def _refazerArvore(self, dist, passo, base: int, destino: int) -> None:
+        dist[base : base + self.n] = array.array("H", [INFINITO]) * self.n
+        passo[base : base + self.n] = bytearray([SEM_PASSO]) * self.n
+        if self.livre[destino]:
+            self._bfs(destino, dist, passo, base)
+
+    # Vizinhos livres de uma célula como (direção, índice)
+    def _vizinhosLivres(self, celula: int):
+        col = self.col
+        cx = celula % col
+        for d, (dx, dy) in enumerate(DIRECOES):
+            nx = cx + dx
+            if nx < 0 or nx >= col:
+                continue
+            viz = celula + dy * col + dx
+            if 0 <= viz < self.n and self.livre[viz]:
+                yield d, viz
+
+    def _repararArvore(self, dist, passo, base: int, celula: int) -> None:
+        if self.livre[celula]:
+            self._repararAbertura(dist, passo, base, celula)
+        else:
+            self._repararFechamento(dist, passo, base, celula)
+
+    # Parede removida: as distâncias só podem diminuir, e apenas a partir da
+    # célula aberta. Um BFS que só avança onde houver melhora basta.
+    def _repararAbertura(self, dist, passo, base: int, celula: int) -> None:
+        melhor = INFINITO
+        for d, viz in self._vizinhosLivres(celula):
+            if dist[base + viz] + 1 < melhor:
+                melhor = dist[base + viz] + 1
+                passo[base + celula] = d
+        if melhor >= INFINITO:
+            return  # Continua isolada desse destino
+        dist[base + celula] = melhor
+
+        fila = deque([celula])
+        while fila:
+            atual = fila.popleft()
+            dNovo = dist[base + atual] + 1
+            for d, viz in self._vizinhosLivres(atual):
+                if dNovo < dist[base + viz]:
+                    dist[base + viz] = dNovo
+                    passo[base + viz] = d ^ 1
+                    fila.append(viz)
+
+    # Parede adicionada: só as células cujo caminho passava pela célula
+    # fechada (a subárvore dela) perdem a distância. Elas são recalculadas a
+    # partir da fronteira com o resto da árvore, que continua válido.
+    def _repararFechamento(self, dist, passo, base: int, celula: int) -> None:
+        if dist[base + celula] == INFINITO:
+            return  # A célula não fazia parte de nenhum caminho até o destino
+
+        # Coleta a subárvore: vizinhos cujo próximo passo cai na célula atual
+        afetadas = [celula]
+        pilha = [celula]
+        col = self.col
+        while pilha:
+            atual = pilha.pop()
+            for _, viz in self._vizinhosLivres(atual):
+                d = passo[base + viz]
+                if d == SEM_PASSO:
+                    continue
+                dx, dy = DIRECOES[d]
+                if viz + dy * col + dx == atual:
+                    afetadas.append(viz)
+                    pilha.append(viz)
+
+        for a in afetadas:
+            dist[base + a] = INFINITO
+            passo[base + a] = SEM_PASSO
+
+        # Semeia pela fronteira e propaga em ordem de distância
+        heap = []
+        for a in afetadas[1:]:
+            for d, viz in self._vizinhosLivres(a):
+                dViz = dist[base + viz]
+                if dViz + 1 < dist[base + a]:
+                    dist[base + a] = dViz + 1
+                    passo[base + a] = d
+            if dist[base + a] != INFINITO:
+                heapq.heappush(heap, (dist[base + a], a))
+
+        while heap:
+            dAtual, atual = heapq.heappop(heap)
+            if dAtual != dist[base + atual]:
+                continue  # Entrada obsoleta
+            for d, viz in self._vizinhosLivres(atual):
+                if dAtual + 1 < dist[base + viz]:
+                    dist[base + viz] = dAtual + 1
+                    passo[base + viz] = d ^ 1
+                    heapq.heappush(heap, (dAtual + 1, viz))
+
+    # --- CACHE EM DISCO ---
+
+    def _caminhoCache(self, chave: str):
+        if not chave:
+            return None
+        return os.path.join(cfg.DIRETORIO_CACHE, f"caminhos_{chave[:32]}.bin")
+
+    def _lerCache(self, caminho: str) -> bool:
+        if not caminho or not os.path.exists(caminho):
+            return False
+
+        tamanho = self.n * self.n
+        try:
+            with open(caminho, "rb") as arq:
+                cabecalho = arq.read(_CABECALHO.size)
+                assinatura, versao, lin, col = _CABECALHO.unpack(cabecalho)
+                if (
+                    assinatura != _ASSINATURA
+                    or versao != _VERSAO_CACHE
+                    or (lin, col) != (self.lin, self.col)
+                ):
+                    return False
+
+                distancias = array.array("H")
+                distancias.fromfile(arq, tamanho)
+                passos = bytearray(arq.read(tamanho))
+                if len(passos) != tamanho:
+                    return False
+        except (OSError, EOFError, struct.error) as e:
+            print(f"Cache de caminhos inválido, reconstruindo: {e}")
+            return False
+
+        self.distancias = distancias
+        self.passos = passos
+        return True
+
+    def _gravarCache(self, caminho: str) -> None:
+        if not caminho:
+            return
+        try:
+            os.makedirs(cfg.DIRETORIO_CACHE, exist_ok=True)
+            temporario = caminho + ".tmp"
+            with open(temporario, "wb") as arq:
+                arq.write(
+                    _CABECALHO.pack(_ASSINATURA, _VERSAO_CACHE, self.lin, self.col)
+                )
+                self.distancias.tofile(arq)
+                arq.write(self.passos)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            print(f"Não foi possível gravar o cache de caminhos: {e}")
+
+
+# Corredor entre duas junções do grafo comprimido
+class Aresta:
+    def __init__(self, a: int, da: int, b: int, db: int, celulas: list) -> None:
+        self.a = a  # Junção de um extremo
+        self.da = da  # Direção de saída de 'a' para dentro do corredor
+        self.b = b  # Junção do outro extremo
+        self.db = db  # Direção de saída de 'b' para dentro do corredor
+        self.celulas = celulas  # Células internas, na ordem de 'a' para 'b'
+        self.comprimento = len(celulas) + 1
+
+    # Junção alcançada ao sair de 'no' pela direção 'd'
+    def outroExtremo(self, no: int, d: int) -> int:
+        if no == self.a and d == self.da:
+            return self.b
+        return self.a
+
+
+# Grafo comprimido do labirinto: os nós são as junções (células com número de
+# saídas diferente de 2) e as arestas são os corredores entre elas. Num
+# corredor o fantasma só tem um caminho para frente, então ele só precisa
+# decidir alguma coisa ao chegar numa junção.
+class GrafoJuncoes:
+    def __init__(self, caminhos: TabelaCaminhos) -> None:
+        self.caminhos = caminhos
+        self.nos = set()  # Índices das células que são junções
+        self.arestas = {}  # id -> Aresta
+        self.saidas = {}  # (junção, direção) -> id da aresta
+        self.posicao = {}  # Célula interna -> (id da aresta, distância até 'a')
+        self.proximoId = 0
+
+        self._construir()
+
+    def _grau(self, celula: int) -> int:
+        return sum(1 for _ in self.caminhos._vizinhosLivres(celula))
+
+    def _ehJuncao(self, celula: int) -> bool:
+        return self.caminhos.livre[celula] == 1 and self._grau(celula) != 2
+
+    def _construir(self) -> None:
+        livre = self.caminhos.livre
+        for celula in range(self.caminhos.n):
+            if self._ehJuncao(celula):
+                self.nos.add(celula)
+
+        for no in list(self.nos):
+            self._tracarSaidas(no)
+
+        # Ciclos sem nenhuma junção: uma célula qualquer vira nó
+        for celula in range(self.caminhos.n):
+            if livre[celula] and celula not in self.nos and celula not in self.posicao:
+                self.nos.add(celula)
+                self._tracarSaidas(celula)
+
+    # Percorre cada saída ainda sem aresta da junção até a próxima junção
+    def _tracarSaidas(self, no: int) -> None:
+        for d, _ in self.caminhos._vizinhosLivres(no):
+            if (no, d) not in self.saidas:
+                self._tracar(no, d)
+
+    def _tracar(self, no: int, d: int) -> None:
+        col = self.caminhos.col
+        celulas = []
+        direcao = d
+        dx, dy = DIRECOES[d]
+        atual = no + dy * col + dx
+
+        while atual not in self.nos:
+            celulas.append(atual)
+            # Segue pela única saída que não é a de volta
+            for d2, viz in self.caminhos._vizinhosLivres(atual):
+                if d2 != direcao ^ 1:
+                    direcao = d2
+                    atual = viz
+                    break
+
+        aresta = Aresta(no, d, atual, direcao ^ 1, celulas)
+        idAresta = self.proximoId
+        self.proximoId += 1
+
+        self.arestas[idAresta] = aresta
+        self.saidas[(no, d)] = idAresta
+        self.saidas[(atual, direcao ^ 1)] = idAresta
+        for i, celula in enumerate(celulas):
+            self.posicao[celula] = (idAresta, i + 1)
+
+    def _removerAresta(self, idAresta: int) -> Aresta:
+        aresta = self.arestas.pop(idAresta)
+        self.saidas.pop((aresta.a, aresta.da), None)
+        self.saidas.pop((aresta.b, aresta.db), None)
+        for celula in aresta.celulas:
+            self.posicao.pop(celula, None)
+        return aresta
+
+    # Verifica se a célula (x, y) é uma junção
+    def ehJuncao(self, x: int, y: int) -> bool:
+        return self.caminhos.indice(x, y) in self.nos
+
+    # Num corredor, retorna a única direção que segue em frente (sem voltar)
+    def seguirCorredor(self, x: int, y: int, direcao: tuple):
+        reverso = (-direcao[0], -direcao[1])
+        celula = self.caminhos.indice(x, y)
+        if celula not in self.posicao:
+            return None
+        for d, _ in self.caminhos._vizinhosLivres(celula):
+            if DIRECOES[d] != reverso:
+                return DIRECOES[d]
+        return None
+
+    # Dijkstra sobre as junções a partir da célula (x, y). Se a origem estiver
+    # no meio de um corredor, parte dos dois extremos dele.
+    def distanciasDesde(self, x: int, y: int) -> dict:
+        celula = self.caminhos.indice(x, y)
+        heap = []
+        if celula in self.nos:
+            heap.append((0, celula))
+        elif celula in self.posicao:
+            idAresta, i = self.posicao[celula]
+            aresta = self.arestas[idAresta]
+            heap.append((i, aresta.a))
+            heap.append((aresta.comprimento - i, aresta.b))
+        heapq.heapify(heap)
+
+        dist = {}
+        while heap:
+            dAtual, no = heapq.heappop(heap)
+            if no in dist:
+                continue
+            dist[no] = dAtual
+            for d, _ in self.caminhos._vizinhosLivres(no):
+                aresta = self.arestas[self.saidas[(no, d)]]
+                outro = aresta.outroExtremo(no, d)
+                if outro not in dist:
+                    heapq.heappush(heap, (dAtual + aresta.comprimento, outro))
+        return dist
+
+    # Observador do mapa: refaz só as arestas em volta da célula alterada.
+    # Deve ser registrado depois da tabela de caminhos, que atualiza a grade.
+    def aoAlterarMapa(self, x: int, y: int, antigo: str, novo: str) -> None:
+        if (antigo == "#") == (novo == "#"):
+            return
+
+        col = self.caminhos.col
+        celula = self.caminhos.indice(x, y)
+        regiao = {celula}
+        for dx, dy in DIRECOES:
+            if 0 <= x + dx < col and 0 <= y + dy < self.caminhos.lin:
+                regiao.add(celula + dy * col + dx)
+
+        # Remove as arestas que passam pela região ou terminam nela
+        removidas = set()
+        for c in regiao:
+            if c in self.posicao:
+                removidas.add(self.posicao[c][0])
+            for d in range(4):
+                if (c, d) in self.saidas:
+                    removidas.add(self.saidas[(c, d)])
+
+        pendentes = set()  # Junções com saídas a refazer
+        soltas = []  # Células internas que podem ter ficado sem aresta
+        for idAresta in removidas:
+            aresta = self._removerAresta(idAresta)
+            pendentes.add(aresta.a)
+            pendentes.add(aresta.b)
+            soltas.extend(aresta.celulas)
+
+        # Reavalia quem é junção dentro da região
+        for c in regiao:
+            self.nos.discard(c)
+            pendentes.discard(c)
+            if self._ehJuncao(c):
+                self.nos.add(c)
+                pendentes.add(c)
+            elif self.caminhos.livre[c]:
+                soltas.append(c)
+
+        for no in pendentes:
+            if no in self.nos:
+                self._tracarSaidas(no)
+
+        for c in soltas:
+            if self.caminhos.livre[c] and c not in self.nos and c not in self.posicao:
+                self.nos.add(c)
+                self._tracarSaidas(c)
+
+
+# Campo de distâncias até o Pacman compartilhado por todos os fantasmas.
+# É refeito apenas quando o Pacman entra em outra célula; cada fantasma só
+# consulta as distâncias dos vizinhos para descer (perseguir) ou subir (fugir).
+# Com a tabela completa o campo é uma linha dela; em mapas grandes ele é um
+# Dijkstra sobre o grafo de junções, e a distância de uma célula de corredor
+# vem dos dois extremos do corredor.
+class CampoDistancia:
+    def __init__(self, mapa) -> None:
+        self.mapa = mapa
+        self.caminhos = mapa.caminhos
+        self.grafo = mapa.grafo
+        self.origem = None  # Célula do Pacman usada no último cálculo
+        self.versaoParedes = mapa.versaoParedes
+        self.dist = None  # Distância de cada célula até a origem (tabela completa)
+        self.distNos = {}  # Distância de cada junção até a origem (grafo)
+        self.origemAresta = None  # (aresta, posição) se a origem está num corredor
+        self.sujo = False  # Origem mudou e o campo ainda não foi refeito
+        self.recalculos = 0  # Quantas vezes o campo foi refeito
+
+    # Marca o campo para ser refeito se o Pacman mudou de célula. O cálculo
+    # só acontece na primeira consulta, então quadros em que nenhum fantasma
+    # consulta o campo (ou em que a IA roda em outro processo) não pagam nada.
+    # Retorna True se a origem mudou
+    def atualizar(self, x: int, y: int) -> bool:
+        paredesMudaram = self.mapa.versaoParedes != self.versaoParedes
+        if (x, y) == self.origem and not paredesMudaram:
+            return False
+        if not self.caminhos.passavel(x, y):
+            return False
+
+        self.origem = (x, y)
+        self.versaoParedes = self.mapa.versaoParedes
+        self.sujo = True
+        return True
+
+    def _calcular(self) -> None:
+        x, y = self.origem
+        if self.caminhos.completa:
+            self.dist, _ = self.caminhos.arvore(self.caminhos.indice(x, y))
+        else:
+            self.distNos = self.grafo.distanciasDesde(x, y)
+            self.origemAresta = self.grafo.posicao.get(self.caminhos.indice(x, y))
+        self.sujo = False
+        self.recalculos += 1
+
+    # Distância da célula (x, y) até o Pacman (INFINITO se inalcançável)
+    def distancia(self, x: int, y: int) -> int:
+        if self.origem is None or not self.caminhos.passavel(x, y):
+            return INFINITO
+        if self.sujo:
+            self._calcular()
+        celula = y * self.caminhos.col + x
+        if self.dist is not None:
+            return self.dist[celula]
+
+        if celula in self.distNos:
+            return min(self.distNos[celula], INFINITO)
+        if celula not in self.grafo.posicao:
+            return INFINITO
+
+        idAresta, i = self.grafo.posicao[celula]
+        aresta = self.grafo.arestas[idAresta]
+        melhor = min(
+            self.distNos.get(aresta.a, INFINITO) + i,
+            self.distNos.get(aresta.b, INFINITO) + aresta.comprimento - i,
+        )
+        if self.origemAresta and self.origemAresta[0] == idAresta:
+            melhor = min(melhor, abs(i - self.origemAresta[1]))
+        return min(melhor, INFINITO)
+
+    # Vizinhos na ordem de preferência de cada fantasma (usada para desempate)
+    def _vizinhos(self, x: int, y: int, preferencia: int):
+        for i in range(4):
+            dx, dy = DIRECOES[(i + preferencia) % 4]
+            yield (dx, dy), self.distancia(x + dx, y + dy)
+
+    # Direção que mais se aproxima do Pacman (desce o gradiente)
+    def direcaoDescendo(self, x: int, y: int, preferencia: int = 0):
+        melhor = None
+        melhorDist = self.distancia(x, y)
+        if melhorDist == INFINITO:
+            return None
+
+        for direcao, dist in self._vizinhos(x, y, preferencia):
+            if dist < melhorDist:
+                melhor = direcao
+                melhorDist = dist
+        return melhor
+
+    # Direção que mais se afasta do Pacman (sobe o gradiente). Evita dar meia
+    # volta, a não ser que seja a única saída (beco sem saída)
+    def direcaoSubindo(self, x: int, y: int, direcaoAtual: tuple, preferencia: int = 0):
+        reverso = (-direcaoAtual[0], -direcaoAtual[1])
+        melhor = None
+        melhorDist = -1
+        podeVoltar = False
+
+        for direcao, dist in self._vizinhos(x, y, preferencia):
+            if dist == INFINITO:
+                continue
+            if direcao == reverso:
+                podeVoltar = True
+                continue
+            if dist > melhorDist:
+                melhor = direcao
+                melhorDist = dist
+
+        if melhor is None and podeVoltar:
+            return reverso
+        return melhor
+
+    # Monta um plano de vários passos seguindo o campo como o fantasma faria:
+    # em corredores segue em frente, nas junções desce (ou sobe, fugindo) o
+    # gradiente. O plano para numa junção depois de 'passos' células.
+    def planejar(
+        self,
+        x: int,
+        y: int,
+        direcao: tuple,
+        fugindo: bool,
+        preferencia: int,
+        passos: int,
+    ) -> list:
+        plano = []
+        limite = (
+            passos * FATOR_LIMITE_PLANO
+        )  # Evita planos enormes em corredores longos
+
+        while len(plano) < limite:
+            juncao = self.grafo.ehJuncao(x, y)
+            if len(plano) >= passos and juncao:
+                break
+
+            proxima = None
+            if direcao != (0, 0) and not juncao:
+                proxima = self.grafo.seguirCorredor(x, y, direcao)
+            if proxima is None:
+                if fugindo:
+                    proxima = self.direcaoSubindo(x, y, direcao, preferencia)
+                else:
+                    proxima = self.direcaoDescendo(x, y, preferencia)
+            if proxima is None:
+                break
+
+            x += proxima[0]
+            y += proxima[1]
+            direcao = proxima
+            plano.append((x, y))
+
+            if not fugindo and (x, y) == self.origem:
+                break  # Chegou no Pacman
+        return plano
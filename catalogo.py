@@ -0,0 +1,183 @@
+import os
+import struct
+import threading
+
+import salvamento
+from salvamento import RESUMO, ErroSave
+
+# Índice dos saves de uma pasta, para o menu de load não abrir save por save.
+# Cada save tem um resumo de tamanho fixo logo depois do cabeçalho
+# (salvamento.lerResumo); o índice junta os resumos de todos num arquivo só:
+#
+#   cabeçalho  MAGICO, versão, quantidade de entradas
+#   entradas   nome do arquivo, data de modificação e tamanho (para saber se
+#              o save mudou por fora) + o resumo no formato de salvamento.py
+#
+# Ao abrir o menu, o índice é conferido com a listagem da pasta (só nomes e
+# stat, sem abrir os saves): quem entrou, saiu ou mudou tem o resumo relido.
+MAGICO = b"PMIX"
+VERSAO = 1
+ARQUIVO = "indice.cat"
+
+CABECALHO = struct.Struct("<4sHI")
+# nome do arquivo, data de modificação (ns), tamanho
+ENTRADA = struct.Struct("<64sqQ")
+
+# Ordens do menu: nome -> (chave, do maior para o menor)
+ORDENS = {
+    "data": (lambda slot: slot["data"], True),
+    "pontos": (lambda slot: slot["pontos"], True),
+    "nome": (lambda slot: slot["arquivo"].lower(), False),
+}
+
+# Gravações do índice vêm da thread de disco e do menu
+_trava = threading.Lock()
+
+
+class Catalogo:
+    def __init__(self, diretorio: str = "saves") -> None:
+        self.diretorio = diretorio
+        self.caminho = os.path.join(diretorio, ARQUIVO)
+        self.slots = {}  # arquivo -> resumo + 'arquivo', 'modificado', 'tamanho'
+
+    # Lê o índice e acerta com o que está na pasta. Retorna self
+    def carregar(self) -> "Catalogo":
+        with _trava:
+            self.slots = self._lerIndice()
+            if self._sincronizar():
+                self._gravarIndice()
+        return self
+
+    # Atualiza a entrada de um save recém-gravado (chamado pela thread de disco)
+    def registrar(self, caminho: str) -> None:
+        with _trava:
+            self.slots = self._lerIndice()
+            arquivo = os.path.basename(caminho)
+            slot = self._lerSlot(arquivo, os.stat(caminho))
+            if slot:
+                self.slots[arquivo] = slot
+            else:
+                self.slots.pop(arquivo, None)
+            self._gravarIndice()
+
+    # Slots na ordem pedida (ver ORDENS)
+    def ordenados(self, ordem: str = "data") -> list:
+        chave, decrescente = ORDENS[ordem]
+        return sorted(self.slots.values(), key=chave, reverse=decrescente)
+
+    def _lerIndice(self) -> dict:
+        try:
+            with open(self.caminho, "rb") as arq:
+                dados = arq.read()
+            magico, versao, quantidade = CABECALHO.unpack_from(dados)
+            if magico != MAGICO or versao != VERSAO:
+                raise ErroSave("Índice de outra versão")
+
+            slots = {}
+            pos = CABECALHO.size
+            for _ in range(quantidade):
+                nome, modificado, tamanho = ENTRADA.unpack_from(dados, pos)
+                pos += ENTRADA.size
+                slot = _resumo(RESUMO.unpack_from(dados, pos))
+                pos += RESUMO.size
+                slot["arquivo"] = nome.rstrip(b"\0").decode("utf-8")
+                slot["modificado"] = modificado
+                slot["tamanho"] = tamanho
+                slots[slot["arquivo"]] = slot
+            return slots
+
+        except FileNotFoundError:
+            return {}
+        except (ErroSave, struct.error, UnicodeDecodeError) as e:
+            # O índice é só um cache: refaz a partir dos saves
+            print(f"Índice dos saves inválido, refazendo: {e}")
+            return {}
+
+    # Acerta o índice com a pasta. Retorna True se algo mudou
+    def _sincronizar(self) -> bool:
+        try:
+            entradas = [
+                e
+                for e in os.scandir(self.diretorio)
+                if e.name.endswith(salvamento.EXTENSAO) and e.is_file()
+            ]
+        except FileNotFoundError:
+            entradas = []
+
+        mudou = False
+        presentes = set()
+        for entrada in entradas:
+            presentes.add(entrada.name)
+            info = entrada.stat()
+            slot = self.slots.get(entrada.name)
+            if (
+                slot
+                and slot["modificado"] == info.st_mtime_ns
+                and slot["tamanho"] == info.st_size
+            ):
+                continue
+            mudou = True
+            slot = self._lerSlot(entrada.name, info)
+            if slot:
+                self.slots[entrada.name] = slot
+            else:
+                self.slots.pop(entrada.name, None)
+
+        for arquivo in set(self.slots) - presentes:
+            del self.slots[arquivo]
+            mudou = True
+        return mudou
+
+    # Resumo de um save para o índice (None se não dá para ler)
+    def _lerSlot(self, arquivo: str, info: os.stat_result):
+        if len(arquivo.encode("utf-8")) > 64:
+            return None
+        try:
+            slot = salvamento.lerResumo(os.path.join(self.diretorio, arquivo))
+        except (OSError, ErroSave) as e:
+            print(f"Save {arquivo} ignorado no índice: {e}")
+            return None
+        if slot is None:
+            # Save antigo, sem resumo: entra no menu só com o nome
+            slot = _resumo((b"", 0, 0, 0, 0, info.st_mtime, b""))
+        slot["arquivo"] = arquivo
+        slot["modificado"] = info.st_mtime_ns
+        slot["tamanho"] = info.st_size
+        return slot
+
+    def _gravarIndice(self) -> None:
+        partes = [CABECALHO.pack(MAGICO, VERSAO, len(self.slots))]
+        for slot in self.slots.values():
+            partes.append(
+                ENTRADA.pack(
+                    slot["arquivo"].encode("utf-8"),
+                    slot["modificado"],
+                    slot["tamanho"],
+                )
+            )
+            partes.append(
+                RESUMO.pack(
+                    slot["nomeMapa"].encode("utf-8")[:32],
+                    slot["ticks"],
+                    slot["pontos"],
+                    slot["vidas"],
+                    slot["itens"],
+                    slot["data"],
+                    slot["miniatura"] or b"",
+                )
+            )
+        os.makedirs(self.diretorio, exist_ok=True)
+        salvamento.gravarAtomico(self.caminho, b"".join(partes))
+
+
+def _resumo(valores: tuple) -> dict:
+    nome, ticks, pontos, vidas, itens, data, miniatura = valores
+    return {
+        "nomeMapa": nome.rstrip(b"\0").decode("utf-8", "replace"),
+        "ticks": ticks,
+        "pontos": pontos,
+        "vidas": vidas,
+        "itens": itens,
+        "data": data,
+        "miniatura": miniatura if any(miniatura) else None,
+    }
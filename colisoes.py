@@ -0,0 +1,61 @@
+# Hash espacial uniforme para a fase larga das colisões. Cada chave (o índice
+# do fantasma, por exemplo) fica na célula do centro do seu retângulo, com
+# células do tamanho de um tile. Para entidades de até um tile, dois
+# retângulos que se tocam têm centros a menos de uma célula de distância,
+# então basta olhar a célula do alvo e as 8 em volta: o custo acompanha a
+# densidade local e não o total de entidades.
+class HashEspacial:
+    def __init__(self, tamanhoCelula: int) -> None:
+        self.tamanho = tamanhoCelula
+        self.celulas = {}  # (cx, cy) -> conjunto de chaves
+        self.posicoes = {}  # chave -> (cx, cy)
+
+    def __len__(self) -> int:
+        return len(self.posicoes)
+
+    def _celula(self, rect) -> tuple:
+        cx = (rect.x + rect.w // 2) // self.tamanho
+        cy = (rect.y + rect.h // 2) // self.tamanho
+        return cx, cy
+
+    # Coloca a chave na célula do retângulo, saindo da antiga se mudou
+    def atualizar(self, chave, rect) -> None:
+        self.atualizarCelula(chave, self._celula(rect))
+
+    # Mesmo que atualizar, para quem já sabe a célula do centro
+    def atualizarCelula(self, chave, celula: tuple) -> None:
+        antiga = self.posicoes.get(chave)
+        if antiga == celula:
+            return
+        if antiga is not None:
+            self._tirar(chave, antiga)
+        self.posicoes[chave] = celula
+        self.celulas.setdefault(celula, set()).add(chave)
+
+    def remover(self, chave) -> None:
+        antiga = self.posicoes.pop(chave, None)
+        if antiga is not None:
+            self._tirar(chave, antiga)
+
+    def _tirar(self, chave, celula: tuple) -> None:
+        conjunto = self.celulas[celula]
+        conjunto.discard(chave)
+        if not conjunto:
+            del self.celulas[celula]
+
+    def limpar(self) -> None:
+        self.celulas.clear()
+        self.posicoes.clear()
+
+    # Chaves que podem tocar 'rect' (a fase estreita fica com quem chama),
+    # em ordem crescente para as colisões saírem sempre na mesma ordem
+    def consultar(self, rect) -> list:
+        cx, cy = self._celula(rect)
+        candidatos = []
+        for y in range(cy - 1, cy + 2):
+            for x in range(cx - 1, cx + 2):
+                conjunto = self.celulas.get((x, y))
+                if conjunto:
+                    candidatos.extend(conjunto)
+        candidatos.sort()
+        return candidatos
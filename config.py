@@ -7,3 +7,31 @@ VERMELHO = (255, 0, 0)
 
 TILE_SIZE = 32  # Tamanho do tile em pixels
 VELOCIDADE = 2
+RETANGULOS_SUJOS = True  # Atualiza só as áreas da tela que mudaram
+TICKS_POR_SEGUNDO = 60  # Ritmo fixo da simulação (toda a velocidade do jogo)
+QUADROS_POR_SEGUNDO = 60  # Limite de quadros desenhados (0 = sem limite)
+MAX_TICKS_POR_QUADRO = 5  # Se atrasar mais que isso, o jogo desacelera
+CAPACIDADE_CACHE_TEXTO = 256  # Textos renderizados guardados pela fonte
+
+# Caminhos dos fantasmas
+DIRETORIO_CACHE = "cache"  # Onde ficam as tabelas de caminhos pré-calculadas
+LIMITE_TABELA_CAMINHOS = 2048  # Máximo de células (lin * col) para a tabela completa
+CAPACIDADE_LRU_CAMINHOS = 64  # Árvores de BFS guardadas em mapas maiores
+PASSOS_PLANO = 6  # Células que um fantasma planeja de uma vez
+TOLERANCIA_REPLANEJAR = 3  # Quanto o Pacman pode se afastar do alvo do plano
+ORCAMENTO_IA_US = 2000  # Tempo máximo por quadro para replanejar fantasmas
+RELATORIO_IA_QUADROS = 0  # Imprime as métricas da IA a cada N quadros (0 desliga)
+IA_ASSINCRONA = False  # Calcula os caminhos em processos separados
+CELULAS_IA_ASSINCRONA = 250000  # A partir desse tamanho de mapa liga sozinha
+TRABALHADORES_IA = 2  # Processos do serviço de caminhos assíncrono
+
+# Autosave
+AUTOSAVE = True  # Diário contínuo da partida para recuperar depois de uma queda
+AUTOSAVE_TICKS_ENTIDADES = 60  # Intervalo entre fotos do Pacman e dos fantasmas
+AUTOSAVE_COMPACTAR = 600  # Registros no diário até gravar uma foto completa
+# Pasta só do autosave: fora da listagem dos saves manuais (saves/*.sav),
+# então nenhum slot do menu se confunde com ele
+DIRETORIO_AUTOSAVE = "saves/.autosave"
+
+# Placar
+ARQUIVO_PLACAR = "scores.db"  # Banco SQLite com todas as partidas
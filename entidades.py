@@ -1,12 +1,76 @@
-from config import TILE_SIZE, VELOCIDADE, PRETO
+from config import TILE_SIZE, VELOCIDADE, PASSOS_PLANO, TOLERANCIA_REPLANEJAR
 from mapa import Mapa
-from collections import deque  # Necessario para o BFS
-import pygame
+from caminhos import FATOR_LIMITE_PLANO, CampoDistancia
+from array import array
 import random
 
+try:
+    import pygame
+    from sprites import ORIENTACAO, DIREITA, atlasDe
+except ImportError:  # Simulação sem interface gráfica (servidores sem pygame)
+    pygame = None
+    ORIENTACAO, DIREITA, atlasDe = {}, 0, None
 
-# TAD para representar as entidades do jogo
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy o armazém atualiza os fantasmas num laço Python
+    np = None
+
+QUADROS_PACMAN = 4  # Quadros da animação do Pacman
+QUADROS_FANTASMA = 2  # Quadros da animação dos fantasmas
+
+
+# Retângulo em pixels das entidades, sem depender do pygame. Tem a parte da
+# interface do pygame.Rect usada pelo jogo e pode ser passado direto para
+# tela.blit (é uma sequência x, y, largura, altura)
+class Retangulo:
+    __slots__ = ("x", "y", "w", "h")
+
+    def __init__(self, x: int, y: int, w: int, h: int) -> None:
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+    @property
+    def centerx(self) -> int:
+        return self.x + self.w // 2
+
+    @property
+    def centery(self) -> int:
+        return self.y + self.h // 2
+
+    @property
+    def center(self) -> tuple:
+        return self.centerx, self.centery
+
+    def move(self, dx: int, dy: int) -> "Retangulo":
+        return Retangulo(self.x + dx, self.y + dy, self.w, self.h)
+
+    def inflate(self, dw: int, dh: int) -> "Retangulo":
+        return Retangulo(self.x - dw // 2, self.y - dh // 2, self.w + dw, self.h + dh)
+
+    def colliderect(self, outro) -> bool:
+        return (
+            self.x < outro.x + outro.w
+            and outro.x < self.x + self.w
+            and self.y < outro.y + outro.h
+            and outro.y < self.y + self.h
+        )
+
+    def __len__(self) -> int:
+        return 4
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.w, self.h)[i]
+
+
+# TAD para representar as entidades do jogo. Não guarda nada por si só
+# (__slots__ vazio): o Pacman usa o __dict__ normal e o Fantasma guarda os
+# campos no ArmazemFantasmas
 class Entidade:
+    __slots__ = ()
+
     # Construtor da entidade
     def __init__(self, x: int, y: int) -> None:
         self.xGrid = x  # Posição na grade (Coluna)
@@ -16,24 +80,41 @@ class Entidade:
         self.yInicio = y
 
         # Posicão em pixels para renderização
-        self.rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        self.rect = Retangulo(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        self.posAnterior = (self.rect.x, self.rect.y)  # Posição antes do último tick
 
         self.direcao = (0, 0)  # Vetor que aponta o movimento (1,0) é direita
         self.speed = VELOCIDADE
 
-        # Atributos visuais
-        self.imagem = None
+        # Atributos visuais: as imagens ficam no atlas compartilhado (sprites.py)
+        # e a entidade guarda só o índice do quadro atual
+        self.atlas = None
+        self.quadro = 0
 
         self.animacaoIndex = 0.0  # Índice para animação futura
         self.animacaoSpeed = 0.15  # Velocidade da animação futura
 
-    # Metodo para limpar as animações para permitir o salvamento
-    def limparImagens(self):
-        self.imagem = None
-
-    def restaurarImagem(self):
-        # A implementação das classes filhas sobrepoe
-        pass
+    # Imagem do quadro atual (None sem folha de sprites)
+    @property
+    def imagem(self):
+        return None
+
+    # Guarda a posição atual antes de um tick, para a interpolação
+    def guardarPosicao(self) -> None:
+        self.posAnterior = (self.rect.x, self.rect.y)
+
+    # Posição em pixels entre a do tick anterior (alfa 0) e a atual (alfa 1).
+    # Saltos maiores que um tile (morte, fantasma comido) não são interpolados
+    def posicaoInterpolada(self, alfa: float) -> tuple:
+        x0, y0 = self.posAnterior
+        x1, y1 = self.rect.x, self.rect.y
+        if abs(x1 - x0) + abs(y1 - y0) > TILE_SIZE:
+            return x1, y1
+        return round(x0 + (x1 - x0) * alfa), round(y0 + (y1 - y0) * alfa)
+
+    # Reestabelesce as animações (o atlas da folha é criado uma vez só)
+    def restaurarImagens(self, sheet):
+        self.atlas = atlasDe(sheet) if atlasDe else None
 
     # Reorna a posição atual na grade baseada no centro do rect
     def getPosGrad(self) -> int:
@@ -46,12 +127,9 @@ class Entidade:
         return (self.rect.x % TILE_SIZE == 0) and (self.rect.y % TILE_SIZE == 0)
 
     # Metodo para verificar se a entidade pode se mover para a posição (x, y)
+    # (fora dos limites do mapa e paredes bloqueiam o movimento)
     def podeMover(self, mapa: Mapa, x: int, y: int) -> bool:
-        if x < 0 or x >= mapa.col or y < 0 or y >= mapa.lin:
-            return False  # Fora dos limites do mapa
-        if mapa.matriz[y][x] == "#":
-            return False  # Paredes bloqueiam o movimento
-        return True
+        return mapa.passavel(x, y)
 
     # Movimento básico contínuo
     def mover_fisica(self) -> None:
@@ -61,15 +139,6 @@ class Entidade:
         # Atualiza a referência da grade para lógica do jogo
         self.xGrid, self.yGrid = self.getPosGrad()
 
-    # Recorta e retorna uma sprite da folha de sprites.
-    def getSprite(self, sheet, x, y, w=16, h=16):
-        if sheet is None:
-            return None
-        sprite = pygame.Surface((w, h))
-        sprite.blit(sheet, (0, 0), (x, y, w, h))
-        sprite.set_colorkey(PRETO)  # Define o preto como transparente
-        return pygame.transform.scale(sprite, (TILE_SIZE, TILE_SIZE))
-
 
 # Subclasse específica para o Pacman
 class Pacman(Entidade):
@@ -83,47 +152,31 @@ class Pacman(Entidade):
         self.proximaDirecao = (0, 0)  # Direção que o jogador quer ir
         self.invencivelTimer = 0  # 0 indica que está vulnerável
         self.parpadeoToggle = False
-        # Carrega as sprites do Pacman
-        # Assume-se: (0,0) Fechado, (16,0) Aberto, (32,0) Muito Aberto
-        self.sprites = []
-        if sheet:
-            # Cria a sequência: Fechado -> Meio -> Aberto -> Meio
-            s0 = self.getSprite(sheet, 0, 0)  # Fechado
-            s1 = self.getSprite(sheet, 16, 0)  # Meio
-            s2 = self.getSprite(sheet, 32, 0)  # Aberto
-            self.sprites = [s0, s1, s2, s1]
-        else:
-            self.sprites = [None]
-
-        self.imagem = self.sprites[0]
+        # Sprites: Fechado -> Meio -> Aberto -> Meio, girados conforme a direção
+        self.restaurarImagens(sheet)
+        self.orientacao = DIREITA
         self.animacaoSpeed = 0.3  # Pacman mastiga rápido
 
-    # Limpa as animações para salvar
-    def limparImagens(self):
-        self.imagem = None
-        self.sprites = []  # Listas de surfaces também quebram o pickle
+    @property
+    def imagem(self):
+        if self.atlas is None:
+            return None
+        return self.atlas.pacman[self.orientacao][self.quadro]
 
-    # Reestabelesce as animações
-    def restaurarImagens(self, sheet):
-        if sheet:
-            s0 = self.getSprite(sheet, 0, 0)
-            s1 = self.getSprite(sheet, 16, 0)
-            s2 = self.getSprite(sheet, 32, 0)
-            self.sprites = [s0, s1, s2, s1]
-            self.imagem = self.sprites[0]  # Define uma imagem padrão
-        else:
-            self.sprites = []
+    # Define a direção desejada (usada na próxima vez que estiver centralizado)
+    def definirDirecao(self, direcao: tuple) -> None:
+        self.proximaDirecao = direcao
 
     # Chamado pelo evento de teclado para definir a direção desejada
     def processarEvento(self, key):
         if key == pygame.K_UP:
-            self.proximaDirecao = (0, -1)
+            self.definirDirecao((0, -1))
         elif key == pygame.K_DOWN:
-            self.proximaDirecao = (0, 1)
+            self.definirDirecao((0, 1))
         elif key == pygame.K_LEFT:
-            self.proximaDirecao = (-1, 0)
+            self.definirDirecao((-1, 0))
         elif key == pygame.K_RIGHT:
-            self.proximaDirecao = (1, 0)
+            self.definirDirecao((1, 0))
 
     # Lógica principal de movimento do Pacman (chamada a cada frame)
     def update(self, mapa: Mapa) -> None:
@@ -161,27 +214,14 @@ class Pacman(Entidade):
 
         # LÓGICA DA ANIMAÇÃO DO PACMAN
         # Só anima se estiver se movendo
-        if self.direcao != (0, 0) and self.sprites:
+        if self.direcao != (0, 0):
             self.animacaoIndex += self.animacaoSpeed
-            if self.animacaoIndex >= len(self.sprites):
+            if self.animacaoIndex >= QUADROS_PACMAN:
                 self.animacaoIndex = 0.0
 
-        # Seleciona o frame base
-        idx = int(self.animacaoIndex)
-        spriteBase = self.sprites[idx] if idx < len(self.sprites) else self.sprites[0]
-
-        # Rotaciona a sprite conforme a direção
-        if spriteBase:
-            angulo = 0
-            if self.direcao == (-1, 0):
-                angulo = 180  # Esquerda
-            elif self.direcao == (0, -1):
-                angulo = 90  # Cima
-            elif self.direcao == (0, 1):
-                angulo = 270  # Baixo
-            self.imagem = pygame.transform.rotate(
-                spriteBase, angulo
-            )  # Gira a partir da original conforme o angulo
+        # Só índices: o quadro já girado para cada direção está no atlas
+        self.quadro = int(self.animacaoIndex)
+        self.orientacao = ORIENTACAO.get(self.direcao, DIREITA)
 
     def desenhar(self, tela):
         # Se estiver invencível e for um frame "invisível", NÃO desenha
@@ -210,114 +250,445 @@ class Pacman(Entidade):
         return False
 
 
-# Subclasse específica para os Fantasmas
+# Campos dos fantasmas guardados em arrays tipados (nome, tipo do array)
+CAMPOS_FANTASMA = (
+    ("x", "i"),
+    ("y", "i"),
+    ("xAnterior", "i"),
+    ("yAnterior", "i"),
+    ("xGrid", "i"),
+    ("yGrid", "i"),
+    ("dirX", "b"),
+    ("dirY", "b"),
+    ("speed", "i"),
+    ("tempoPreso", "i"),
+    ("assustado", "B"),
+    ("tempoAssustado", "i"),
+    ("animacaoIndex", "d"),
+    ("animacaoSpeed", "d"),
+    ("quadro", "B"),
+    ("xInicio", "i"),
+    ("yInicio", "i"),
+    ("preferencia", "B"),
+    ("modoPlano", "B"),
+    ("temAlvo", "B"),
+    ("alvoX", "i"),
+    ("alvoY", "i"),
+    ("replanejamentos", "I"),
+    ("planoInicio", "B"),
+    ("planoTamanho", "B"),
+)
+
+# Células reservadas para o plano de cada fantasma (o maior que o campo monta)
+CAPACIDADE_PLANO = PASSOS_PLANO * FATOR_LIMITE_PLANO
+
+# Sorteios do fallback. A simulação troca por um gerador com semente
+# própria para que partidas com a mesma semente se repitam
+_RNG_FANTASMAS = random.Random()
+
+
+# Armazém dos fantasmas em estrutura de arrays: cada campo de CAMPOS_FANTASMA
+# é um array tipado com uma posição por fantasma, e os objetos Fantasma são
+# só fachadas (com __slots__) que leem e escrevem na sua posição. Animação,
+# timers e movimento de todos são atualizados em lote sobre os arrays (com
+# NumPy, por visões sem cópia da mesma memória); só a decisão no centro do
+# tile passa pelo objeto. Os planos também ficam aqui: CAPACIDADE_PLANO
+# células por fantasma em planoX/planoY, a partir de planoInicio.
+class ArmazemFantasmas:
+    def __init__(self) -> None:
+        for nome, tipo in CAMPOS_FANTASMA:
+            setattr(self, nome, array(tipo))
+        self.planoX = array("H")
+        self.planoY = array("H")
+        self.atlas = None  # Sprites, iguais para todos os fantasmas
+        self.fantasmas = []  # Fachadas, na ordem das posições
+        self.rng = _RNG_FANTASMAS
+        self.mudaram = []  # Índices que trocaram de célula no último update
+        self._visoes = None  # Visões NumPy dos arrays (refeitas ao crescer)
+
+    def __len__(self) -> int:
+        return len(self.fantasmas)
+
+    # Abre uma posição (zerada) para o fantasma e retorna o índice
+    def reservar(self, fantasma: "Fantasma") -> int:
+        self._visoes = None  # Um array com visões exportadas não pode crescer
+        for nome, _ in CAMPOS_FANTASMA:
+            getattr(self, nome).append(0)
+        self.planoX.extend(bytes(CAPACIDADE_PLANO * 2))
+        self.planoY.extend(bytes(CAPACIDADE_PLANO * 2))
+        self.fantasmas.append(fantasma)
+        return len(self.fantasmas) - 1
+
+    # Guarda a posição de todos antes de um tick, para a interpolação
+    def guardarPosicoes(self) -> None:
+        self.xAnterior[:] = self.x
+        self.yAnterior[:] = self.y
+
+    def definirAssustados(self, assustado: bool, speed: int) -> None:
+        for i in range(len(self.fantasmas)):
+            self.assustado[i] = assustado
+            self.speed[i] = speed
+
+    # Células (da grade) do centro de cada fantasma, na ordem dos índices
+    def celulas(self):
+        meio = TILE_SIZE // 2
+        for x, y in zip(self.x, self.y):
+            yield (x + meio) // TILE_SIZE, (y + meio) // TILE_SIZE
+
+    def _visoesNumpy(self) -> dict:
+        if self._visoes is None:
+            self._visoes = {
+                nome: np.frombuffer(getattr(self, nome), dtype=tipo)
+                for nome, tipo in CAMPOS_FANTASMA
+            }
+        return self._visoes
+
+    # Mesmo efeito de chamar Fantasma.update em cada um, em ordem. Os índices
+    # dos que trocaram de célula ficam em self.mudaram
+    def update(self, mapa: Mapa, campo: CampoDistancia, escalonador=None) -> None:
+        if not self.fantasmas:
+            self.mudaram = []
+        elif np is None:
+            self._updateLaco(mapa, campo, escalonador)
+        else:
+            self._updateNumpy(mapa, campo, escalonador)
+
+    def _updateNumpy(self, mapa: Mapa, campo: CampoDistancia, escalonador) -> None:
+        v = self._visoesNumpy()
+        v["animacaoIndex"] += v["animacaoSpeed"]
+        v["quadro"][:] = v["animacaoIndex"].astype(np.int64) % QUADROS_FANTASMA
+
+        # Presos só descontam o tempo
+        tempoPreso = v["tempoPreso"]
+        livres = tempoPreso <= 0
+        tempoPreso[~livres] -= 1
+
+        # Decisões no centro do tile, uma a uma e na ordem dos índices
+        x, y = v["x"], v["y"]
+        centrados = livres & (x % TILE_SIZE == 0) & (y % TILE_SIZE == 0)
+        for i in np.flatnonzero(centrados).tolist():
+            if not self.fantasmas[i].decidir(mapa, campo, escalonador):
+                livres[i] = False
+
+        andam = np.flatnonzero(livres)
+        meio = TILE_SIZE // 2
+        antesX = (x[andam] + meio) // TILE_SIZE
+        antesY = (y[andam] + meio) // TILE_SIZE
+        x[andam] += v["dirX"][andam] * v["speed"][andam]
+        y[andam] += v["dirY"][andam] * v["speed"][andam]
+        novoX = (x[andam] + meio) // TILE_SIZE
+        novoY = (y[andam] + meio) // TILE_SIZE
+        v["xGrid"][andam] = novoX
+        v["yGrid"][andam] = novoY
+        self.mudaram = andam[(novoX != antesX) | (novoY != antesY)].tolist()
+
+    def _updateLaco(self, mapa: Mapa, campo: CampoDistancia, escalonador) -> None:
+        x, y, dirX, dirY = self.x, self.y, self.dirX, self.dirY
+        speed, tempoPreso = self.speed, self.tempoPreso
+        animacao, animacaoSpeed, quadro = (
+            self.animacaoIndex,
+            self.animacaoSpeed,
+            self.quadro,
+        )
+        meio = TILE_SIZE // 2
+        self.mudaram = []
+        for i, fantasma in enumerate(self.fantasmas):
+            indice = animacao[i] + animacaoSpeed[i]
+            animacao[i] = indice
+            quadro[i] = int(indice) % QUADROS_FANTASMA
+
+            if tempoPreso[i] > 0:
+                tempoPreso[i] -= 1
+                continue
+
+            if x[i] % TILE_SIZE == 0 and y[i] % TILE_SIZE == 0:
+                if not fantasma.decidir(mapa, campo, escalonador):
+                    continue
+
+            antes = ((x[i] + meio) // TILE_SIZE, (y[i] + meio) // TILE_SIZE)
+            x[i] += dirX[i] * speed[i]
+            y[i] += dirY[i] * speed[i]
+            self.xGrid[i] = (x[i] + meio) // TILE_SIZE
+            self.yGrid[i] = (y[i] + meio) // TILE_SIZE
+            if antes != (self.xGrid[i], self.yGrid[i]):
+                self.mudaram.append(i)
+
+
+# Retângulo de um fantasma cuja posição fica nos arrays do armazém. Tem toda
+# a interface do Retangulo; largura e altura são as de um tile
+class VisaoRetangulo(Retangulo):
+    __slots__ = ("loja", "i")
+
+    def __init__(self, loja: ArmazemFantasmas, i: int) -> None:
+        self.loja = loja
+        self.i = i
+        self.w = TILE_SIZE
+        self.h = TILE_SIZE
+
+    @property
+    def x(self) -> int:
+        return self.loja.x[self.i]
+
+    @x.setter
+    def x(self, valor: int) -> None:
+        self.loja.x[self.i] = valor
+
+    @property
+    def y(self) -> int:
+        return self.loja.y[self.i]
+
+    @y.setter
+    def y(self, valor: int) -> None:
+        self.loja.y[self.i] = valor
+
+
+# Propriedade da fachada que lê e escreve o campo 'nome' no armazém
+def _campoArmazem(nome: str, tipo=None) -> property:
+    def ler(self):
+        valor = getattr(self.loja, nome)[self.i]
+        return tipo(valor) if tipo else valor
+
+    def escrever(self, valor) -> None:
+        getattr(self.loja, nome)[self.i] = valor
+
+    return property(ler, escrever)
+
+
+# Subclasse específica para os Fantasmas. É uma fachada sobre o armazém:
+# posição, direção, velocidade, timers e animação ficam nos arrays dele
 class Fantasma(Entidade):
-    # Construtor do objeto Fantasma
-    def __init__(self, x: int, y: int, sheet=None) -> None:
+    __slots__ = ("loja", "i", "_rect")
+    totalReplanejamentos = 0  # Métrica somada de todos os fantasmas
+
+    xGrid = _campoArmazem("xGrid")
+    yGrid = _campoArmazem("yGrid")
+    speed = _campoArmazem("speed")
+    tempoPreso = _campoArmazem("tempoPreso")
+    assustado = _campoArmazem("assustado", bool)
+    tempoAssustado = _campoArmazem("tempoAssustado")
+    animacaoIndex = _campoArmazem("animacaoIndex")
+    animacaoSpeed = _campoArmazem("animacaoSpeed")
+    quadro = _campoArmazem("quadro")
+    xInicio = _campoArmazem("xInicio")
+    yInicio = _campoArmazem("yInicio")
+    preferencia = _campoArmazem("preferencia")
+    modoPlano = _campoArmazem("modoPlano", bool)
+    replanejamentos = _campoArmazem("replanejamentos")
+
+    # Construtor do objeto Fantasma. Sem 'loja', o fantasma tem um armazém só
+    # para ele (a simulação passa o armazém compartilhado)
+    def __init__(self, x: int, y: int, sheet=None, loja=None) -> None:
+        self._entrarNoArmazem(loja if loja is not None else ArmazemFantasmas())
         super().__init__(x, y)
         self.tempoPreso = 300  # 300 frames preso na casa dos fantasmas
         self.assustado = False  # Flag para estado assustado
         self.tempoAssustado = 0  # 0 indica que está normal
         self.speed = VELOCIDADE - 1  # Fantasmas são um pouco mais lentos que o Pacman
-
-        # Carrega animações
-        self.framesNormal = []
-        self.framesAssustado = []
-
-        if sheet:
-            # Normal (Vermelho): (0, 64) e (16, 64)
-            self.framesNormal = [
-                self.getSprite(sheet, 0, 64),
-                self.getSprite(sheet, 16, 64),
-            ]
-            # Assustado (Azul): (128, 64) e (144, 64)
-            self.framesAssustado = [
-                self.getSprite(sheet, 128, 64),
-                self.getSprite(sheet, 144, 64),
-            ]
-            self.imagem = self.framesNormal[0]
-
-    # Limpa as animações para salvar
-    def limparImagens(self):
-        self.imagem = None
-        self.framesNormal = []
-        self.framesAssustado = []
-
-    # Reestabelesce as animações
-    def restaurarImagens(self, sheet):
-        if sheet:
-            self.framesNormal = [
-                self.getSprite(sheet, 0, 64),
-                self.getSprite(sheet, 16, 64),
-            ]
-            self.framesAssustado = [
-                self.getSprite(sheet, 128, 64),
-                self.getSprite(sheet, 144, 64),
-            ]
-            self.imagem = self.framesNormal[0]
+        # Ordem de desempate entre caminhos de mesmo tamanho. Cada fantasma
+        # tem a sua para não andarem todos empilhados pelo mesmo corredor
+        self.preferencia = (x + y) % 4
+
+        # Plano de movimento: próximas células a visitar
+        self.plano = ()
+        self.alvoPlano = None  # Célula do Pacman quando o plano foi feito
+        self.modoPlano = False  # Se o plano foi feito fugindo
+        self.replanejamentos = 0  # Métrica: quantas vezes replanejou
+
+        # Animações: normal (vermelho) e assustado (azul), 2 quadros cada
+        self.restaurarImagens(sheet)
+
+    def _entrarNoArmazem(self, loja: ArmazemFantasmas) -> None:
+        self.loja = loja
+        self.i = loja.reservar(self)
+        self._rect = VisaoRetangulo(loja, self.i)
+
+    @property
+    def rect(self) -> VisaoRetangulo:
+        return self._rect
+
+    @rect.setter
+    def rect(self, rect) -> None:
+        self._rect.x = rect.x
+        self._rect.y = rect.y
+
+    @property
+    def direcao(self) -> tuple:
+        return self.loja.dirX[self.i], self.loja.dirY[self.i]
+
+    @direcao.setter
+    def direcao(self, direcao: tuple) -> None:
+        self.loja.dirX[self.i], self.loja.dirY[self.i] = direcao
+
+    @property
+    def posAnterior(self) -> tuple:
+        return self.loja.xAnterior[self.i], self.loja.yAnterior[self.i]
+
+    @posAnterior.setter
+    def posAnterior(self, posicao: tuple) -> None:
+        self.loja.xAnterior[self.i], self.loja.yAnterior[self.i] = posicao
+
+    @property
+    def alvoPlano(self):
+        if not self.loja.temAlvo[self.i]:
+            return None
+        return self.loja.alvoX[self.i], self.loja.alvoY[self.i]
+
+    @alvoPlano.setter
+    def alvoPlano(self, alvo) -> None:
+        self.loja.temAlvo[self.i] = alvo is not None
+        if alvo is not None:
+            self.loja.alvoX[self.i], self.loja.alvoY[self.i] = alvo
+
+    # Células que faltam do plano (uma cópia; para mudar, atribua outro plano)
+    @property
+    def plano(self) -> list:
+        inicio = self.i * CAPACIDADE_PLANO + self.loja.planoInicio[self.i]
+        fim = inicio + self.loja.planoTamanho[self.i]
+        return list(zip(self.loja.planoX[inicio:fim], self.loja.planoY[inicio:fim]))
+
+    # Planos maiores que CAPACIDADE_PLANO (de um save feito com outro
+    # PASSOS_PLANO) perdem o final, que seria replanejado de qualquer jeito
+    @plano.setter
+    def plano(self, celulas) -> None:
+        loja = self.loja
+        base = self.i * CAPACIDADE_PLANO
+        tamanho = 0
+        for x, y in celulas:
+            if tamanho == CAPACIDADE_PLANO:
+                break
+            loja.planoX[base + tamanho] = x
+            loja.planoY[base + tamanho] = y
+            tamanho += 1
+        loja.planoInicio[self.i] = 0
+        loja.planoTamanho[self.i] = tamanho
+
+    # Próxima célula do plano (None se acabou)
+    def proximoPasso(self):
+        if not self.loja.planoTamanho[self.i]:
+            return None
+        k = self.i * CAPACIDADE_PLANO + self.loja.planoInicio[self.i]
+        return self.loja.planoX[k], self.loja.planoY[k]
+
+    # Tira a próxima célula do plano e a retorna
+    def avancarPlano(self) -> tuple:
+        passo = self.proximoPasso()
+        self.loja.planoInicio[self.i] += 1
+        self.loja.planoTamanho[self.i] -= 1
+        return passo
+
+    # As sprites são as mesmas para o armazém inteiro
+    @property
+    def atlas(self):
+        return self.loja.atlas
+
+    @atlas.setter
+    def atlas(self, atlas) -> None:
+        self.loja.atlas = atlas
+
+    # O gerador dos sorteios é um só para o armazém inteiro
+    @property
+    def rng(self) -> random.Random:
+        return self.loja.rng
+
+    @rng.setter
+    def rng(self, rng: random.Random) -> None:
+        self.loja.rng = rng
+
+    @property
+    def imagem(self):
+        if self.atlas is None:
+            return None
+        return (self.atlas.assustado if self.assustado else self.atlas.fantasma)[
+            self.quadro
+        ]
 
     # Metodo para atualizar a sprite baseada no estado
     def atualizarSprite(self) -> None:
         self.animacaoIndex += self.animacaoSpeed
+        self.quadro = int(self.animacaoIndex) % QUADROS_FANTASMA
 
-        if self.assustado:
-            conjunto = self.framesAssustado
-        else:
-            conjunto = self.framesNormal
-
-        if conjunto:
-            idx = int(self.animacaoIndex) % len(conjunto)
-            self.imagem = conjunto[idx]
-
-    # Implementação do algoritmo BFS para encontrar o caminho até o pacman
-    def bfsProx(self, mapa: Mapa, alvoX: int, alvoY: int) -> None:
-        inicio = (self.xGrid, self.yGrid)
-        meta = (alvoX, alvoY)
-
-        # Se já está na posição do alvo, não faz nada
-        if inicio == meta:
+    # Próximo passo do caminho mais curto até o alvo. O BFS não roda mais aqui:
+    # a consulta vai para a tabela de caminhos pré-calculada do mapa
+    def bfsProx(self, mapa: Mapa, alvoX: int, alvoY: int):
+        if mapa.caminhos is None:
             return None
+        return mapa.caminhos.proximoPasso((self.xGrid, self.yGrid), (alvoX, alvoY))
+
+    # O plano continua valendo se o próximo passo é vizinho e livre, o modo
+    # (perseguir/fugir) não mudou e o Pacman não se afastou demais do alvo
+    def planoValido(self, mapa: Mapa, campo: CampoDistancia) -> bool:
+        if not self.loja.planoTamanho[self.i] or self.modoPlano != self.assustado:
+            return False
+        if self.alvoPlano is None or campo.origem is None:
+            return False
+        if not self.passoPossivel(mapa):
+            return False
+
+        deriva = abs(self.alvoPlano[0] - campo.origem[0]) + abs(
+            self.alvoPlano[1] - campo.origem[1]
+        )
+        return deriva <= TOLERANCIA_REPLANEJAR
+
+    # Verifica se o próximo passo do plano (mesmo velho) ainda pode ser dado
+    def passoPossivel(self, mapa: Mapa) -> bool:
+        passo = self.proximoPasso()
+        if passo is None:
+            return False
+        px, py = passo
+        if abs(px - self.xGrid) + abs(py - self.yGrid) != 1:
+            return False
+        return self.podeMover(mapa, px, py)
+
+    # Célula do próximo centro de tile no caminho do fantasma (a atual se
+    # ele já está centralizado). É de lá que um plano adiado deve partir.
+    def proximoCentro(self) -> tuple:
+        cx = self.rect.x // TILE_SIZE
+        cy = self.rect.y // TILE_SIZE
+        if self.rect.x % TILE_SIZE and self.direcao[0] > 0:
+            cx += 1
+        if self.rect.y % TILE_SIZE and self.direcao[1] > 0:
+            cy += 1
+        return cx, cy
 
-        fila = deque([inicio])
-        came_from = {inicio: None}
-        visitados = {inicio}
-
-        encontrou = False
-
-        while fila:
-            atual = fila.popleft()
-            if atual == meta:
-                encontrou = True
-                break
-
-            cx, cy = atual
-            vizinhos = [
-                (cx, cy - 1),
-                (cx, cy + 1),
-                (cx - 1, cy),
-                (cx + 1, cy),
-            ]  # Cima, Baixo, Esquerda, Direita
-
-            for nx, ny in vizinhos:
-                # Checa se o vizinho está dentro dos limites do mapa e é visitável
-                if (0 <= nx < mapa.col) and (0 <= ny < mapa.lin):
-                    if mapa.matriz[ny][nx] != "#" and (nx, ny) not in visitados:
-                        fila.append((nx, ny))
-                        visitados.add((nx, ny))
-                        came_from[(nx, ny)] = atual
-
-        if not encontrou:
-            return None  # Não encontrou caminho
-
-        # Reconstrói o caminho do alvo até o início
-        passo = meta
-        while came_from[passo] != inicio:
-            passo = came_from[passo]
-
-        return passo  # Retorna o próximo passo na direção do alvo
-
-    # Atualização do movimento do fantasma
-    def update(self, mapa: Mapa, pacman: Pacman) -> None:
+    # Verifica, antes de mover, se o fantasma vai precisar de um plano novo
+    def precisaPlano(self, mapa: Mapa, campo: CampoDistancia) -> bool:
+        return (
+            self.tempoPreso <= 0
+            and self.esta_centralizado()
+            and not self.planoValido(mapa, campo)
+        )
+
+    # Descarta o plano atual e monta outro a partir do campo compartilhado
+    def replanejar(self, mapa: Mapa, campo: CampoDistancia) -> None:
+        x, y = self.proximoCentro()
+        plano = campo.planejar(
+            x, y, self.direcao, self.assustado, self.preferencia, PASSOS_PLANO
+        )
+        self.receberPlano(mapa, plano, campo.origem, self.assustado)
+
+    # Adota um plano pronto (calculado aqui ou entregue pela IA assíncrona).
+    # Se o fantasma já andou por parte dele enquanto esperava, descarta esse trecho
+    def receberPlano(self, mapa: Mapa, plano: list, alvo: tuple, modo: bool) -> None:
+        x, y = self.proximoCentro()
+        if (x, y) in plano:
+            plano = plano[plano.index((x, y)) + 1 :]
+
+        if not plano:
+            # Fallback: Se não achar caminho, escolhe um vizinho aleatório válido
+            vizinhos = mapa.vizinhos(x, y)
+            if vizinhos:
+                plano = [self.rng.choice(vizinhos)]
+
+        self.plano = plano
+        self.alvoPlano = alvo
+        self.modoPlano = modo
+        self.replanejamentos += 1
+        Fantasma.totalReplanejamentos += 1
+
+    # Atualização do movimento do fantasma. Com um escalonador, o replanejamento
+    # é feito por ele (dentro do orçamento do quadro) e não aqui. A simulação
+    # usa ArmazemFantasmas.update, que faz o mesmo para todos de uma vez
+    def update(self, mapa: Mapa, campo: CampoDistancia, escalonador=None) -> None:
         # Atualiza a sprite antes de processar a lógica
         self.atualizarSprite()
         # Verifica se está preso
@@ -326,49 +697,26 @@ class Fantasma(Entidade):
             return  # Ainda preso na casa dos fantasmas
 
         # Verifica se está centralizado para decidir o próximo movimento
-        if self.esta_centralizado():
-            target_x = 0
-            target_y = 0
-
-            if self.assustado:
-                # --- MODO FUGIR ---
-                target_x = (self.xGrid * 2) - pacman.xGrid
-                target_y = (self.yGrid * 2) - pacman.yGrid
-            else:
-                # Calcula a "Distância de Manhattan" (soma das diferenças x e y)
-                distancia = abs(self.xGrid - pacman.xGrid) + abs(
-                    self.yGrid - pacman.yGrid
-                )
-
-                # --- MODO ATAQUE FINAL ---
-                if distancia < 5:
-                    target_x = pacman.xGrid
-                    target_y = pacman.yGrid
-                else:
-                    # --- MODO PERSEGUIR ---
-                    # Se estiver longe, mantém o offset para evitar empilhamento
-                    offset_x = (id(self) % 5) - 2
-                    offset_y = (id(self) % 3) - 1
-
-                    target_x = pacman.xGrid + offset_x
-                    target_y = pacman.yGrid + offset_y
-
-            # --- SEGURANÇA (CLAMP) ---
-            target_x = max(0, min(target_x, mapa.col - 1))
-            target_y = max(0, min(target_y, mapa.lin - 1))
-
-            # --- BUSCA DO CAMINHO ---
-            prox = self.bfsProx(mapa, target_x, target_y)
-
-            if prox:
-                px, py = prox
-                dx = px - self.xGrid
-                dy = py - self.yGrid
-                self.direcao = (dx, dy)
-            else:
-                # Fallback: Se não achar caminho, escolhe um vizinho aleatório válido
-                vizinhos = mapa.vizinhos(self.xGrid, self.yGrid)
-                if vizinhos:
-                    px, py = random.choice(vizinhos)
-                    self.direcao = (px - self.xGrid, py - self.yGrid)
+        if self.esta_centralizado() and not self.decidir(mapa, campo, escalonador):
+            return
         self.mover_fisica()
+
+    # Escolhe a direção no centro do tile. Retorna False se o fantasma deve
+    # esperar parado neste tick
+    def decidir(self, mapa: Mapa, campo: CampoDistancia, escalonador=None) -> bool:
+        # Segue o plano atual e só replaneja se ele acabou ou ficou velho
+        valido = self.planoValido(mapa, campo)
+        if not valido and escalonador is None:
+            self.replanejar(mapa, campo)
+            valido = self.loja.planoTamanho[self.i] > 0
+
+        if valido or self.passoPossivel(mapa):
+            # Sem plano novo ainda, segue o antigo enquanto ele for possível
+            px, py = self.avancarPlano()
+            self.direcao = (px - self.xGrid, py - self.yGrid)
+            return True
+
+        # Decisão adiada: mantém a direção atual ou espera se bater na parede
+        novaX = self.xGrid + self.direcao[0]
+        novaY = self.yGrid + self.direcao[1]
+        return self.podeMover(mapa, novaX, novaY)
@@ -0,0 +1,274 @@
+import array
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import config as cfg
+from caminhos import DIRECOES, FATOR_LIMITE_PLANO, INFINITO
+
+
+# Escalonador da IA dos fantasmas. Os replanejamentos pedidos num quadro são
+# executados em ordem (round-robin) até estourar o orçamento de tempo; os que
+# sobrarem ficam para o próximo quadro, na frente da fila. Enquanto esperam,
+# os fantasmas seguem na direção atual.
+class EscalonadorIA:
+    def __init__(self, orcamentoUs: int) -> None:
+        self.orcamentoNs = orcamentoUs * 1000
+        self.fila = deque()  # Fantasmas esperando um plano novo
+        self.pendentes = set()  # ids dos fantasmas na fila (evita duplicatas)
+
+        # Métricas para ajustar o orçamento
+        self.quadros = 0
+        self.decisoes = 0  # Replanejamentos executados
+        self.adiamentos = 0  # Soma, por quadro, dos pedidos que ficaram para depois
+        self.estouros = 0  # Quadros em que a IA passou do orçamento
+        self.maiorQuadroUs = 0
+
+    # Coloca o fantasma no fim da fila, se ele ainda não estiver nela
+    def solicitar(self, fantasma) -> None:
+        if id(fantasma) not in self.pendentes:
+            self.pendentes.add(id(fantasma))
+            self.fila.append(fantasma)
+
+    # Executa os replanejamentos que couberem no orçamento deste quadro.
+    # Pelo menos um é feito por quadro para a fila nunca travar. Com o serviço
+    # assíncrono, os pedidos são só enviados aos processos, e os fantasmas
+    # continuam pendentes até a resposta chegar.
+    def executar(self, mapa, campo, servico=None) -> None:
+        inicio = time.perf_counter_ns()
+        gasto = 0
+        feitos = 0
+
+        if servico is not None:
+            for fantasma in servico.coletar(mapa):
+                self.pendentes.discard(id(fantasma))
+
+        while self.fila:
+            if feitos > 0 and gasto >= self.orcamentoNs:
+                break
+            fantasma = self.fila.popleft()
+            enviado = False
+            if servico is not None and campo.origem is not None:
+                enviado = servico.enviar(fantasma, campo)
+            if not enviado:
+                self.pendentes.discard(id(fantasma))
+                fantasma.replanejar(mapa, campo)
+            feitos += 1
+            gasto = time.perf_counter_ns() - inicio
+
+        self.quadros += 1
+        self.decisoes += feitos
+        self.adiamentos += len(self.fila)
+        if gasto > self.orcamentoNs:
+            self.estouros += 1
+        self.maiorQuadroUs = max(self.maiorQuadroUs, gasto // 1000)
+
+    # Resumo das métricas para ajuste do orçamento
+    def relatorio(self) -> str:
+        return (
+            f"IA: {self.quadros} quadros, {self.decisoes} decisões, "
+            f"{self.adiamentos} adiamentos, {self.estouros} estouros, "
+            f"pior quadro {self.maiorQuadroUs} us"
+        )
+
+
+# --- LADO DOS PROCESSOS TRABALHADORES ---
+
+_memoria = None  # Segmento de memória compartilhada com a grade
+_grade = None  # Visão da grade: 1 = livre, 0 = parede (só leitura aqui)
+_dimensoes = (0, 0)
+_ultimoCampo = (None, None)  # ((versão, alvo), distâncias) do último BFS
+
+
+def _iniciarTrabalhador(nome: str, lin: int, col: int) -> None:
+    global _memoria, _grade, _dimensoes
+    try:
+        # Quem cria e apaga o segmento é o jogo, não o trabalhador
+        _memoria = shared_memory.SharedMemory(name=nome, track=False)
+    except TypeError:  # Python < 3.13
+        _memoria = shared_memory.SharedMemory(name=nome)
+    _grade = _memoria.buf
+    _dimensoes = (lin, col)
+
+
+def _livre(x: int, y: int) -> bool:
+    lin, col = _dimensoes
+    return 0 <= x < col and 0 <= y < lin and _grade[y * col + x] == 1
+
+
+# BFS a partir do alvo. Vários fantasmas costumam pedir o mesmo alvo em
+# seguida, então o último campo calculado fica guardado
+def _campo(versao: int, alvo: tuple):
+    global _ultimoCampo
+    chave = (versao, alvo)
+    if _ultimoCampo[0] == chave:
+        return _ultimoCampo[1]
+
+    lin, col = _dimensoes
+    dist = array.array("H", [INFINITO]) * (lin * col)
+    if _livre(*alvo):
+        dist[alvo[1] * col + alvo[0]] = 0
+        fila = deque([alvo])
+        while fila:
+            x, y = fila.popleft()
+            dViz = dist[y * col + x] + 1
+            for dx, dy in DIRECOES:
+                nx, ny = x + dx, y + dy
+                if _livre(nx, ny) and dist[ny * col + nx] == INFINITO:
+                    dist[ny * col + nx] = dViz
+                    fila.append((nx, ny))
+
+    _ultimoCampo = (chave, dist)
+    return dist
+
+
+# Mesmo plano do CampoDistancia.planejar, mas sobre a grade compartilhada:
+# uma célula é junção quando o número de saídas livres é diferente de 2
+def _planejarRemoto(
+    versao: int,
+    origem: tuple,
+    direcao: tuple,
+    alvo: tuple,
+    fugindo: bool,
+    preferencia: int,
+    passos: int,
+):
+    col = _dimensoes[1]
+    dist = _campo(versao, alvo)
+
+    def distancia(x, y):
+        return dist[y * col + x] if _livre(x, y) else INFINITO
+
+    # Ordem de desempate do fantasma, como em CampoDistancia._vizinhos
+    ordem = [DIRECOES[(i + preferencia) % 4] for i in range(4)]
+
+    x, y = origem
+    plano = []
+    while len(plano) < passos * FATOR_LIMITE_PLANO:
+        saidas = [d for d in ordem if _livre(x + d[0], y + d[1])]
+        juncao = len(saidas) != 2
+        if len(plano) >= passos and juncao:
+            break
+
+        reverso = (-direcao[0], -direcao[1])
+        proxima = None
+        if direcao != (0, 0) and not juncao:
+            proxima = next((d for d in saidas if d != reverso), None)
+        if proxima is None:
+            if fugindo:
+                candidatas = [d for d in saidas if d != reverso] or [
+                    d for d in saidas if d == reverso
+                ]
+                if candidatas:
+                    proxima = max(
+                        candidatas, key=lambda d: distancia(x + d[0], y + d[1])
+                    )
+            else:
+                atual = distancia(x, y)
+                melhor = min(
+                    saidas, key=lambda d: distancia(x + d[0], y + d[1]), default=None
+                )
+                if melhor and distancia(x + melhor[0], y + melhor[1]) < atual:
+                    proxima = melhor
+        if proxima is None:
+            break
+
+        x += proxima[0]
+        y += proxima[1]
+        direcao = proxima
+        plano.append((x, y))
+        if not fugindo and (x, y) == alvo:
+            break
+    return versao, plano
+
+
+# --- LADO DO JOGO ---
+
+
+# Serviço de caminhos em processos separados para mapas muito grandes. Os
+# trabalhadores leem uma cópia da grade em memória compartilhada; o jogo nunca
+# espera por eles: pedidos são enviados e as respostas recolhidas quando
+# estiverem prontas, e o fantasma segue o plano antigo enquanto isso.
+class ServicoCaminhosAssincrono:
+    def __init__(self, mapa, trabalhadores: int) -> None:
+        self.mapa = mapa
+        n = max(mapa.lin * mapa.col, 1)
+        self.memoria = shared_memory.SharedMemory(create=True, size=n)
+        self.memoria.buf[: len(mapa.caminhos.livre)] = mapa.caminhos.livre
+        self.versao = mapa.versaoParedes
+        mapa.adicionarObservador(self.aoAlterarMapa)
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=trabalhadores,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciarTrabalhador,
+            initargs=(self.memoria.name, mapa.lin, mapa.col),
+        )
+        self.emAndamento = {}  # Future -> (fantasma, alvo, modo)
+        self.ativo = True
+
+        # Métricas
+        self.enviados = 0
+        self.descartados = 0  # Respostas calculadas com uma grade antiga
+
+    # Mantém a grade compartilhada igual à do mapa. Respostas de pedidos
+    # feitos antes da mudança são descartadas pela versão
+    def aoAlterarMapa(self, x: int, y: int, antigo: str, novo: str) -> None:
+        if (antigo == "#") == (novo == "#"):
+            return
+        self.memoria.buf[y * self.mapa.col + x] = 0 if novo == "#" else 1
+        self.versao = self.mapa.versaoParedes
+
+    # Envia o pedido de plano. Retorna False se o serviço não está disponível
+    # (processos morreram), e aí o escalonador planeja no próprio jogo
+    def enviar(self, fantasma, campo) -> bool:
+        if not self.ativo:
+            return False
+        try:
+            futuro = self.pool.submit(
+                _planejarRemoto,
+                self.versao,
+                fantasma.proximoCentro(),
+                fantasma.direcao,
+                campo.origem,
+                fantasma.assustado,
+                fantasma.preferencia,
+                cfg.PASSOS_PLANO,
+            )
+        except BrokenProcessPool as e:
+            print(f"Serviço de caminhos indisponível, usando a IA local: {e}")
+            self.ativo = False
+            return False
+
+        self.emAndamento[futuro] = (fantasma, campo.origem, fantasma.assustado)
+        self.enviados += 1
+        return True
+
+    # Entrega os planos prontos sem bloquear. Retorna os fantasmas atendidos
+    # (inclusive os de respostas descartadas, que podem pedir de novo)
+    def coletar(self, mapa) -> list:
+        atendidos = []
+        for futuro in [f for f in self.emAndamento if f.done()]:
+            fantasma, alvo, modo = self.emAndamento.pop(futuro)
+            atendidos.append(fantasma)
+            try:
+                versao, plano = futuro.result()
+            except Exception as e:
+                print(f"Erro no serviço de caminhos: {e}")
+                continue
+            if versao != self.versao:
+                self.descartados += 1
+                continue
+            fantasma.receberPlano(mapa, plano, alvo, modo)
+        return atendidos
+
+    def encerrar(self) -> None:
+        self.ativo = False
+        self.mapa.removerObservador(self.aoAlterarMapa)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.emAndamento = {}
+        self.memoria.close()
+        self.memoria.unlink()
@@ -1,10 +1,25 @@
 from abc import ABC, abstractmethod
 import config as cfg
 from mapa import Mapa
-from entidades import Pacman, Fantasma
+from entidades import Pacman
+from renderizacao import CamadasMapa, FonteCache, superficieMiniatura
+from simulacao import DERROTA, VITORIA, Simulacao
+import salvamento  # Formato dos saves
+import catalogo  # Índice dos saves para o menu de load
+from catalogo import Catalogo
+from autosave import Autosave
+from placar import Placar
 import pygame  # Para a GUI
-import pickle  # Para salvar
 import os  # Para funcionalidades do sistema, como listar diretórios
+import time  # Para o passo fixo da simulação
+
+# Teclas de movimento do Pacman
+TECLAS_DIRECAO = {
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+}
 
 
 # Classe Abstrata (Modelo)
@@ -85,7 +100,8 @@ class EstadoPause(Estado):
                 self.jogo.mudarEstado(EstadoSalvar(self.jogo))
 
             elif evento.key == pygame.K_q:
-                # Sai para o menu principal
+                # Sai para o menu principal (a partida abandonada não volta)
+                self.jogo.descartarAutosave()
                 self.jogo.mudarEstado(EstadoMenu(self.jogo))
 
     def update(self):
@@ -110,6 +126,12 @@ class EstadoPause(Estado):
             self.jogo.tela.blit(txt, rectOp)
             y += 40
 
+        # Andamento do save feito pela thread de disco
+        if self.jogo.mensagemSave:
+            txt = self.jogo.fonte.render(self.jogo.mensagemSave, True, cfg.AZUL)
+            rectMsg = txt.get_rect(center=(self.jogo.larguraTela // 2, y + 20))
+            self.jogo.tela.blit(txt, rectMsg)
+
         pygame.display.flip()
 
 
@@ -156,39 +178,77 @@ class EstadoSalvar(Estado):
 
 
 class EstadoSeletorLoad(Estado):
+    ALTURA_LINHA = 40
+    ORDENS = list(catalogo.ORDENS)
+
     def __init__(self, jogo):
         super().__init__(jogo)
         self.diretorio = "saves"
         if not os.path.exists(self.diretorio):
             os.makedirs(self.diretorio)
 
+        # Só o índice é lido, não os saves (ver catalogo.py)
         try:
-            self.arquivos = [
-                f for f in os.listdir(self.diretorio) if f.endswith(".pkl")
-            ]
-            self.arquivos.sort()
-        except Exception:
-            self.arquivos = []
+            self.catalogo = Catalogo(self.diretorio).carregar()
+        except Exception as e:
+            print(f"Erro ao ler o índice dos saves: {e}")
+            self.catalogo = Catalogo(self.diretorio)
+        self.ordem = "data"
+        self.slots = self.catalogo.ordenados(self.ordem)
+        self.miniaturas = {}  # arquivo -> superfície, só das linhas já vistas
 
         self.indexSelecionado = 0
+        self.carregando = None  # Future da leitura em andamento
+        self.erro = None  # Mensagem da última leitura que falhou
+
+    # Quantos saves cabem numa página da tela
+    def porPagina(self) -> int:
+        return max(1, (self.jogo.alturaTela - 150) // self.ALTURA_LINHA)
 
     def processar_eventos(self, evento):
         if evento.type == pygame.KEYDOWN:
             if evento.key == pygame.K_ESCAPE:
+                # Uma leitura em andamento é só abandonada
                 self.jogo.mudarEstado(EstadoMenu(self.jogo))
+            elif self.carregando or not self.slots:
+                pass  # Espera a leitura terminar
             elif evento.key == pygame.K_UP:
-                self.indexSelecionado = (self.indexSelecionado - 1) % len(self.arquivos)
+                self.indexSelecionado = (self.indexSelecionado - 1) % len(self.slots)
             elif evento.key == pygame.K_DOWN:
-                self.indexSelecionado = (self.indexSelecionado + 1) % len(self.arquivos)
+                self.indexSelecionado = (self.indexSelecionado + 1) % len(self.slots)
+            elif evento.key in (pygame.K_PAGEUP, pygame.K_LEFT):
+                self.indexSelecionado = max(self.indexSelecionado - self.porPagina(), 0)
+            elif evento.key in (pygame.K_PAGEDOWN, pygame.K_RIGHT):
+                self.indexSelecionado = min(
+                    self.indexSelecionado + self.porPagina(), len(self.slots) - 1
+                )
+            elif evento.key == pygame.K_TAB:
+                # Troca a ordem mantendo o mesmo save selecionado
+                selecionado = self.slots[self.indexSelecionado]
+                proxima = (self.ORDENS.index(self.ordem) + 1) % len(self.ORDENS)
+                self.ordem = self.ORDENS[proxima]
+                self.slots = self.catalogo.ordenados(self.ordem)
+                self.indexSelecionado = self.slots.index(selecionado)
             elif evento.key == pygame.K_RETURN:
-                if self.arquivos:
-                    arquivo = self.arquivos[self.indexSelecionado]
-                    if self.jogo.carregarJogo(arquivo):
-                        # Se carregar com sucesso, o metodo carregarJogo já define o estado
-                        pass
+                arquivo = self.slots[self.indexSelecionado]["arquivo"]
+                self.carregando = self.jogo.carregarJogo(arquivo)
+                self.erro = None if self.carregando else "Arquivo não encontrado."
 
     def update(self):
-        pass
+        # Quando a leitura termina, concluirCarregamento já define o estado
+        if self.carregando and self.carregando.done():
+            futuro, self.carregando = self.carregando, None
+            if not self.jogo.concluirCarregamento(futuro):
+                self.erro = "Erro ao carregar o save."
+
+    def miniatura(self, slot):
+        if slot["miniatura"] is None:
+            return None
+        superficie = self.miniaturas.get(slot["arquivo"])
+        if superficie is None:
+            superficie = superficieMiniatura(slot["miniatura"], 1)
+            self.miniaturas[slot["arquivo"]] = superficie
+        return superficie
 
     def desenhar(self):
         self.jogo.tela.fill(cfg.PRETO)
@@ -197,19 +257,51 @@ class EstadoSeletorLoad(Estado):
         rectT = titulo.get_rect(center=(self.jogo.larguraTela // 2, 50))
         self.jogo.tela.blit(titulo, rectT)
 
-        if not self.arquivos:
+        if not self.slots:
             msg = self.jogo.fonte.render("Nenhum save encontrado.", True, cfg.VERMELHO)
             self.jogo.tela.blit(msg, (50, 100))
+            pygame.display.flip()
             return
 
-        y = 100
-        for i, arq in enumerate(self.arquivos):
+        # Só a página do save selecionado é desenhada
+        porPagina = self.porPagina()
+        pagina = self.indexSelecionado // porPagina
+        inicio = pagina * porPagina
+        y = 90
+        for i, slot in enumerate(self.slots[inicio : inicio + porPagina], inicio):
+            miniatura = self.miniatura(slot)
+            if miniatura:
+                self.jogo.tela.blit(miniatura, (20, y))
+
             cor = cfg.AMARELO if i == self.indexSelecionado else cfg.BRANCO
-            txt = f"> {arq}" if i == self.indexSelecionado else arq
+            txt = slot["arquivo"][: -len(salvamento.EXTENSAO)]
+            if i == self.indexSelecionado:
+                txt = f"> {txt}"
+            if slot["nomeMapa"]:
+                data = time.strftime("%d/%m %H:%M", time.localtime(slot["data"]))
+                txt += (
+                    f"  {slot['nomeMapa'][:-4]}  {slot['pontos']} pts"
+                    f"  {slot['vidas']} vidas  {data}"
+                )
             render = self.jogo.fonte.render(txt, True, cor)
-            rect = render.get_rect(center=(self.jogo.larguraTela // 2, y))
-            self.jogo.tela.blit(render, rect)
-            y += 40
+            self.jogo.tela.blit(render, (64, y + 8))
+            y += self.ALTURA_LINHA
+
+        paginas = (len(self.slots) + porPagina - 1) // porPagina
+        rodape = self.jogo.fonte.render(
+            f"Página {pagina + 1}/{paginas}  TAB: ordem ({self.ordem})",
+            True,
+            cfg.AZUL,
+        )
+        self.jogo.tela.blit(rodape, (20, self.jogo.alturaTela - 30))
+
+        if self.carregando:
+            pontos = "." * (pygame.time.get_ticks() // 300 % 4)
+            msg = self.jogo.fonte.render(f"Carregando{pontos}", True, cfg.AZUL)
+            self.jogo.tela.blit(msg, (20, self.jogo.alturaTela - 60))
+        elif self.erro:
+            msg = self.jogo.fonte.render(self.erro, True, cfg.VERMELHO)
+            self.jogo.tela.blit(msg, (20, self.jogo.alturaTela - 60))
 
         pygame.display.flip()
 
@@ -219,6 +311,8 @@ class EstadoNome(Estado):
         super().__init__(jogo)
         self.score = score
         self.nome = ""
+        # Onde a partida entra no ranking da fase (consulta feita uma vez só)
+        self.posicao = self.jogo.placar.posicao(score, self.jogo.nomeMapaAtual)
 
     def processar_eventos(self, evento):
         if evento.type == pygame.KEYDOWN:
@@ -247,11 +341,19 @@ class EstadoNome(Estado):
         rect2 = nome_txt.get_rect(center=(self.jogo.larguraTela // 2, 260))
         self.jogo.tela.blit(nome_txt, rect2)
 
+        posicao = self.jogo.fonte.render(
+            f"{self.score} pontos: {self.posicao}º lugar em {self.jogo.nomeMapaAtual}",
+            True,
+            cfg.AZUL,
+        )
+        rect3 = posicao.get_rect(center=(self.jogo.larguraTela // 2, 300))
+        self.jogo.tela.blit(posicao, rect3)
+
         msg = self.jogo.fonte.render(
             "Pressione ENTER para confirmar", True, cfg.VERMELHO
         )
-        rect3 = msg.get_rect(center=(self.jogo.larguraTela // 2, 320))
-        self.jogo.tela.blit(msg, rect3)
+        rect4 = msg.get_rect(center=(self.jogo.larguraTela // 2, 360))
+        self.jogo.tela.blit(msg, rect4)
 
         pygame.display.flip()
 
@@ -362,10 +464,45 @@ class EstadoMenu(Estado):
 
 
 class EstadoRanking(Estado):
+    ALTURA_LINHA = 30
+
+    def __init__(self, jogo):
+        super().__init__(jogo)
+        self.filtros = [None] + self.jogo.placar.mapas()  # None = todos os mapas
+        self.filtro = 0
+        self.pagina = 0
+        self.consultar()
+
+    # Quantas pontuações cabem numa página da tela
+    def porPagina(self) -> int:
+        return max(1, (self.jogo.alturaTela - 210) // self.ALTURA_LINHA)
+
+    # Lê do placar só a página mostrada (não a cada quadro)
+    def consultar(self) -> None:
+        mapa = self.filtros[self.filtro]
+        self.total = self.jogo.placar.total(mapa)
+        self.paginas = max(1, -(-self.total // self.porPagina()))
+        self.pagina = min(self.pagina, self.paginas - 1)
+        self.linhas = self.jogo.placar.topo(
+            self.porPagina(), self.pagina * self.porPagina(), mapa
+        )
+
     def processar_eventos(self, evento):
         if evento.type == pygame.KEYDOWN:
             if evento.key == pygame.K_ESCAPE:
                 self.jogo.mudarEstado(EstadoMenu(self.jogo))
+            elif evento.key in (pygame.K_DOWN, pygame.K_PAGEDOWN):
+                self.pagina = min(self.pagina + 1, self.paginas - 1)
+                self.consultar()
+            elif evento.key in (pygame.K_UP, pygame.K_PAGEUP):
+                self.pagina = max(self.pagina - 1, 0)
+                self.consultar()
+            elif evento.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                # Troca o mapa do ranking
+                passo = 1 if evento.key == pygame.K_RIGHT else -1
+                self.filtro = (self.filtro + passo) % len(self.filtros)
+                self.pagina = 0
+                self.consultar()
 
     def update(self):
         pass
@@ -373,7 +510,10 @@ class EstadoRanking(Estado):
     def desenhar(self):
         self.jogo.tela.fill(cfg.PRETO)
 
-        titulo = self.jogo.fonte.render("RANKING", True, cfg.AMARELO)
+        mapa = self.filtros[self.filtro]
+        titulo = self.jogo.fonte.render(
+            f"RANKING - {mapa or 'Geral'}", True, cfg.AMARELO
+        )
         rect = titulo.get_rect(center=(self.jogo.larguraTela // 2, 60))
         self.jogo.tela.blit(titulo, rect)
 
@@ -383,15 +523,28 @@ class EstadoRanking(Estado):
         self.jogo.tela.blit(header, rectH)
 
         y = 140
-        for i, (nome, pontos, mapaNome) in enumerate(self.jogo.scores):
+        inicio = self.pagina * self.porPagina()
+        for i, (nome, pontos, mapaNome) in enumerate(self.linhas, inicio):
             # Formatação simples para alinhar
             textoStr = f"{i + 1}. {nome} - {pontos} - {mapaNome}"
             texto = self.jogo.fonte.render(textoStr, True, cfg.BRANCO)
             rect = texto.get_rect(center=(self.jogo.larguraTela // 2, y))
             self.jogo.tela.blit(texto, rect)
-            y += 30
+            y += self.ALTURA_LINHA
 
-        msg = self.jogo.fonte.render("Pressione ESC para voltar", True, cfg.VERMELHO)
+        pagina = self.jogo.fonte.render(
+            f"Página {self.pagina + 1}/{self.paginas} ({self.total} partidas)",
+            True,
+            cfg.AZUL,
+        )
+        rect = pagina.get_rect(
+            center=(self.jogo.larguraTela // 2, self.jogo.alturaTela - 70)
+        )
+        self.jogo.tela.blit(pagina, rect)
+
+        msg = self.jogo.fonte.render(
+            "Setas: página/mapa  ESC: voltar", True, cfg.VERMELHO
+        )
         rect = msg.get_rect(
             center=(self.jogo.larguraTela // 2, self.jogo.alturaTela - 40)
         )
@@ -447,168 +600,121 @@ class EstadoGameOver(Estado):
         pygame.display.flip()
 
     def reiniciar_jogo(self):
-        # Recarrega o mapa
-        self.jogo.mudarEstado(EstadoJogo(self.jogo, self.jogo.nomeMapaAtual))
-
-        # Reset do Pacman
-        px, py = self.jogo.mapa.posicaoInicialPacman
-        self.jogo.pacman = Pacman(px, py, self.jogo.folhaSprites)
-
-        # Reset dos fantasmas
-        self.jogo.fantasmas = []
-        for fx, fy in self.jogo.mapa.posicaoInicialFantasmas:
-            self.jogo.fantasmas.append(Fantasma(fx, fy, self.jogo.folhaSprites))
-
-        # Reset powerups e status
-        self.jogo.powerupAtivo = False
-        self.jogo.powerupTimer = 0
-
-        # VOLTA ao estado de jogo
+        # Recarrega o mapa (o nível cria Pacman, fantasmas e zera o powerup)
         self.jogo.mudarEstado(EstadoJogo(self.jogo, self.jogo.nomeMapaAtual))
 
 
 # Estado de Gameplay
 class EstadoJogo(Estado):
-    def __init__(self, jogo, arquivoMapa):
+    # Com novoNivel=False o estado continua a simulação que já está no jogo
+    # (vinda de um save) em vez de carregar a fase do começo
+    def __init__(self, jogo, arquivoMapa, novoNivel: bool = True):
         super().__init__(jogo)
         # Carrega o nível utilizando o metodo da classe jogo
-        self.jogo.carregarNivel(arquivoMapa)
+        if novoNivel:
+            self.jogo.carregarNivel(arquivoMapa)
+        self.entrada = None  # Direção pedida pelo jogador desde o último tick
+        self.camadas = None  # Paredes e pontos já desenhados (ver renderizacao.py)
+        self.sujos = []  # Áreas ocupadas pelas entidades no último quadro
+        self.hud = None  # (pontos, vidas) mostrados no HUD
 
     def processar_eventos(self, evento):
         if evento.type == pygame.KEYDOWN:
             if evento.key == pygame.K_p:
                 # Salva a referência deste estado para voltar depois
                 self.jogo.estadoAnterior = self
+                if not self.jogo.salvamentos:
+                    self.jogo.mensagemSave = ""  # Mensagem de um pause anterior
                 self.jogo.mudarEstado(EstadoPause(self.jogo))
-            else:
-                self.jogo.pacman.processarEvento(evento.key)
+            elif evento.key in TECLAS_DIRECAO:
+                self.entrada = TECLAS_DIRECAO[evento.key]
 
     def update(self):
-        # Acessa pacman e mapa através de self.jogo
-        self.jogo.pacman.update(self.jogo.mapa)
-
-        for fantasma in self.jogo.fantasmas:
-            fantasma.update(self.jogo.mapa, self.jogo.pacman)
+        # Toda a regra do jogo está na simulação; aqui só entra a tecla e
+        # sai a troca de tela quando a partida termina
+        sim = self.jogo.sim
+        eventos = sim.step(self.entrada)
+        self.entrada = None
+        if self.jogo.autosave:
+            self.jogo.autosave.registrar(sim, eventos)
+
+        # Relatório periódico do escalonador da IA (para ajustar o orçamento)
+        if (
+            cfg.RELATORIO_IA_QUADROS
+            and sim.escalonador
+            and sim.ticks % cfg.RELATORIO_IA_QUADROS == 0
+        ):
+            print(sim.escalonador.relatorio())
+
+        if sim.estado == VITORIA:
+            self.jogo.descartarAutosave()
+            self.jogo.mudarEstado(EstadoVitoria(self.jogo))
+        elif sim.estado == DERROTA:
+            self.jogo.descartarAutosave()
+            self.jogo.mudarEstado(EstadoNome(self.jogo, self.jogo.pacman.pontos))
 
-            # Colisão (usando colisão de retângulos do Pygame)
-            hitbox_pacman = self.jogo.pacman.rect.inflate(-10, -10)
-            hitbox_fantasma = fantasma.rect.inflate(-10, -10)
-
-            if hitbox_pacman.colliderect(hitbox_fantasma):
-                # Se o PACMAN estiver invencível, ignorar colisões
-                if self.jogo.pacman.invencivel:
-                    continue
+    def desenhar(self) -> None:
+        # Variável auxiliar para a altura da barra de score/vidas
+        offsetY = cfg.TILE_SIZE
 
-                if fantasma.assustado:
-                    # Pacman come o fantasma
-                    self.jogo.pacman.pontos += 200
-                    fantasma.rect.x = fantasma.xInicio * cfg.TILE_SIZE
-                    fantasma.rect.y = fantasma.yInicio * cfg.TILE_SIZE
-                    fantasma.assustado = False
-                    fantasma.tempoPreso = 150
+        # Camadas pré-desenhadas do mapa, refeitas se o mapa trocou
+        if self.camadas is None or self.camadas.mapa is not self.jogo.mapa:
+            if self.camadas:
+                self.camadas.encerrar()
+            self.camadas = CamadasMapa(self.jogo.mapa)
+            self.jogo.telaCompleta = True
 
-                else:
-                    # Perde vida
-                    self.jogo.pacman.vidas -= 1
-
-                    # Se acabou as vidas → GAME OVER
-                    if self.jogo.pacman.vidas <= 0:
-                        self.jogo.mudarEstado(
-                            EstadoNome(self.jogo, self.jogo.pacman.pontos)
-                        )
-                        return
-
-                    # SENÃO → reset posição
-                    self.jogo.pacman.rect.x = self.jogo.pacman.xInicio * cfg.TILE_SIZE
-                    self.jogo.pacman.rect.y = self.jogo.pacman.yInicio * cfg.TILE_SIZE
-
-                    self.jogo.pacman.direcao = (0, 0)
-                    self.jogo.pacman.proximaDirecao = (0, 0)
-
-                    # Ativa invencibilidade temporária
-                    self.jogo.pacman.invencivel = True
-                    self.jogo.pacman.invencivelTimer = 120  # 2 segundos (60 fps)
-
-            # Lógica de comer pontos (baseada na grade)
-            if self.jogo.pacman.esta_centralizado():
-                px, py = self.jogo.pacman.getPosGrad()
-                # Verifica limites para evitar sair do mapa
-                if 0 <= py < self.jogo.mapa.lin and 0 <= px < self.jogo.mapa.col:
-                    item = self.jogo.mapa.matriz[py][px]
-
-                    if item == ".":
-                        self.jogo.mapa.matriz[py][px] = " "
-                        self.jogo.pacman.pontos += 10
-                        self.jogo.mapa.pontosRestantes -= 1  # Decrementa
-
-                    elif item == "0":  # POWERUP
-                        self.jogo.mapa.matriz[py][px] = " "
-                        self.jogo.pacman.pontos += 50
-                        self.jogo.mapa.pontosRestantes -= 1  # Decrementa
-
-                        # Ativa powerup (no objeto jogo)
-                        self.jogo.powerupAtivo = True
-                        self.jogo.powerupTimer = 15 * 60
-
-                        # Deixa todos os fantasmas assustados
-                        for f in self.jogo.fantasmas:
-                            f.assustado = True
-                            f.speed = 1  # mais lentos
-
-                    # --- Verifica a vitoria ---
-                    if self.jogo.mapa.pontosRestantes <= 0:
-                        # Adiciona um bônus por completar a fase
-                        self.jogo.pacman.pontos += 1000
-                        self.jogo.mudarEstado(EstadoVitoria(self.jogo))
-                        return  # Para o update atual
-
-            # Timer do powerup
-            if self.jogo.powerupAtivo:
-                self.jogo.powerupTimer -= 1
-                if self.jogo.powerupTimer <= 0:
-                    self.jogo.powerupAtivo = False
-                    for f in self.jogo.fantasmas:
-                        f.assustado = False
-                        f.speed = cfg.VELOCIDADE - 1  # velocidade normal
-
-            self.desenhar()
+        if self.jogo.telaCompleta or not cfg.RETANGULOS_SUJOS:
+            self.desenharCompleto(offsetY)
+        else:
+            self.desenharSujos(offsetY)
 
-    def desenhar(self) -> None:
+    # Redesenha a tela inteira e faz o flip
+    def desenharCompleto(self, offsetY: int) -> None:
         # Limpa a Tela usando self.jogo.tela
         self.jogo.tela.fill(cfg.PRETO)
+        self.camadas.desenhar(self.jogo.tela, offsetY)
+        self.camadas.alterados.clear()
 
-        # Variável auxiliar para a altura da barra de score/vidas
-        offsetY = cfg.TILE_SIZE
+        self.sujos = self.desenharEntidades(offsetY)
+        self.desenharHUD()
 
-        # Desenha o mapa
-        for i in range(self.jogo.mapa.lin):
-            for j in range(self.jogo.mapa.col):
-                char = self.jogo.mapa.matriz[i][j]
-
-                x = j * cfg.TILE_SIZE
-                y = i * cfg.TILE_SIZE + offsetY
-
-                if char == "#":
-                    pygame.draw.rect(
-                        self.jogo.tela, cfg.AZUL, (x, y, cfg.TILE_SIZE, cfg.TILE_SIZE)
-                    )
-                elif char == ".":
-                    pygame.draw.circle(
-                        self.jogo.tela,
-                        cfg.BRANCO,
-                        (x + cfg.TILE_SIZE // 2, y + cfg.TILE_SIZE // 2),
-                        4,
-                    )
-                elif char == "0":
-                    pygame.draw.circle(
-                        self.jogo.tela,
-                        cfg.BRANCO,
-                        (x + cfg.TILE_SIZE // 2, y + cfg.TILE_SIZE // 2),
-                        8,
-                    )
+        pygame.display.flip()
+        self.jogo.telaCompleta = False
+
+    # Modo de retângulos sujos: apaga as entidades do quadro anterior com a
+    # camada do mapa, redesenha os tiles alterados, o HUD se mudou e as
+    # entidades, e envia para a tela só essas áreas
+    def desenharSujos(self, offsetY: int) -> None:
+        tela = self.jogo.tela
+        atualizar = []
+        for area in self.sujos:
+            atualizar.append(self.camadas.restaurar(tela, area, offsetY))
+        for tile in self.camadas.alterados:
+            atualizar.append(
+                self.camadas.restaurar(tela, tile.move(0, offsetY), offsetY)
+            )
+        self.camadas.alterados.clear()
+
+        hud = (self.jogo.pacman.pontos, self.jogo.pacman.vidas)
+        if hud != self.hud:
+            barra = pygame.Rect(0, 0, self.jogo.larguraTela, offsetY)
+            tela.fill(cfg.PRETO, barra)
+            self.desenharHUD()
+            atualizar.append(barra)
+
+        self.sujos = self.desenharEntidades(offsetY)
+        pygame.display.update(atualizar + self.sujos)
+
+    # Desenha Pacman e fantasmas. Retorna as áreas ocupadas na tela
+    def desenharEntidades(self, offsetY: int) -> list:
+        areas = []
+
+        # As entidades são desenhadas entre o tick anterior e o atual
+        alfa = self.jogo.alfa
 
         # Desenha o Pacman
-        rectDesenhoPacman = self.jogo.pacman.rect.move(0, offsetY)
+        rectDesenhoPacman = self.rectInterpolado(self.jogo.pacman, alfa, offsetY)
 
         # Se estiver invencível → piscar
         if self.jogo.pacman.invencivel and self.jogo.pacman.parpadeoToggle:
@@ -624,10 +730,11 @@ class EstadoJogo(Estado):
                     rectDesenhoPacman.center,
                     cfg.TILE_SIZE // 2,
                 )
+            areas.append(rectDesenhoPacman)
 
         # Desenha todos os fantasmas
         for fantasma in self.jogo.fantasmas:
-            rectDesenhoFantasma = fantasma.rect.move(0, offsetY)
+            rectDesenhoFantasma = self.rectInterpolado(fantasma, alfa, offsetY)
 
             if fantasma.imagem:
                 self.jogo.tela.blit(fantasma.imagem, rectDesenhoFantasma)
@@ -639,30 +746,42 @@ class EstadoJogo(Estado):
                     rectDesenhoFantasma.center,
                     cfg.TILE_SIZE // 2,
                 )
+            areas.append(rectDesenhoFantasma)
+        return areas
+
+    def rectInterpolado(self, entidade, alfa: float, offsetY: int) -> pygame.Rect:
+        x, y = entidade.posicaoInterpolada(alfa)
+        return pygame.Rect(x, y + offsetY, entidade.rect.w, entidade.rect.h)
+
+    # Desenha o score e as vidas na barra de cima
+    def desenharHUD(self) -> None:
+        self.hud = (self.jogo.pacman.pontos, self.jogo.pacman.vidas)
+
+        # Os números são montados com os glifos dos dígitos (cache da fonte)
+        yText = (cfg.TILE_SIZE - self.jogo.fonte.get_height()) // 2
 
         # Texto do Score
-        textoScore = self.jogo.fonte.render(
-            f"SCORE: {self.jogo.pacman.pontos}", True, cfg.BRANCO
+        self.jogo.fonte.desenharNumero(
+            self.jogo.tela, "SCORE: ", self.jogo.pacman.pontos, cfg.BRANCO, 10, yText
         )
-        yText = (cfg.TILE_SIZE - textoScore.get_height()) // 2
-        self.jogo.tela.blit(textoScore, (10, yText))
 
         # Texto das Vidas
-        textoVidas = self.jogo.fonte.render(
-            f"VIDAS: {self.jogo.pacman.vidas}", True, cfg.BRANCO
+        self.jogo.fonte.desenharNumero(
+            self.jogo.tela,
+            "VIDAS: ",
+            self.jogo.pacman.vidas,
+            cfg.BRANCO,
+            self.jogo.larguraTela - 10,
+            yText,
+            direita=True,
         )
-        rectVidas = textoVidas.get_rect()
-        rectVidas.topright = (self.jogo.larguraTela - 10, yText)
-        self.jogo.tela.blit(textoVidas, rectVidas)
-
-        pygame.display.flip()
 
 
 class Jogo:
     # Inicializa o jogo
     def __init__(self) -> None:
         # Carrega o primeiro mapa para modelar a janela (gambiarra, o correto seria ter um padrão)
-        self.mapa = Mapa("fases/fase1.txt")
+        self.sim = Simulacao(Mapa("fases/fase1.txt"), "fase1.txt")
         self.nomeMapaAtual = "fase1.txt"
 
         self.carregar_scores()
@@ -673,16 +792,16 @@ class Jogo:
             self.mapa.lin + 1
         ) * cfg.TILE_SIZE  # O +1 é para a barra de score/vidas
         self.tela = pygame.display.set_mode((self.larguraTela, self.alturaTela))
+        self.telaCompleta = True  # Próximo quadro redesenha a tela inteira
         pygame.display.set_caption("Pacman")
         self.clock = pygame.time.Clock()
 
         # Inicializa variáveis de jogo
-        self.powerupAtivo = False
-        self.powerupTimer = 0
         self.rodando = True  # Controle do loop principal
+        self.alfa = 1.0  # Fração do tick atual já passada (interpolação)
 
         # fonte para a HUD.
-        self.fonte = pygame.font.Font(None, 28)
+        self.fonte = FonteCache(pygame.font.Font(None, 28), cfg.CAPACIDADE_CACHE_TEXTO)
 
         # Tenta carregar os sprites
         try:
@@ -695,199 +814,234 @@ class Jogo:
         # Define o estado inicial
         self.estadoAtual = EstadoMenu(self)
 
-        # Inicializa pacman e fantasmas vazios (serão criados no carregarNivel)
-        self.pacman = None
-        self.fantasmas = []
-
         # Define o estado inicial diretamente usando a Classe, não o Enum
         self.estadoAtual = EstadoMenu(self)
 
+        # Saves gravados e lidos numa thread de disco (ver salvamento.py)
+        self.arquivos = salvamento.TrabalhadorArquivos(
+            aoGravar=Catalogo("saves").registrar
+        )
+        self.salvamentos = []  # Futures dos saves ainda sendo gravados
+        self.mensagemSave = ""  # Andamento do último save, mostrado no pause
+
+        # Autosave contínuo (ver autosave.py); se o jogo caiu no meio de uma
+        # partida, ela volta pausada
+        self.autosave = None
+        if cfg.AUTOSAVE:
+            self.autosave = Autosave(
+                os.path.join(cfg.DIRETORIO_AUTOSAVE, "partida"),
+                cfg.AUTOSAVE_TICKS_ENTIDADES,
+                cfg.AUTOSAVE_COMPACTAR,
+            )
+            if self.autosave.existe():
+                self.recuperarAutosave()
+
+    # Atalhos para o estado da partida, que fica na simulação
+    @property
+    def mapa(self) -> Mapa:
+        return self.sim.mapa
+
+    @property
+    def pacman(self) -> Pacman:
+        return self.sim.pacman
+
+    @property
+    def fantasmas(self) -> list:
+        return self.sim.fantasmas
+
+    @property
+    def powerupAtivo(self) -> bool:
+        return self.sim.powerupAtivo
+
+    @property
+    def powerupTimer(self) -> int:
+        return self.sim.powerupTimer
+
     # Método para salvar o estado atual do jogo
     def salvarJogo(self, nomeArquivo):
         caminhoDir = "saves"
         if not os.path.exists(caminhoDir):
             os.makedirs(caminhoDir)
 
-        # Garante extensão .pkl
-        if not nomeArquivo.endswith(".pkl"):
-            nomeArquivo += ".pkl"
+        # Garante a extensão dos saves
+        if not nomeArquivo.endswith(salvamento.EXTENSAO):
+            nomeArquivo += salvamento.EXTENSAO
 
         caminhoCompleto = os.path.join(caminhoDir, nomeArquivo)
 
-        # Preparar objetos (remover imagens que não podem ser salvas)
-        self.pacman.limparImagens()
-        for f in self.fantasmas:
-            f.limparImagens()
-
-        # Coletar dados do estado atual
-        dados = {
-            "mapa": self.mapa,
-            "pacman": self.pacman,
-            "fantasmas": self.fantasmas,
-            "score": self.pacman.pontos,
-            "vidas": self.pacman.vidas,
-            "nomeMapaAtual": self.nomeMapaAtual,
-            "powerupAtivo": self.powerupAtivo,
-            "powerupTimer": self.powerupTimer,
-        }
-
+        # A foto da partida é tirada agora; a gravação fica com a thread de disco
         try:
-            with open(caminhoCompleto, "wb") as f:
-                pickle.dump(dados, f)
-            print(f"Jogo salvo em {caminhoCompleto}")
+            self.salvamentos.append(self.arquivos.salvar(caminhoCompleto, self.sim))
+            self.mensagemSave = "Salvando..."
         except Exception as e:
             print(f"Erro ao salvar: {e}")
-
-        # Restaura imagens imediatamente para o jogo não quebrar se continuar
-        self.pacman.restaurarImagens(self.folhaSprites)
-        for f in self.fantasmas:
-            f.restaurarImagens(self.folhaSprites)
-
-    # Método para carregar
+            self.mensagemSave = "Erro ao salvar"
+
+    # Confere, sem bloquear, os saves que a thread de disco terminou
+    def acompanharSaves(self) -> None:
+        for futuro in [f for f in self.salvamentos if f.done()]:
+            self.salvamentos.remove(futuro)
+            try:
+                print(f"Jogo salvo em {futuro.result()}")
+                self.mensagemSave = "Jogo salvo"
+            except Exception as e:
+                print(f"Erro ao salvar: {e}")
+                self.mensagemSave = "Erro ao salvar"
+
+    # Começa a ler o save na thread de disco. Retorna o Future (ou None se o
+    # arquivo não existe); quando ele terminar, chame concluirCarregamento
     def carregarJogo(self, nomeArquivo):
         caminho = os.path.join("saves", nomeArquivo)
         if not os.path.exists(caminho):
             print("Arquivo não encontrado.")
-            return False
+            return None
+        return self.arquivos.carregar(caminho)
 
+    # Termina de carregar na thread do jogo: os sprites são do pygame
+    def concluirCarregamento(self, futuro) -> bool:
         try:
-            with open(caminho, "rb") as f:
-                dados = pickle.load(f)
-
-            # Restaura variáveis globais
-            self.mapa = dados["mapa"]
-            self.nomeMapaAtual = dados["nomeMapaAtual"]
-            self.powerupAtivo = dados.get("powerupAtivo", False)
-            self.powerupTimer = dados.get("powerupTimer", 0)
-
-            # Restaura entidades
-            self.pacman = dados["pacman"]
-            self.fantasmas = dados["fantasmas"]
-
-            # IMPORTANTE: Recarregar as sprites (imagens)
-            self.pacman.restaurarImagens(self.folhaSprites)
-            for f in self.fantasmas:
-                f.restaurarImagens(self.folhaSprites)
-
-            # Atualiza dimensões da tela caso o save seja de um mapa diferente
-            self.larguraTela = self.mapa.col * cfg.TILE_SIZE
-            self.alturaTela = (self.mapa.lin + 1) * cfg.TILE_SIZE
-            self.tela = pygame.display.set_mode((self.larguraTela, self.alturaTela))
+            dados, mapa = futuro.result()
+
+            # A simulação sai pronta do save: a fase é lida uma vez só
+            sim = salvamento.montarSimulacao(
+                dados,
+                mapa=mapa,
+                sheet=self.folhaSprites,
+                orcamentoIAUs=cfg.ORCAMENTO_IA_US,
+            )
+            self.continuarPartida(sim, dados["nomeMapa"])
+            return True
 
-            # Cria o Estado de Jogo JÁ restaurado
-            # Precisamos instanciar o EstadoJogo, mas SEM chamar carregarNivel,
-            # pois já carregamos os objetos manualmente.
-
-            estadoJ = EstadoJogo(self, self.nomeMapaAtual)
-            # O construtor do EstadoJogo chama carregarNivel, o que RESETARIA o jogo.
-            # Precisamos evitar isso ou ajustar o EstadoJogo.
-            # temos que modificar levemente a criação do estado ou apenas setar o estado
-            # e forçar os objetos que acabamos de carregar.
-
-            # Como o EstadoJogo chama self.jogo.carregarNivel no __init__,
-            # ele vai sobrescrever o que acabamos de carregar.
-            # Vamos corrigir recarregando os objetos DO SAVE logo após instanciar o estado.
-
-            self.pacman = dados[
-                "pacman"
-            ]  # Reatribui para garantir (o carregarNivel resetou)
-            self.pacman.restaurarImagens(self.folhaSprites)
-            self.fantasmas = dados["fantasmas"]
-            for f in self.fantasmas:
-                f.restaurarImagens(self.folhaSprites)
-            self.mapa = dados["mapa"]  # O mapa do save pode ter pontinhos comidos
-
-            # Define o estado "Paused"
-            self.estadoAnterior = estadoJ
-            self.mudarEstado(EstadoPause(self))
+        except Exception as e:
+            print(f"Erro ao carregar save: {e}")
+            return False
 
+    # Retoma a partida do autosave (foto + diário) depois de uma queda
+    def recuperarAutosave(self) -> bool:
+        try:
+            dados, registros = self.autosave.recuperar()
+            sim = salvamento.montarSimulacao(
+                dados, sheet=self.folhaSprites, orcamentoIAUs=cfg.ORCAMENTO_IA_US
+            )
+            print(f"Partida recuperada do autosave ({registros} registros do diário)")
+            self.continuarPartida(sim, dados["nomeMapa"])
             return True
 
         except Exception as e:
-            print(f"Erro ao carregar save: {e}")
+            print(f"Erro ao recuperar o autosave: {e}")
+            self.descartarAutosave()
             return False
 
+    # Troca para a simulação vinda de um save e espera pausado
+    def continuarPartida(self, sim: Simulacao, nomeMapa: str) -> None:
+        self.sim.encerrar()
+        self.sim = sim
+        self.nomeMapaAtual = nomeMapa
+
+        # Atualiza dimensões da tela caso o save seja de um mapa diferente
+        self.ajustarTela()
+        if self.autosave:
+            self.autosave.iniciar(sim)
+
+        # Define o estado "Paused"
+        self.estadoAnterior = EstadoJogo(self, self.nomeMapaAtual, novoNivel=False)
+        self.mudarEstado(EstadoPause(self))
+
+    def descartarAutosave(self) -> None:
+        if self.autosave:
+            self.autosave.descartar()
+
     # Lógica para carregar o mapa
     def carregarNivel(self, nomeArquivo):
         caminho = f"fases/{nomeArquivo}"
         self.nomeMapaAtual = nomeArquivo  # Salva para o ranking
-        self.mapa = Mapa(caminho)
 
-        # Redimensiona tela se necessário (caso os mapas tenham tamanhos diferentes)
+        # Nova partida: Pacman, fantasmas e powerup começam do zero
+        self.sim.encerrar()
+        self.sim = Simulacao(
+            Mapa(caminho),
+            nomeArquivo,
+            sheet=self.folhaSprites,
+            orcamentoIAUs=cfg.ORCAMENTO_IA_US,
+        )
+
+        self.ajustarTela()
+        if self.autosave:
+            self.autosave.iniciar(self.sim)
+
+    # Redimensiona tela se necessário (caso os mapas tenham tamanhos diferentes)
+    def ajustarTela(self) -> None:
         novaLargura = self.mapa.col * cfg.TILE_SIZE
         novaAltura = (self.mapa.lin + 1) * cfg.TILE_SIZE
         if novaLargura != self.larguraTela or novaAltura != self.alturaTela:
             self.larguraTela = novaLargura
             self.alturaTela = novaAltura
             self.tela = pygame.display.set_mode((self.larguraTela, self.alturaTela))
-
-        # Reset do Pacman
-        if self.mapa.posicaoInicialPacman:
-            px, py = self.mapa.posicaoInicialPacman
-            self.pacman = Pacman(px, py, self.folhaSprites)
-        else:
-            self.pacman = Pacman(1, 1, self.folhaSprites)
-
-        # Reset dos fantasmas
-        self.fantasmas = []
-        for fx, fy in self.mapa.posicaoInicialFantasmas:
-            self.fantasmas.append(Fantasma(fx, fy, self.folhaSprites))
-
-        self.powerupAtivo = False
-        self.powerupTimer = 0
+            self.telaCompleta = True
 
     def mudarEstado(self, novo_estado: Estado) -> None:
         self.estadoAtual = novo_estado
+        self.telaCompleta = True  # O novo estado começa com a tela inteira
 
+    # Abre o placar (ver placar.py); na primeira vez traz o scores.txt antigo
     def carregar_scores(self):
-        self.scores = []
-        try:
-            with open("scores.txt", "r") as f:
-                for linha in f:
-                    partes = linha.strip().split(";")
-                    if len(partes) == 3:
-                        nome, pontos, mapaNome = partes
-                        self.scores.append((nome, int(pontos), mapaNome))
-                    elif len(partes) == 2:  # Retrocompatibilidade
-                        nome, pontos = partes
-                        self.scores.append((nome, int(pontos), "Desconhecido"))
-
-            self.scores.sort(key=lambda x: x[1], reverse=True)
-        except FileNotFoundError:
-            self.scores = []
+        self.placar = Placar(cfg.ARQUIVO_PLACAR)
+        self.placar.importarTexto("scores.txt")
 
+    # A gravação fica com a thread do placar: o jogo não espera o disco
     def salvar_score(self, nome, pontos):
-        self.scores.append((nome, pontos, self.nomeMapaAtual))
-        self.scores.sort(key=lambda x: x[1], reverse=True)
-        self.scores = self.scores[:10]  # Top 10
-
-        with open("scores.txt", "w") as f:
-            for nome, pts, mapaNome in self.scores:
-                f.write(f"{nome};{pts};{mapaNome}\n")
+        self.placar.registrar(nome, pontos, self.nomeMapaAtual)
 
     def desenhar(self) -> None:
         self.estadoAtual.desenhar()
 
+    # Laço principal: a simulação anda em ticks de duração fixa (acumulando o
+    # tempo real que passou) e a tela é desenhada uma vez por quadro, com as
+    # entidades interpoladas pela fração de tick que sobrou
     def executar(self) -> None:
+        duracaoTick = 1.0 / cfg.TICKS_POR_SEGUNDO
+        acumulador = 0.0
+        anterior = time.perf_counter()
         while self.rodando:
-            self.clock.tick(60)
+            self.clock.tick(cfg.QUADROS_POR_SEGUNDO)
+            agora = time.perf_counter()
+            acumulador += agora - anterior
+            anterior = agora
 
             # Processa os eventos
             for evento in pygame.event.get():
                 if evento.type == pygame.QUIT:
                     self.rodando = False
+                elif evento.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                    # A janela foi redimensionada ou descoberta
+                    self.telaCompleta = True
                 else:
                     self.estadoAtual.processar_eventos(evento)
 
-            # Update do estado atual
-            self.estadoAtual.update()
-
-            # Nota: O desenho já é chamado dentro de update() do EstadoJogo,
-            # mas para o Menu pode ser necessário chamar aqui se o update for vazio.
-            # Para garantir consistência, o ideal é chamar desenhar() aqui se o estado não o fizer.
-            # No código original, EstadoJogo chama desenhar() no final do update,
-            # mas EstadoMenu não chama.
+            # Updates do estado atual, quantos ticks couberem no tempo acumulado
+            ticks = 0
+            estado = self.estadoAtual
+            while acumulador >= duracaoTick and self.estadoAtual is estado:
+                if ticks == cfg.MAX_TICKS_POR_QUADRO:
+                    acumulador = 0.0  # Máquina lenta demais: descarta o atraso
+                    break
+                self.estadoAtual.update()
+                acumulador -= duracaoTick
+                ticks += 1
+            if self.estadoAtual is not estado:
+                acumulador = 0.0  # Novo estado começa do zero
+            self.alfa = acumulador / duracaoTick
+
+            self.acompanharSaves()
+
+            # Desenha uma vez por quadro (os estados não desenham no update)
             self.estadoAtual.desenhar()
+
+        self.sim.encerrar()
+        self.arquivos.encerrar()  # Termina de gravar os saves pedidos
+        self.placar.encerrar()
+        if self.autosave:
+            self.autosave.encerrar()  # Fica no disco para a próxima execução
         pygame.quit()
 
 
@@ -0,0 +1,361 @@
+import numpy as np
+
+import config as cfg
+from caminhos import DIRECOES, INFINITO
+from mapa import Mapa
+from simulacao import (
+    BONUS_VITORIA,
+    DURACAO_POWERUP,
+    PONTOS_FANTASMA,
+    PONTOS_POWERUP,
+    PONTOS_PONTO,
+    TEMPO_PRESO_COMIDO,
+)
+
+# Situação de cada partida do lote (mesmo significado de simulacao.py)
+JOGANDO = 0
+VITORIA = 1
+DERROTA = 2
+
+# Conteúdo das células na máscara de itens
+VAZIO = 0
+PONTO = 1
+POWERUP = 2
+
+# Direções por índice: os 4 de DIRECOES e PARADO
+PARADO = 4
+DX = np.array([d[0] for d in DIRECOES] + [0], dtype=np.int32)
+DY = np.array([d[1] for d in DIRECOES] + [0], dtype=np.int32)
+REVERSO = np.array([1, 0, 3, 2, PARADO], dtype=np.int8)
+
+TEMPO_PRESO_INICIAL = 300  # Mesmo valor do construtor de Fantasma
+TEMPO_INVENCIVEL = 120  # Mesmo valor de Pacman.morrer
+VIDAS_INICIAIS = 3
+MARGEM_COLISAO = 10  # Os hitboxes são os rects encolhidos 10 pixels
+
+
+# Simulador em lote: N partidas no mesmo mapa guardadas como arrays NumPy e
+# avançadas juntas, um tick por chamada de step(), com as mesmas regras de
+# Simulacao (movimento na grade, pontos, powerup, colisões e vidas).
+#
+# A IA dos fantasmas toma, a cada centro de tile, a mesma decisão que
+# CampoDistancia.planejar tomaria naquela célula (segue o corredor, desce o
+# gradiente perseguindo, sobe fugindo), só que sem guardar o plano. As
+# distâncias vêm da tabela completa de caminhos do mapa, então o lote só
+# aceita mapas que caibam nela (LIMITE_TABELA_CAMINHOS).
+class SimulacaoLote:
+    def __init__(self, mapa: Mapa, n: int, semente: int = None) -> None:
+        caminhos = mapa.caminhos
+        if caminhos is None or not caminhos.completa:
+            raise ValueError(
+                "O simulador em lote precisa da tabela completa de caminhos "
+                f"(mapa {mapa.lin} x {mapa.col} é grande demais)"
+            )
+
+        self.mapa = mapa
+        self.n = n
+        self.lin = mapa.lin
+        self.col = mapa.col
+        self.rng = np.random.default_rng(semente)
+
+        # Grade compartilhada pelas partidas (as paredes não mudam no lote)
+        self.livre = np.frombuffer(bytes(caminhos.livre), dtype=np.uint8).astype(bool)
+        celulas = self.lin * self.col
+        self.distancias = np.frombuffer(caminhos.distancias, dtype=np.uint16).reshape(
+            celulas, celulas
+        )
+
+        # Itens iniciais do mapa (o Pacman começa sobre um ponto)
+        grade = np.frombuffer(bytes(mapa.grade), dtype=np.uint8)
+        self.itensIniciais = np.zeros(celulas, dtype=np.uint8)
+        self.itensIniciais[grade == ord(".")] = PONTO
+        self.itensIniciais[grade == ord("0")] = POWERUP
+
+        self.inicioPacman = mapa.posicaoInicialPacman or (1, 1)
+        inicioFantasmas = mapa.posicaoInicialFantasmas
+        self.g = len(inicioFantasmas)
+        self.xInicioFantasmas = np.array([f[0] for f in inicioFantasmas], np.int32)
+        self.yInicioFantasmas = np.array([f[1] for f in inicioFantasmas], np.int32)
+
+        # Ordem de desempate de cada fantasma, como Fantasma.preferencia
+        preferencia = (self.xInicioFantasmas + self.yInicioFantasmas) % 4
+        self.ordem = (np.arange(4)[None, :] + preferencia[:, None]) % 4  # (g, 4)
+
+        self.reiniciar()
+
+    # Cria o lote a partir de um arquivo de fase
+    @classmethod
+    def deArquivo(cls, caminho: str, n: int, semente: int = None) -> "SimulacaoLote":
+        return cls(Mapa(caminho), n, semente)
+
+    # Recomeça as partidas marcadas em 'mascara' (todas, se None)
+    def reiniciar(self, mascara=None) -> None:
+        n, g = self.n, self.g
+        if mascara is None or not hasattr(self, "estado"):
+            self._alocar(n, g)
+            mascara = np.ones(n, dtype=bool)
+
+        t = cfg.TILE_SIZE
+        self.itens[mascara] = self.itensIniciais
+        self.restantes[mascara] = np.count_nonzero(self.itensIniciais)
+        self.estado[mascara] = JOGANDO
+        self.ticks[mascara] = 0
+        self.powerupTimer[mascara] = 0
+
+        self.pacX[mascara] = self.inicioPacman[0] * t
+        self.pacY[mascara] = self.inicioPacman[1] * t
+        self.pacDir[mascara] = PARADO
+        self.pacProxima[mascara] = PARADO
+        self.vidas[mascara] = VIDAS_INICIAIS
+        self.pontos[mascara] = 0
+        self.invencivelTimer[mascara] = 0
+
+        self.fanX[mascara] = self.xInicioFantasmas * t
+        self.fanY[mascara] = self.yInicioFantasmas * t
+        self.fanDir[mascara] = PARADO
+        self.tempoPreso[mascara] = TEMPO_PRESO_INICIAL
+        self.assustado[mascara] = False
+        self.fanSpeed[mascara] = cfg.VELOCIDADE - 1
+
+    def _alocar(self, n: int, g: int) -> None:
+        self.itens = np.empty((n, self.lin * self.col), dtype=np.uint8)
+        self.restantes = np.empty(n, dtype=np.int32)
+        self.estado = np.empty(n, dtype=np.int8)
+        self.ticks = np.empty(n, dtype=np.int32)
+        self.powerupTimer = np.empty(n, dtype=np.int32)
+
+        # Pacman: posição em pixels e direções como índice de DIRECOES
+        self.pacX = np.empty(n, dtype=np.int32)
+        self.pacY = np.empty(n, dtype=np.int32)
+        self.pacDir = np.empty(n, dtype=np.int8)
+        self.pacProxima = np.empty(n, dtype=np.int8)
+        self.vidas = np.empty(n, dtype=np.int8)
+        self.pontos = np.empty(n, dtype=np.int32)
+        self.invencivelTimer = np.empty(n, dtype=np.int32)
+
+        # Fantasmas: uma coluna por fantasma
+        self.fanX = np.empty((n, g), dtype=np.int32)
+        self.fanY = np.empty((n, g), dtype=np.int32)
+        self.fanDir = np.empty((n, g), dtype=np.int8)
+        self.tempoPreso = np.empty((n, g), dtype=np.int32)
+        self.assustado = np.empty((n, g), dtype=bool)
+        self.fanSpeed = np.empty((n, g), dtype=np.int32)
+
+    @property
+    def powerupAtivo(self) -> np.ndarray:
+        return self.powerupTimer > 0
+
+    # Verifica quais células (x, y) são livres, tratando fora do mapa como parede
+    def _livreEm(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        dentro = (x >= 0) & (x < self.col) & (y >= 0) & (y < self.lin)
+        return dentro & self.livre[self._indice(x, y)]
+
+    def _indice(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return np.clip(y, 0, self.lin - 1) * self.col + np.clip(x, 0, self.col - 1)
+
+    # Avança um tick em todas as partidas em andamento. 'entradas' tem, para
+    # cada partida, o índice da direção pedida (0 a 3, como em DIRECOES) ou -1
+    # para manter a anterior. Retorna quantas partidas continuam em andamento.
+    def step(self, entradas=None) -> int:
+        ativos = self.estado == JOGANDO
+        if not ativos.any():
+            return 0
+        self.ticks[ativos] += 1
+
+        if entradas is not None:
+            entradas = np.asarray(entradas)
+            pedido = ativos & (entradas >= 0)
+            self.pacProxima[pedido] = entradas[pedido]
+
+        self._moverPacman(ativos)
+        self._moverFantasmas(ativos)
+        ativos &= ~self._colisoes(ativos)
+        self._comer(ativos)
+        self._timerPowerup(ativos & (self.estado == JOGANDO))
+        return int(np.count_nonzero(self.estado == JOGANDO))
+
+    # Mesmas regras de Pacman.update
+    def _moverPacman(self, ativos: np.ndarray) -> None:
+        t = cfg.TILE_SIZE
+
+        invencivel = ativos & (self.invencivelTimer > 0)
+        self.invencivelTimer[invencivel] -= 1
+
+        centro = ativos & (self.pacX % t == 0) & (self.pacY % t == 0)
+        cx = self.pacX // t
+        cy = self.pacY // t
+
+        # Tenta a direção pedida e depois verifica se pode continuar
+        proxima = self.pacProxima
+        pode = self._livreEm(cx + DX[proxima], cy + DY[proxima])
+        self.pacDir[centro & pode] = proxima[centro & pode]
+
+        direcao = self.pacDir
+        pode = self._livreEm(cx + DX[direcao], cy + DY[direcao])
+        self.pacDir[centro & ~pode] = PARADO
+
+        passo = np.where(ativos, cfg.VELOCIDADE, 0)
+        self.pacX += DX[self.pacDir] * passo
+        self.pacY += DY[self.pacDir] * passo
+
+    # Mesmas decisões de CampoDistancia.planejar, tomadas a cada centro de tile
+    def _moverFantasmas(self, ativos: np.ndarray) -> None:
+        t = cfg.TILE_SIZE
+        soltos = ativos[:, None] & (self.tempoPreso <= 0)
+        presos = ativos[:, None] & ~soltos
+        self.tempoPreso[presos] -= 1
+
+        centro = soltos & (self.fanX % t == 0) & (self.fanY % t == 0)
+        if centro.any():
+            self._decidir(centro)
+
+        # Fantasmas sem saída esperam parados
+        cx = self.fanX // t
+        cy = self.fanY // t
+        direcao = self.fanDir
+        bloqueado = centro & ~self._livreEm(cx + DX[direcao], cy + DY[direcao])
+        anda = soltos & ~bloqueado
+
+        passo = np.where(anda, self.fanSpeed, 0)
+        self.fanX += DX[direcao] * passo
+        self.fanY += DY[direcao] * passo
+
+    def _decidir(self, centro: np.ndarray) -> None:
+        t = cfg.TILE_SIZE
+        jogo, fantasma = np.nonzero(centro)
+        cx = self.fanX[jogo, fantasma] // t
+        cy = self.fanY[jogo, fantasma] // t
+        direcao = self.fanDir[jogo, fantasma]
+        fugindo = self.assustado[jogo, fantasma]
+
+        # Vizinhos na ordem de preferência de cada fantasma: (k, 4)
+        ordem = self.ordem[fantasma]
+        vx = cx[:, None] + DX[ordem]
+        vy = cy[:, None] + DY[ordem]
+        livres = self._livreEm(vx, vy)
+
+        # Distâncias até a célula atual do Pacman (uma linha da tabela)
+        pacman = self._indice(
+            (self.pacX[jogo] + t // 2) // t, (self.pacY[jogo] + t // 2) // t
+        )
+        dist = np.where(
+            livres, self.distancias[pacman[:, None], self._indice(vx, vy)], INFINITO
+        ).astype(np.int32)
+        atual = self.distancias[pacman, self._indice(cx, cy)].astype(np.int32)
+
+        escolha = np.full(len(jogo), -1, dtype=np.int32)
+        reverso = REVERSO[direcao][:, None] == ordem
+
+        # Corredor: segue a única saída que não é a de volta (na ordem de
+        # DIRECOES, como GrafoJuncoes.seguirCorredor)
+        saidasDir = self._livreEm(cx[:, None] + DX[:4], cy[:, None] + DY[:4])
+        corredor = (saidasDir.sum(axis=1) == 2) & (direcao != PARADO)
+        frente = saidasDir & (np.arange(4)[None, :] != REVERSO[direcao][:, None])
+        escolha = np.where(corredor, np.argmax(frente, axis=1), escolha)
+
+        # Perseguindo: desce o gradiente (o primeiro menor, como direcaoDescendo)
+        k = np.argmin(dist, axis=1)
+        melhor = dist[np.arange(len(jogo)), k]
+        desce = (escolha < 0) & ~fugindo & (atual != INFINITO) & (melhor < atual)
+        escolha = np.where(desce, ordem[np.arange(len(jogo)), k], escolha)
+
+        # Fugindo: sobe o gradiente sem voltar, a não ser num beco sem saída
+        alcancavel = livres & (dist != INFINITO)
+        candidatas = alcancavel & ~reverso
+        k = np.argmax(np.where(candidatas, dist, -1), axis=1)
+        sobe = (escolha < 0) & fugindo & candidatas.any(axis=1)
+        escolha = np.where(sobe, ordem[np.arange(len(jogo)), k], escolha)
+        volta = (escolha < 0) & fugindo & (alcancavel & reverso).any(axis=1)
+        escolha = np.where(volta, REVERSO[direcao], escolha)
+
+        # Sem decisão: vizinho aleatório válido (como o fallback de receberPlano)
+        sorteio = (escolha < 0) & livres.any(axis=1)
+        if sorteio.any():
+            pesos = self.rng.random(livres.shape) * livres
+            k = np.argmax(pesos, axis=1)
+            escolha = np.where(sorteio, ordem[np.arange(len(jogo)), k], escolha)
+
+        decidiu = escolha >= 0
+        self.fanDir[jogo[decidiu], fantasma[decidiu]] = escolha[decidiu]
+
+    # Colisões Pacman x fantasmas, na mesma ordem de Simulacao._colisoes.
+    # Retorna a máscara das partidas que terminaram em derrota
+    def _colisoes(self, ativos: np.ndarray) -> np.ndarray:
+        t = cfg.TILE_SIZE
+        perto = t - MARGEM_COLISAO
+        vulneravel = ativos & (self.invencivelTimer <= 0)
+        colide = (
+            vulneravel[:, None]
+            & (np.abs(self.fanX - self.pacX[:, None]) < perto)
+            & (np.abs(self.fanY - self.pacY[:, None]) < perto)
+        )
+        derrotas = np.zeros(self.n, dtype=bool)
+        if not colide.any():
+            return derrotas
+
+        # O primeiro fantasma não assustado que encosta mata o Pacman, que
+        # fica invencível e ignora os fantasmas seguintes
+        mortal = colide & ~self.assustado
+        morreu = mortal.any(axis=1)
+        assassino = np.where(morreu, np.argmax(mortal, axis=1), self.g)
+        comido = (
+            colide & self.assustado & (np.arange(self.g)[None, :] < assassino[:, None])
+        )
+
+        if comido.any():
+            self.pontos += PONTOS_FANTASMA * comido.sum(axis=1, dtype=np.int32)
+            jogo, fantasma = np.nonzero(comido)
+            self.fanX[jogo, fantasma] = self.xInicioFantasmas[fantasma] * t
+            self.fanY[jogo, fantasma] = self.yInicioFantasmas[fantasma] * t
+            self.assustado[comido] = False
+            self.tempoPreso[comido] = TEMPO_PRESO_COMIDO
+
+        if morreu.any():
+            self.vidas[morreu] -= 1
+            derrotas = morreu & (self.vidas <= 0)
+            self.estado[derrotas] = DERROTA
+
+            # Como Pacman.morrer, mais a direção pedida zerada
+            volta = morreu & ~derrotas
+            self.pacX[volta] = self.inicioPacman[0] * t
+            self.pacY[volta] = self.inicioPacman[1] * t
+            self.pacDir[volta] = PARADO
+            self.pacProxima[volta] = PARADO
+            self.invencivelTimer[volta] = TEMPO_INVENCIVEL
+        return derrotas
+
+    # Pontos e powerups nas células em que o Pacman está centralizado
+    def _comer(self, ativos: np.ndarray) -> None:
+        t = cfg.TILE_SIZE
+        centro = ativos & (self.pacX % t == 0) & (self.pacY % t == 0)
+        jogo = np.nonzero(centro)[0]
+        if len(jogo) == 0:
+            return
+
+        celula = self._indice(self.pacX[jogo] // t, self.pacY[jogo] // t)
+        item = self.itens[jogo, celula]
+        comeu = item != VAZIO
+        jogo, celula, item = jogo[comeu], celula[comeu], item[comeu]
+        if len(jogo) == 0:
+            return
+
+        self.itens[jogo, celula] = VAZIO
+        self.restantes[jogo] -= 1
+        self.pontos[jogo] += np.where(item == PONTO, PONTOS_PONTO, PONTOS_POWERUP)
+
+        # Powerup: todos os fantasmas da partida ficam assustados e lentos
+        powerup = jogo[item == POWERUP]
+        self.powerupTimer[powerup] = DURACAO_POWERUP
+        self.assustado[powerup] = True
+        self.fanSpeed[powerup] = 1
+
+        venceu = jogo[self.restantes[jogo] <= 0]
+        self.pontos[venceu] += BONUS_VITORIA
+        self.estado[venceu] = VITORIA
+
+    def _timerPowerup(self, ativos: np.ndarray) -> None:
+        contando = ativos & (self.powerupTimer > 0)
+        self.powerupTimer[contando] -= 1
+        acabou = contando & (self.powerupTimer <= 0)
+        self.assustado[acabou] = False
+        self.fanSpeed[acabou] = cfg.VELOCIDADE - 1
@@ -1,4 +1,25 @@
+import hashlib
 import os
+from itertools import chain
+
+from caminhos import DIRECOES, GrafoJuncoes, TabelaCaminhos
+
+# Códigos (bytes) do conteúdo das células na grade
+PAREDE = ord("#")
+PONTO = ord(".")
+POWERUP = ord("0")
+VAZIO = ord(" ")
+
+# Tabela de tradução byte -> 1 se passável, 0 se parede
+_LIVRE = bytes(0 if codigo == PAREDE else 1 for codigo in range(256))
+
+# Vizinhos para cada máscara de saídas (bit d = direção DIRECOES[d] livre),
+# na ordem em que Mapa.vizinhos sempre os devolveu: direita, esquerda, baixo, cima
+_ORDEM_VIZINHOS = (3, 2, 1, 0)
+_VIZINHOS_POR_SAIDAS = tuple(
+    tuple(DIRECOES[d] for d in _ORDEM_VIZINHOS if mascara & (1 << d))
+    for mascara in range(16)
+)
 
 
 # TAD para representar o mapa do jogo
@@ -8,11 +29,19 @@ class Mapa:
         # Atributos da classe
         self.lin = 0
         self.col = 0
-        self.matriz = []
+        self.grade = bytearray()  # Conteúdo de cada célula (código), linha a linha
+        self.saidas = bytearray()  # Bits das direções livres a partir de cada célula
+        self._visao = None  # Visão de compatibilidade 'matriz'
         self.posicaoInicialPacman = None  # Posição inicial do Pacman
         self.posicaoInicialFantasmas = []  # Lista de fantasmas
         self.posicaoPowerUp = None  # Power-up (0)
-        self.pontosRestantes = 0  # Usado para verifiacar a vitória
+        self.itens = IndiceItens(0)  # Pontos e power-ups que ainda restam
+        self.hashConteudo = None  # Hash do arquivo, usado como chave de cache
+        self.caminhos = None  # Tabela de caminhos dos fantasmas
+        self.grafo = None  # Grafo de junções e corredores
+        self.versao = 0  # Incrementa a cada alteração de conteúdo
+        self.versaoParedes = 0  # Incrementa quando uma parede surge ou some
+        self.observadores = []  # Funções avisadas a cada alteração
         self.carregarMapa(arquivo)
 
     # Método para carregar o mapa a partir de um arquivo .txt
@@ -21,15 +50,26 @@ class Mapa:
         self.posicaoInicialPacman = None
         self.posicaoInicialFantasmas = []
         self.posicaoPowerUp = None
-        self.matriz = []
-        self.pontosRestantes = 0
+        self.grade = bytearray()
+        self.saidas = bytearray()
+        self.itens = IndiceItens(0)
+        self.hashConteudo = None
+        self.caminhos = None
+        self.grafo = None
+        self.versao = 0
+        self.versaoParedes = 0
+        self.observadores = []
 
         # Verifica se o arquivo existe
         if not os.path.exists(arquivo):
             print(f"ERRO: O arquivo '{arquivo}' não foi encontrado.")
             return None
 
+        linhas = []
         try:
+            with open(arquivo, "rb") as arq:
+                self.hashConteudo = hashlib.sha256(arq.read()).hexdigest()
+
             with open(arquivo, "r", encoding="utf-8") as arq:
                 # Ler primeira linha com dimensões
                 dim = arq.readline()
@@ -55,7 +95,6 @@ class Mapa:
                             # print(f"PACMAN ENCONTRADO EM: ({j}, {linha_index})")
                             self.posicaoInicialPacman = (j, linha_index)
                             listaChars[j] = "."  # Pacman começa sobre um ponto
-                            self.pontosRestantes += 1
 
                         # FANTASMA
                         elif char == "F":
@@ -67,40 +106,258 @@ class Mapa:
                         elif char == "0":
                             # print(f"POWER-UP ENCONTRADO EM: ({j}, {linha_index})")
                             self.posicaoPowerUp = (j, linha_index)
-                            self.pontosRestantes += 1
-                        elif char == ".":
-                            self.pontosRestantes += 1
 
                     # Linha final sem entidades
-                    self.matriz.append(listaChars)
+                    linhas.append(listaChars)
                     linha_index += 1
 
         except Exception as e:
             print(f"Erro ao ler o arquivo: {e}")
+            self._montarGrade(linhas)
+            return None
+
+        self._montarGrade(linhas)
+
+        # Pré-calcula os caminhos (ou lê do cache em disco) uma vez por mapa
+        self._criarCaminhos()
+
+    # Monta a grade plana a partir das linhas lidas. Células que faltam em
+    # linhas curtas (ou linhas que faltam) viram parede
+    def _montarGrade(self, linhas: list) -> None:
+        col = self.col
+        self.grade = bytearray(b"#") * (self.lin * col)
+        for y, listaChars in enumerate(linhas[: self.lin]):
+            texto = "".join(listaChars[:col]).encode("latin-1", "replace")
+            self.grade[y * col : y * col + len(texto)] = texto
+        self._calcularSaidas()
+        self._indexarItens()
+
+    # Monta o índice de itens com uma única varredura da grade
+    def _indexarItens(self) -> None:
+        self.itens = IndiceItens(len(self.grade))
+        for codigo in (PONTO, POWERUP):
+            i = self.grade.find(codigo)
+            while i != -1:
+                self.itens.adicionar(i, codigo)
+                i = self.grade.find(codigo, i + 1)
+
+    # Itens restantes (pontos e power-ups). Chega a 0 na vitória
+    @property
+    def pontosRestantes(self) -> int:
+        return len(self.itens)
+
+    # Posições (x, y) dos itens restantes, sem varrer a grade
+    def posicoesItens(self):
+        col = self.col
+        for i in self.itens:
+            yield i % col, i // col
+
+    # Máscara de saídas de cada célula: bit d ligado se o vizinho na direção
+    # DIRECOES[d] (cima, baixo, esquerda, direita) está dentro do mapa e não é
+    # parede. Paredes não têm saídas
+    def _calcularSaidas(self) -> None:
+        lin, col = self.lin, self.col
+        livre = self.mascaraLivre()
+        saidas = bytearray(len(livre))
+        for y in range(lin):
+            inicio = y * col
+            for i in range(inicio, inicio + col):
+                if not livre[i]:
+                    continue
+                mascara = 0
+                if y > 0 and livre[i - col]:
+                    mascara |= 1
+                if y < lin - 1 and livre[i + col]:
+                    mascara |= 2
+                if i > inicio and livre[i - 1]:
+                    mascara |= 4
+                if i < inicio + col - 1 and livre[i + 1]:
+                    mascara |= 8
+                saidas[i] = mascara
+        self.saidas = saidas
+
+    def _atualizarSaidas(self, x: int, y: int) -> None:
+        i = y * self.col + x
+        if self.grade[i] == PAREDE:
+            self.saidas[i] = 0
+            return
+        mascara = 0
+        for d, (dx, dy) in enumerate(DIRECOES):
+            if self.passavel(x + dx, y + dy):
+                mascara |= 1 << d
+        self.saidas[i] = mascara
+
+    # Visão de compatibilidade: mapa.matriz[y][x] continua devolvendo (e
+    # aceitando) o caractere da célula, mas os dados ficam na grade
+    @property
+    def matriz(self) -> "VisaoMatriz":
+        if self._visao is None:
+            self._visao = VisaoMatriz(self)
+        return self._visao
+
+    # Grade de passagem: 1 onde a célula não é parede, 0 onde é
+    def mascaraLivre(self) -> bytearray:
+        return self.grade.translate(_LIVRE)
+
+    # Converte (x, y) em índice da grade plana
+    def indice(self, x: int, y: int) -> int:
+        return y * self.col + x
+
+    # Verifica se (x, y) está dentro do mapa e não é parede
+    def passavel(self, x: int, y: int) -> bool:
+        if x < 0 or x >= self.col or y < 0 or y >= self.lin:
+            return False
+        return self.grade[y * self.col + x] != PAREDE
+
+    # Caractere da célula (x, y), que deve estar dentro do mapa
+    def conteudo(self, x: int, y: int) -> str:
+        return chr(self.grade[y * self.col + x])
+
+    # Escreve na grade e acerta itens e saídas; versões e observadores ficam
+    # com atualizarConteudo
+    def _gravar(self, x: int, y: int, char: str) -> None:
+        i = y * self.col + x
+        eraParede = self.grade[i] == PAREDE
+        self.itens.remover(i)
+        self.grade[i] = ord(char)
+        self.itens.adicionar(i, self.grade[i])
+        if eraParede != (char == "#"):
+            self._atualizarSaidas(x, y)
+            for dx, dy in DIRECOES:
+                if 0 <= x + dx < self.col and 0 <= y + dy < self.lin:
+                    self._atualizarSaidas(x + dx, y + dy)
+
+    def _criarCaminhos(self) -> None:
+        # Se as paredes já mudaram, o cache do arquivo original não vale mais
+        chave = self.hashConteudo if self.versaoParedes == 0 else None
+        self.caminhos = TabelaCaminhos(self, chave)
+        self.adicionarObservador(self.caminhos.aoAlterarMapa)
+
+        # O grafo usa a grade da tabela, por isso é avisado depois dela
+        self.grafo = GrafoJuncoes(self.caminhos)
+        self.adicionarObservador(self.grafo.aoAlterarMapa)
+
+    # Registra uma função chamada como funcao(x, y, charAntigo, charNovo)
+    # sempre que o conteúdo de uma célula mudar
+    def adicionarObservador(self, funcao) -> None:
+        if funcao not in self.observadores:
+            self.observadores.append(funcao)
+
+    def removerObservador(self, funcao) -> None:
+        if funcao in self.observadores:
+            self.observadores.remove(funcao)
 
     # Método que recebe a posição (x,y) do mapa e retorna uma lista de adjancência dos vizinhos possíveis de se visitar
     def vizinhos(self, x: int, y: int) -> list:
         # Verifica se a posição está dentro dos limites do mapa
         if x < 0 or x >= self.col or y < 0 or y >= self.lin:
             return []  # Fora dos limites do mapa
-        if self.matriz[y][x] == "#":
-            return []  # Paredes não têm vizinhos visitáveis
 
-        # Se chegou aqui, a posição é válida
-        vizinhos = []
-        vizinhosPotenciais = [
-            (x + 1, y),
-            (x - 1, y),
-            (x, y + 1),
-            (x, y - 1),
-        ]
-
-        for nx, ny in vizinhosPotenciais:
-            if self.matriz[ny][nx] != "#":
-                vizinhos.append((nx, ny))
-
-        return vizinhos
+        # Paredes têm máscara 0, então não têm vizinhos visitáveis
+        mascara = self.saidas[y * self.col + x]
+        return [(x + dx, y + dy) for dx, dy in _VIZINHOS_POR_SAIDAS[mascara]]
 
     # Metodo para atualizar o conteúdo da matriz do mapa
+    # e avisar quem depende da grade (tabela de caminhos, renderização...)
     def atualizarConteudo(self, x: int, y: int, novoChar: str) -> None:
-        self.matriz[y][x] = novoChar
+        antigo = self.conteudo(x, y)
+        if antigo == novoChar:
+            return
+
+        self._gravar(x, y, novoChar)
+        self.versao += 1
+        if (antigo == "#") != (novoChar == "#"):
+            self.versaoParedes += 1
+
+        for funcao in list(self.observadores):
+            funcao(x, y, antigo, novoChar)
+
+
+# Índice dos itens que restam no mapa, por índice da grade plana. O bitset
+# responde se há item numa célula em O(1); os conjuntos separam pontos e
+# power-ups e permitem percorrer só o que sobrou, sem varrer a grade
+class IndiceItens:
+    def __init__(self, n: int) -> None:
+        self.bits = bytearray((n + 7) // 8)
+        self.pontos = set()  # Índices com ponto '.'
+        self.powerups = set()  # Índices com power-up '0'
+
+    def __len__(self) -> int:
+        return len(self.pontos) + len(self.powerups)
+
+    def __contains__(self, i: int) -> bool:
+        return (self.bits[i >> 3] >> (i & 7)) & 1 == 1
+
+    def __iter__(self):
+        return chain(self.pontos, self.powerups)
+
+    # Registra o item de código 'codigo' em i (outros códigos são ignorados)
+    def adicionar(self, i: int, codigo: int) -> None:
+        if codigo == PONTO:
+            self.pontos.add(i)
+        elif codigo == POWERUP:
+            self.powerups.add(i)
+        else:
+            return
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def remover(self, i: int) -> None:
+        if i not in self:
+            return
+        self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        self.pontos.discard(i)
+        self.powerups.discard(i)
+
+
+# Linha da visão de compatibilidade: indexável como a lista de caracteres
+class LinhaMatriz:
+    __slots__ = ("mapa", "y")
+
+    def __init__(self, mapa: Mapa, y: int) -> None:
+        self.mapa = mapa
+        self.y = y
+
+    def __len__(self) -> int:
+        return self.mapa.col
+
+    def __getitem__(self, x):
+        inicio = self.y * self.mapa.col
+        if isinstance(x, slice):
+            linha = self.mapa.grade[inicio : inicio + self.mapa.col]
+            return list(linha.decode("latin-1"))[x]
+        if x < 0:
+            x += self.mapa.col
+        if not 0 <= x < self.mapa.col:
+            raise IndexError("coluna fora do mapa")
+        return chr(self.mapa.grade[inicio + x])
+
+    def __setitem__(self, x: int, char: str) -> None:
+        if not 0 <= x < self.mapa.col:
+            raise IndexError("coluna fora do mapa")
+        self.mapa.atualizarConteudo(x, self.y, char)
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+# Visão de compatibilidade da grade como lista de linhas (mapa.matriz)
+class VisaoMatriz:
+    __slots__ = ("mapa",)
+
+    def __init__(self, mapa: Mapa) -> None:
+        self.mapa = mapa
+
+    def __len__(self) -> int:
+        return self.mapa.lin
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [LinhaMatriz(self.mapa, i) for i in range(self.mapa.lin)[y]]
+        if y < 0:
+            y += self.mapa.lin
+        if not 0 <= y < self.mapa.lin:
+            raise IndexError("linha fora do mapa")
+        return LinhaMatriz(self.mapa, y)
+
+    def __iter__(self):
+        return iter(self[:])
@@ -0,0 +1,220 @@
+import os
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Placar em SQLite: o histórico inteiro das partidas, não só o top 10.
+#
+#   pontuacoes  uma linha por partida, com índices (mapa, pontos) e (pontos)
+#               para o top-K por mapa e geral sem ordenar nada
+#   contagens   quantas partidas fizeram cada pontuação em cada mapa (para
+#               os totais e a lista de mapas)
+#   blocos      as mesmas contagens somadas em blocos de 2^nivel pontos
+#               (bloco = pontos >> nivel), por mapa
+#   blocos_geral  os mesmos blocos somando todos os mapas
+#
+# A posição de uma pontuação p é quantas partidas fizeram mais que p. Para
+# cada bit zero de p no nível k, o bloco (p >> k) + 1 do nível k tem só
+# pontuações maiores (mesmos bits acima de k, bit k ligado), e esses blocos
+# juntos cobrem todas elas: a posição é a soma de no máximo NIVEIS linhas
+# lidas pela chave primária, seja qual for o tamanho do placar. Cada partida
+# guardada soma 1 em NIVEIS + 1 blocos do mapa e NIVEIS + 1 do geral.
+#
+# As gravações vão para uma thread própria (com a sua conexão), então o
+# laço do jogo nunca espera o disco. As leituras usam a conexão da thread do
+# jogo; no modo WAL elas não esperam as gravações.
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pontuacoes (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    pontos INTEGER NOT NULL,
+    mapa TEXT NOT NULL,
+    data REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pontuacoes_mapa ON pontuacoes (mapa, pontos DESC, id);
+CREATE INDEX IF NOT EXISTS pontuacoes_pontos ON pontuacoes (pontos DESC, id);
+CREATE TABLE IF NOT EXISTS contagens (
+    mapa TEXT NOT NULL,
+    pontos INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (mapa, pontos)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blocos (
+    mapa TEXT NOT NULL,
+    nivel INTEGER NOT NULL,
+    bloco INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (mapa, nivel, bloco)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blocos_geral (
+    nivel INTEGER NOT NULL,
+    bloco INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (nivel, bloco)
+) WITHOUT ROWID;
+"""
+
+# Pontuações vão de 0 a 2^NIVEIS - 1. O nível NIVEIS tem um bloco só, com o
+# total de partidas
+NIVEIS = 31
+
+INSERIR = "INSERT INTO pontuacoes (nome, pontos, mapa, data) VALUES (?, ?, ?, ?)"
+CONTAR = """
+INSERT INTO contagens (mapa, pontos, quantidade) VALUES (?, ?, 1)
+ON CONFLICT (mapa, pontos) DO UPDATE SET quantidade = quantidade + 1
+"""
+SOMAR_BLOCO = """
+INSERT INTO blocos (mapa, nivel, bloco, quantidade) VALUES (?, ?, ?, ?)
+ON CONFLICT (mapa, nivel, bloco) DO UPDATE SET quantidade = quantidade + excluded.quantidade
+"""
+SOMAR_BLOCO_GERAL = """
+INSERT INTO blocos_geral (nivel, bloco, quantidade) VALUES (?, ?, ?)
+ON CONFLICT (nivel, bloco) DO UPDATE SET quantidade = quantidade + excluded.quantidade
+"""
+
+
+def _conectar(caminho: str) -> sqlite3.Connection:
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    return conexao
+
+
+class Placar:
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+        self.conexao = _conectar(caminho)  # Leituras, na thread do jogo
+        with self.conexao:
+            self.conexao.executescript(ESQUEMA)
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="placar")
+        self._escrita = None  # Conexão da thread de gravação
+
+    # Guarda uma partida. Não bloqueia: o Future termina quando ela estiver
+    # no disco
+    def registrar(self, nome: str, pontos: int, mapa: str) -> Future:
+        return self.executor.submit(self._inserir, [(nome, pontos, mapa, time.time())])
+
+    # Guarda várias partidas (nome, pontos, mapa, data) numa transação só
+    def registrarVarias(self, partidas: list) -> Future:
+        return self.executor.submit(self._inserir, list(partidas))
+
+    def _inserir(self, partidas: list) -> int:
+        if self._escrita is None:
+            self._escrita = _conectar(self.caminho)
+        with self._escrita:
+            self._escrita.executemany(INSERIR, partidas)
+            self._escrita.executemany(CONTAR, [(p[2], p[1]) for p in partidas])
+            porMapa, geral = _blocos(partidas)
+            self._escrita.executemany(SOMAR_BLOCO, porMapa)
+            self._escrita.executemany(SOMAR_BLOCO_GERAL, geral)
+        return len(partidas)
+
+    # Melhores pontuações, do maior para o menor (empates: quem fez antes),
+    # como (nome, pontos, mapa). Sem 'mapa', o ranking geral
+    def topo(self, limite: int, deslocamento: int = 0, mapa: str = None) -> list:
+        if mapa is None:
+            consulta = (
+                "SELECT nome, pontos, mapa FROM pontuacoes "
+                "ORDER BY pontos DESC, id LIMIT ? OFFSET ?"
+            )
+            return self.conexao.execute(consulta, (limite, deslocamento)).fetchall()
+        consulta = (
+            "SELECT nome, pontos, mapa FROM pontuacoes WHERE mapa = ? "
+            "ORDER BY pontos DESC, id LIMIT ? OFFSET ?"
+        )
+        return self.conexao.execute(consulta, (mapa, limite, deslocamento)).fetchall()
+
+    # Posição que 'pontos' teria no ranking (1 = primeiro), no mapa ou geral
+    def posicao(self, pontos: int, mapa: str = None) -> int:
+        if pontos < 0:
+            return self.total(mapa) + 1
+        chaves = [
+            (nivel, (pontos >> nivel) + 1)
+            for nivel in range(NIVEIS)
+            if not (pontos >> nivel) & 1
+        ]
+        if not chaves:
+            return 1
+        tabela, filtro, valores = _blocosDe(mapa)
+        # As chaves vão numa tabela de valores para o SQLite buscar cada bloco
+        # pela chave primária (num OR ele prefere varrer o mapa inteiro)
+        consulta = (
+            f"WITH chaves (nivel, bloco) AS (VALUES {', '.join(['(?, ?)'] * len(chaves))}) "
+            f"SELECT SUM(quantidade) FROM chaves JOIN {tabela} AS b ON {filtro}"
+            "b.nivel = chaves.nivel AND b.bloco = chaves.bloco"
+        )
+        valores = [valor for chave in chaves for valor in chave] + valores
+        acima = self.conexao.execute(consulta, valores).fetchone()[0] or 0
+        return acima + 1
+
+    # Partidas guardadas, no mapa ou no total
+    def total(self, mapa: str = None) -> int:
+        tabela, filtro, valores = _blocosDe(mapa)
+        consulta = (
+            f"SELECT quantidade FROM {tabela} AS b WHERE {filtro}"
+            "b.nivel = ? AND b.bloco = 0"
+        )
+        linha = self.conexao.execute(consulta, valores + [NIVEIS]).fetchone()
+        return linha[0] if linha else 0
+
+    # Mapas com alguma partida, em ordem alfabética
+    def mapas(self) -> list:
+        consulta = "SELECT DISTINCT mapa FROM contagens ORDER BY mapa"
+        return [linha[0] for linha in self.conexao.execute(consulta)]
+
+    # Importa o scores.txt antigo (nome;pontos;mapa) se o placar está vazio
+    def importarTexto(self, arquivo: str) -> Future:
+        if self.total() or not os.path.exists(arquivo):
+            return None
+        partidas = []
+        data = os.path.getmtime(arquivo)
+        with open(arquivo, "r") as f:
+            for linha in f:
+                partes = linha.strip().split(";")
+                if len(partes) == 3:
+                    nome, pontos, mapaNome = partes
+                elif len(partes) == 2:  # Retrocompatibilidade
+                    nome, pontos = partes
+                    mapaNome = ""
+                else:
+                    continue
+                partidas.append((nome, int(pontos), mapaNome or "Desconhecido", data))
+        print(f"Importando {len(partidas)} pontuações de {arquivo}")
+        return self.registrarVarias(partidas)
+
+    # Espera as gravações pendentes e fecha as conexões
+    def encerrar(self) -> None:
+        self.executor.submit(self._fecharEscrita)
+        self.executor.shutdown(wait=True)
+        self.conexao.close()
+
+    def _fecharEscrita(self) -> None:
+        if self._escrita is not None:
+            self._escrita.close()
+            self._escrita = None
+
+
+# Tabela dos blocos do ranking pedido, o começo do filtro e os seus valores
+def _blocosDe(mapa: str) -> tuple:
+    if mapa is None:
+        return "blocos_geral", "", []
+    return "blocos", "b.mapa = ? AND ", [mapa]
+
+
+# Quantidades a somar nos blocos por uma leva de partidas, já agrupadas:
+# (mapa, nivel, bloco, quantidade) e (nivel, bloco, quantidade) do geral
+def _blocos(partidas: list) -> tuple:
+    contagens = Counter((mapa, pontos) for _, pontos, mapa, _ in partidas)
+    porMapa = Counter()
+    geral = Counter()
+    for (mapa, pontos), quantidade in contagens.items():
+        for nivel in range(NIVEIS + 1):
+            bloco = pontos >> nivel
+            porMapa[mapa, nivel, bloco] += quantidade
+            geral[nivel, bloco] += quantidade
+    return (
+        [(*chave, n) for chave, n in porMapa.items()],
+        [(*chave, n) for chave, n in geral.items()],
+    )
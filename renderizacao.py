@@ -0,0 +1,142 @@
+from collections import OrderedDict
+
+import pygame
+
+import config as cfg
+import salvamento
+from mapa import Mapa
+
+
+# Camadas pré-desenhadas do mapa. As paredes são desenhadas uma vez no
+# 'fundo'; a 'camada' é o fundo com os pontos por cima e é o que vai para a
+# tela. Quando um ponto é comido, só aquele tile da camada é apagado,
+# copiando o pedaço correspondente do fundo. Os tiles alterados ficam em
+# 'alterados' para o modo de retângulos sujos levá-los à tela.
+class CamadasMapa:
+    def __init__(self, mapa: Mapa) -> None:
+        self.mapa = mapa
+        tamanho = (mapa.col * cfg.TILE_SIZE, mapa.lin * cfg.TILE_SIZE)
+        self.fundo = pygame.Surface(tamanho).convert()
+        self.fundo.fill(cfg.PRETO)
+        for y in range(mapa.lin):
+            for x in range(mapa.col):
+                if not mapa.passavel(x, y):
+                    self._desenharParede(x, y)
+
+        self.camada = self.fundo.copy()
+        for x, y in mapa.posicoesItens():
+            self._desenharItem(x, y, mapa.conteudo(x, y))
+
+        self.alterados = []  # Tiles redesenhados desde o último quadro
+        mapa.adicionarObservador(self.aoAlterarMapa)
+
+    def _tile(self, x: int, y: int) -> pygame.Rect:
+        return pygame.Rect(
+            x * cfg.TILE_SIZE, y * cfg.TILE_SIZE, cfg.TILE_SIZE, cfg.TILE_SIZE
+        )
+
+    def _desenharParede(self, x: int, y: int) -> None:
+        pygame.draw.rect(self.fundo, cfg.AZUL, self._tile(x, y))
+
+    def _desenharItem(self, x: int, y: int, char: str) -> None:
+        if char == ".":
+            raio = 4
+        elif char == "0":
+            raio = 8
+        else:
+            return
+        pygame.draw.circle(self.camada, cfg.BRANCO, self._tile(x, y).center, raio)
+
+    # Observador do mapa: redesenha só o tile alterado
+    def aoAlterarMapa(self, x: int, y: int, antigo: str, novo: str) -> None:
+        tile = self._tile(x, y)
+        if (antigo == "#") != (novo == "#"):
+            self.fundo.fill(cfg.PRETO, tile)
+            if novo == "#":
+                self._desenharParede(x, y)
+
+        # Apaga o tile da camada com o fundo e desenha o item novo, se houver
+        self.camada.blit(self.fundo, tile, tile)
+        self._desenharItem(x, y, novo)
+        self.alterados.append(tile)
+
+    # Desenha o mapa na tela a partir da posição (0, offsetY)
+    def desenhar(self, tela, offsetY: int) -> None:
+        tela.blit(self.camada, (0, offsetY))
+
+    # Copia para a tela só o pedaço da camada sob 'area' (em coordenadas da tela)
+    def restaurar(self, tela, area: pygame.Rect, offsetY: int) -> pygame.Rect:
+        return tela.blit(self.camada, area, area.move(0, -offsetY))
+
+    # Para de acompanhar o mapa (troca de nível ou de save)
+    def encerrar(self) -> None:
+        self.mapa.removerObservador(self.aoAlterarMapa)
+
+
+# Fonte com cache das superfícies de texto já renderizadas, chaveado por
+# (texto, antialias, cor, fundo) e com descarte LRU. Tem o mesmo render() do
+# pygame.font.Font, então os estados usam como se fosse a própria fonte.
+# As superfícies devolvidas são compartilhadas: só podem ser lidas/blitadas.
+class FonteCache:
+    def __init__(self, fonte, capacidade: int) -> None:
+        self.fonte = fonte
+        self.capacidade = capacidade
+        self.textos = OrderedDict()
+
+        # Métricas
+        self.acertos = 0
+        self.faltas = 0
+
+    def render(self, texto: str, antialias: bool, cor, fundo=None):
+        chave = (texto, antialias, tuple(cor), tuple(fundo) if fundo else None)
+        superficie = self.textos.get(chave)
+        if superficie is not None:
+            self.textos.move_to_end(chave)
+            self.acertos += 1
+            return superficie
+
+        self.faltas += 1
+        superficie = self.fonte.render(texto, antialias, cor, fundo)
+        self.textos[chave] = superficie
+        if len(self.textos) > self.capacidade:
+            self.textos.popitem(last=False)
+        return superficie
+
+    # Desenha 'prefixo' seguido de 'numero' montado com os glifos de cada
+    # dígito (que ficam no cache), sem renderizar um texto novo a cada valor.
+    # (x, y) é o canto superior esquerdo, ou o direito se 'direita' for True.
+    # Retorna a área desenhada
+    def desenharNumero(
+        self, tela, prefixo: str, numero: int, cor, x: int, y: int, direita=False
+    ) -> pygame.Rect:
+        partes = [self.render(prefixo, True, cor)]
+        partes += [self.render(digito, True, cor) for digito in str(numero)]
+        largura = sum(parte.get_width() for parte in partes)
+        altura = max(parte.get_height() for parte in partes)
+        if direita:
+            x -= largura
+
+        area = pygame.Rect(x, y, largura, altura)
+        for parte in partes:
+            tela.blit(parte, (x, y))
+            x += parte.get_width()
+        return area
+
+    def get_height(self) -> int:
+        return self.fonte.get_height()
+
+
+# Cores da miniatura de um save, pelo código de cada célula (ver salvamento.py)
+CORES_MINIATURA = (cfg.PRETO, cfg.AZUL, cfg.BRANCO, cfg.AMARELO)
+
+
+# Desenha a miniatura de um save (bytes de salvamento.miniatura) numa
+# superfície de LADO_MINIATURA * escala pixels de lado
+def superficieMiniatura(bits: bytes, escala: int) -> pygame.Surface:
+    lado = salvamento.LADO_MINIATURA
+    superficie = pygame.Surface((lado * escala, lado * escala))
+    for i, codigo in enumerate(salvamento.lerMiniatura(bits)):
+        if codigo:
+            area = ((i % lado) * escala, (i // lado) * escala, escala, escala)
+            superficie.fill(CORES_MINIATURA[codigo], area)
+    return superficie
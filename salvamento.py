@@ -0,0 +1,437 @@
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from mapa import PAREDE, PONTO, POWERUP, Mapa
+from simulacao import Simulacao
+
+# Formato binário dos saves (little-endian). Só estado simples: nada de
+# objetos, então carregar um save nunca executa código como o pickle.
+#
+#   cabeçalho  MAGICO, versão, tamanho do resto, CRC32 do resto
+#   resumo     tamanho fixo: o que o menu de load mostra, com a miniatura
+#              (desde a versão 2; ver lerResumo e catalogo.py)
+#   corpo      geral + nome do mapa (utf-8)
+#              bitset dos pontos + bitset dos power-ups (1 bit por célula)
+#              Pacman
+#              quantidade de fantasmas, e para cada um: fantasma + plano
+#
+# As paredes não vão para o save: o mapa é lido de novo do arquivo da fase,
+# e o hash do conteúdo garante que é o mesmo arquivo.
+MAGICO = b"PMSV"
+VERSAO = 2
+EXTENSAO = ".sav"
+
+CABECALHO = struct.Struct("<4sHII")
+# nome do mapa, ticks, pontos, vidas, itens restantes, data (epoch), miniatura
+RESUMO = struct.Struct("<32sIiBId256s")
+LADO_MINIATURA = 32  # Células da miniatura, 2 bits cada (ver MINIATURA_*)
+MINIATURA_VAZIO, MINIATURA_PAREDE, MINIATURA_ITEM, MINIATURA_PACMAN = range(4)
+# hash do mapa, lin, col, ticks, powerupAtivo, powerupTimer, tamanho do nome
+GERAL = struct.Struct("<32sHHIBiH")
+# x, y, xGrid, yGrid, direção (x, y), próxima direção (x, y), speed, vidas,
+# pontos, invencível, invencivelTimer, parpadeoToggle, animacaoIndex, orientação
+PACMAN = struct.Struct("<iiiibbbbbbiBiBdB")
+QUANTIDADE = struct.Struct("<H")
+# x, y, xGrid, yGrid, direção (x, y), speed, tempoPreso, assustado,
+# tempoAssustado, animacaoIndex, preferência, modoPlano, tem alvo,
+# alvo (x, y), células no plano
+FANTASMA = struct.Struct("<iiiibbbiBidBBBHHH")
+CELULA = struct.Struct("<HH")
+
+
+# Save corrompido, de outra versão ou de um mapa que mudou
+class ErroSave(Exception):
+    pass
+
+
+def _bitset(indices, n: int) -> bytearray:
+    bits = bytearray((n + 7) // 8)
+    for i in indices:
+        bits[i >> 3] |= 1 << (i & 7)
+    return bits
+
+
+# Índices ligados no bitset (bytes zerados são pulados inteiros)
+def _indicesBitset(bits: bytes, n: int) -> set:
+    indices = set()
+    for b, byte in enumerate(bits):
+        if byte:
+            indices.update(i for i in range(b * 8, b * 8 + 8) if byte >> (i & 7) & 1)
+    return {i for i in indices if i < n}
+
+
+# Serializa a partida da simulação. Retorna os bytes do arquivo
+def serializar(sim: Simulacao) -> bytes:
+    mapa = sim.mapa
+    if mapa.versaoParedes:
+        raise ErroSave("As paredes do mapa mudaram; o save só guarda os itens")
+
+    n = mapa.lin * mapa.col
+    nome = sim.nomeMapa.encode("utf-8")
+    partes = [
+        GERAL.pack(
+            bytes.fromhex(mapa.hashConteudo or "00" * 32),
+            mapa.lin,
+            mapa.col,
+            sim.ticks,
+            sim.powerupAtivo,
+            sim.powerupTimer,
+            len(nome),
+        ),
+        nome,
+        _bitset(mapa.itens.pontos, n),
+        _bitset(mapa.itens.powerups, n),
+    ]
+
+    partes.extend(empacotarEntidades(sim))
+    corpo = _resumo(sim) + b"".join(partes)
+    return CABECALHO.pack(MAGICO, VERSAO, len(corpo), zlib.crc32(corpo)) + corpo
+
+
+def _resumo(sim: Simulacao) -> bytes:
+    return RESUMO.pack(
+        sim.nomeMapa.encode("utf-8")[:32],
+        sim.ticks,
+        sim.pacman.pontos,
+        max(sim.pacman.vidas, 0),
+        len(sim.mapa.itens),
+        time.time(),
+        miniatura(sim),
+    )
+
+
+# Mapa reduzido a LADO_MINIATURA x LADO_MINIATURA células de 2 bits (parede,
+# item, vazio e o Pacman por cima), amostrando a grade
+def miniatura(sim: Simulacao) -> bytes:
+    mapa = sim.mapa
+    lado = LADO_MINIATURA
+    pacman = (
+        sim.pacman.yGrid * lado // mapa.lin,
+        sim.pacman.xGrid * lado // mapa.col,
+    )
+    bits = bytearray(lado * lado // 4)
+    for my in range(lado):
+        linha = (my * mapa.lin // lado) * mapa.col
+        for mx in range(lado):
+            codigo = mapa.grade[linha + mx * mapa.col // lado]
+            if (my, mx) == pacman:
+                valor = MINIATURA_PACMAN
+            elif codigo == PAREDE:
+                valor = MINIATURA_PAREDE
+            elif codigo == PONTO or codigo == POWERUP:
+                valor = MINIATURA_ITEM
+            else:
+                valor = MINIATURA_VAZIO
+            i = my * lado + mx
+            bits[i >> 2] |= valor << ((i & 3) * 2)
+    return bytes(bits)
+
+
+# Códigos da miniatura, linha por linha (lado * lado valores)
+def lerMiniatura(bits: bytes) -> list:
+    return [bits[i >> 2] >> ((i & 3) * 2) & 3 for i in range(len(bits) * 4)]
+
+
+# Pacman e fantasmas (com os planos), como partes de bytes. Também é o
+# conteúdo das fotos periódicas do autosave
+def empacotarEntidades(sim: Simulacao) -> list:
+    p = sim.pacman
+    partes = [
+        PACMAN.pack(
+            p.rect.x,
+            p.rect.y,
+            p.xGrid,
+            p.yGrid,
+            *p.direcao,
+            *p.proximaDirecao,
+            p.speed,
+            p.vidas,
+            p.pontos,
+            p.invencivel,
+            p.invencivelTimer,
+            p.parpadeoToggle,
+            p.animacaoIndex,
+            p.orientacao,
+        )
+    ]
+
+    partes.append(QUANTIDADE.pack(len(sim.fantasmas)))
+    for f in sim.fantasmas:
+        alvo = f.alvoPlano or (0, 0)
+        plano = f.plano
+        partes.append(
+            FANTASMA.pack(
+                f.rect.x,
+                f.rect.y,
+                f.xGrid,
+                f.yGrid,
+                *f.direcao,
+                f.speed,
+                f.tempoPreso,
+                f.assustado,
+                f.tempoAssustado,
+                f.animacaoIndex,
+                f.preferencia,
+                f.modoPlano,
+                f.alvoPlano is not None,
+                *alvo,
+                len(plano),
+            )
+        )
+        partes.extend(CELULA.pack(x, y) for x, y in plano)
+
+    return partes
+
+
+# Lê os bytes de um save e retorna um dicionário só com valores simples
+def desserializar(dados: bytes) -> dict:
+    if len(dados) < CABECALHO.size:
+        raise ErroSave("Arquivo curto demais para ser um save")
+    versao, tamanho, crc = _lerCabecalho(dados)
+    corpo = dados[CABECALHO.size :]
+    if len(corpo) != tamanho or zlib.crc32(corpo) != crc:
+        raise ErroSave("Save corrompido (checksum não confere)")
+
+    try:
+        # A versão 1 não tem o resumo; o resto é igual
+        return _lerCorpo(corpo[RESUMO.size :] if versao >= 2 else corpo)
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ErroSave(f"Save malformado: {e}") from e
+
+
+def _lerCabecalho(dados: bytes) -> tuple:
+    magico, versao, tamanho, crc = CABECALHO.unpack_from(dados)
+    if magico != MAGICO:
+        raise ErroSave("O arquivo não é um save do Pacman")
+    if not 1 <= versao <= VERSAO:
+        raise ErroSave(f"Versão de save não suportada: {versao}")
+    return versao, tamanho, crc
+
+
+# Lê só o cabeçalho e o resumo do save (alguns bytes do começo do arquivo),
+# sem conferir o checksum do resto. Saves da versão 1 não têm resumo: None
+def lerResumo(caminho: str):
+    with open(caminho, "rb") as arq:
+        dados = arq.read(CABECALHO.size + RESUMO.size)
+    if len(dados) < CABECALHO.size:
+        raise ErroSave("Arquivo curto demais para ser um save")
+    if _lerCabecalho(dados)[0] < 2:
+        return None
+    if len(dados) < CABECALHO.size + RESUMO.size:
+        raise ErroSave("Resumo do save incompleto")
+    nome, ticks, pontos, vidas, itens, data, bits = RESUMO.unpack_from(
+        dados, CABECALHO.size
+    )
+    return {
+        "nomeMapa": nome.rstrip(b"\0").decode("utf-8", "replace"),
+        "ticks": ticks,
+        "pontos": pontos,
+        "vidas": vidas,
+        "itens": itens,
+        "data": data,
+        "miniatura": bits,
+    }
+
+
+# Leitura sequencial de estruturas de um buffer
+class Leitor:
+    def __init__(self, dados: bytes, pos: int = 0) -> None:
+        self.dados = dados
+        self.pos = pos
+
+    def ler(self, formato: struct.Struct) -> tuple:
+        valores = formato.unpack_from(self.dados, self.pos)
+        self.pos += formato.size
+        return valores
+
+    def lerBytes(self, tamanho: int) -> bytes:
+        if self.pos + tamanho > len(self.dados):
+            raise struct.error("fim inesperado dos dados")
+        self.pos += tamanho
+        return self.dados[self.pos - tamanho : self.pos]
+
+
+def _lerCorpo(corpo: bytes) -> dict:
+    leitor = Leitor(corpo)
+    geral = leitor.ler(GERAL)
+    hashMapa, lin, col, ticks, powerupAtivo, powerupTimer, tamanhoNome = geral
+    nome = leitor.lerBytes(tamanhoNome).decode("utf-8")
+    dados = {
+        "hashMapa": hashMapa.hex(),
+        "lin": lin,
+        "col": col,
+        "ticks": ticks,
+        "powerupAtivo": bool(powerupAtivo),
+        "powerupTimer": powerupTimer,
+        # Só o nome do arquivo: o save não escolhe pastas fora das fases
+        "nomeMapa": os.path.basename(nome),
+    }
+    n = lin * col
+    dados["pontos"] = _indicesBitset(leitor.lerBytes((n + 7) // 8), n)
+    dados["powerups"] = _indicesBitset(leitor.lerBytes((n + 7) // 8), n)
+    lerEntidades(leitor, dados)
+    return dados
+
+
+# Lê o que empacotarEntidades escreveu, preenchendo 'pacman' e 'fantasmas'
+def lerEntidades(leitor: Leitor, dados: dict) -> None:
+    valores = leitor.ler(PACMAN)
+    dados["pacman"] = {
+        "x": valores[0],
+        "y": valores[1],
+        "xGrid": valores[2],
+        "yGrid": valores[3],
+        "direcao": (valores[4], valores[5]),
+        "proximaDirecao": (valores[6], valores[7]),
+        "speed": valores[8],
+        "vidas": valores[9],
+        "pontos": valores[10],
+        "invencivel": bool(valores[11]),
+        "invencivelTimer": valores[12],
+        "parpadeoToggle": bool(valores[13]),
+        "animacaoIndex": valores[14],
+        "orientacao": valores[15],
+    }
+
+    dados["fantasmas"] = []
+    for _ in range(leitor.ler(QUANTIDADE)[0]):
+        valores = leitor.ler(FANTASMA)
+        plano = [leitor.ler(CELULA) for _ in range(valores[16])]
+        dados["fantasmas"].append(
+            {
+                "x": valores[0],
+                "y": valores[1],
+                "xGrid": valores[2],
+                "yGrid": valores[3],
+                "direcao": (valores[4], valores[5]),
+                "speed": valores[6],
+                "tempoPreso": valores[7],
+                "assustado": bool(valores[8]),
+                "tempoAssustado": valores[9],
+                "animacaoIndex": valores[10],
+                "preferencia": valores[11],
+                "modoPlano": bool(valores[12]),
+                "alvoPlano": (valores[14], valores[15]) if valores[13] else None,
+                "plano": plano,
+            }
+        )
+
+
+# Lê a fase do save e deixa os itens como estavam. Não toca em nada do
+# pygame, então pode rodar fora da thread do jogo
+def prepararMapa(dados: dict, diretorioFases: str = "fases") -> Mapa:
+    mapa = Mapa(os.path.join(diretorioFases, dados["nomeMapa"]))
+    if mapa.hashConteudo != dados["hashMapa"]:
+        raise ErroSave(f"A fase {dados['nomeMapa']} mudou desde o save")
+    if (mapa.lin, mapa.col) != (dados["lin"], dados["col"]):
+        raise ErroSave("Dimensões do mapa não conferem")
+
+    # Tira os itens já comidos (e põe os que o save tem e o arquivo não)
+    itens = {i: " " for i in mapa.itens}
+    itens.update(dict.fromkeys(dados["pontos"], "."))
+    itens.update(dict.fromkeys(dados["powerups"], "0"))
+    for i, char in itens.items():
+        mapa.atualizarConteudo(i % mapa.col, i // mapa.col, char)
+    return mapa
+
+
+# Monta a simulação de um save (o mapa é lido uma vez só, da pasta das fases).
+# 'mapa' é o que prepararMapa já devolveu, se foi lido antes
+def montarSimulacao(dados: dict, diretorioFases: str = "fases", mapa=None, **opcoes):
+    if mapa is None:
+        mapa = prepararMapa(dados, diretorioFases)
+
+    sim = Simulacao(mapa, dados["nomeMapa"], **opcoes)
+    if len(sim.fantasmas) != len(dados["fantasmas"]):
+        raise ErroSave("Quantidade de fantasmas não confere com o mapa")
+    sim.ticks = dados["ticks"]
+    sim.powerupAtivo = dados["powerupAtivo"]
+    sim.powerupTimer = dados["powerupTimer"]
+
+    p = sim.pacman
+    for nome, valor in dados["pacman"].items():
+        if nome in ("x", "y"):
+            setattr(p.rect, nome, valor)
+        else:
+            setattr(p, nome, valor)
+    p.guardarPosicao()
+
+    for f, estado in zip(sim.fantasmas, dados["fantasmas"]):
+        for nome, valor in estado.items():
+            if nome in ("x", "y"):
+                setattr(f.rect, nome, valor)
+            elif nome == "plano":
+                f.plano = valor
+            else:
+                setattr(f, nome, valor)
+    sim.lojaFantasmas.guardarPosicoes()
+    sim.indexarFantasmas()
+    return sim
+
+
+# Grava o arquivo inteiro ou nada: escreve num temporário, força para o disco
+# e troca de nome (a troca é atômica), então uma queda no meio nunca deixa
+# um arquivo pela metade no lugar do antigo
+def gravarAtomico(caminho: str, dados: bytes) -> None:
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as arq:
+        arq.write(dados)
+        arq.flush()
+        os.fsync(arq.fileno())
+    os.replace(temporario, caminho)
+
+
+def salvar(caminho: str, sim: Simulacao) -> None:
+    gravarAtomico(caminho, serializar(sim))
+
+
+def carregar(caminho: str) -> dict:
+    with open(caminho, "rb") as arq:
+        return desserializar(arq.read())
+
+
+# Lê o save e a fase dele (a parte lenta de carregar, que é disco e parsing)
+def _lerSave(caminho: str, diretorioFases: str) -> tuple:
+    dados = carregar(caminho)
+    return dados, prepararMapa(dados, diretorioFases)
+
+
+# Thread de disco para os saves, para o jogo não travar em cartões ou discos
+# lentos. O jogo serializa a partida na hora (os bytes são a foto, e a
+# partida pode continuar mudando) e a thread só grava. Uma thread só: as
+# operações terminam na ordem em que foram pedidas. Quem pede recebe um
+# Future e confere done() a cada quadro, sem bloquear.
+class TrabalhadorArquivos:
+    # 'aoGravar(caminho)' roda na thread depois de cada save gravado (o
+    # índice dos saves, por exemplo)
+    def __init__(self, aoGravar=None) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="salvamento"
+        )
+        self.aoGravar = aoGravar
+
+    # Grava a partida atual em 'caminho'. O Future termina com o caminho
+    def salvar(self, caminho: str, sim: Simulacao) -> Future:
+        dados = serializar(sim)
+        return self.executor.submit(self._gravar, caminho, dados)
+
+    def _gravar(self, caminho: str, dados: bytes) -> str:
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        gravarAtomico(caminho, dados)
+        if self.aoGravar:
+            self.aoGravar(caminho)
+        return caminho
+
+    # Lê o save e a fase. O Future termina com (dados, mapa), prontos para
+    # montarSimulacao(dados, mapa=mapa) na thread do jogo (sprites do pygame)
+    def carregar(self, caminho: str, diretorioFases: str = "fases") -> Future:
+        return self.executor.submit(_lerSave, caminho, diretorioFases)
+
+    # Espera as gravações pendentes (um save pedido não pode se perder)
+    def encerrar(self) -> None:
+        self.executor.shutdown(wait=True)
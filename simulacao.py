@@ -0,0 +1,247 @@
+import random
+
+import config as cfg
+from caminhos import CampoDistancia
+from colisoes import HashEspacial
+from entidades import ArmazemFantasmas, Fantasma, Pacman
+from ia import EscalonadorIA, ServicoCaminhosAssincrono
+from mapa import Mapa
+
+# Situação da partida
+JOGANDO = "jogando"
+VITORIA = "vitoria"
+DERROTA = "derrota"
+
+# Pontuação
+PONTOS_PONTO = 10
+PONTOS_POWERUP = 50
+PONTOS_FANTASMA = 200
+BONUS_VITORIA = 1000
+
+DURACAO_POWERUP = 15 * 60  # 15 segundos a 60 ticks por segundo
+TEMPO_PRESO_COMIDO = 150  # Ticks preso depois de ser comido
+
+
+# Núcleo da simulação, sem nada de pygame: mapa, Pacman, fantasmas, pontos e
+# timers. Cada chamada de step() avança um tick e retorna os eventos que
+# aconteceram nele, para quem desenha (ou grava, ou treina) reagir.
+#
+# Eventos: ("ponto", x, y), ("powerup", x, y), ("fantasma_comido", indice),
+# ("morte",), ("fim_powerup",), ("vitoria",), ("derrota",)
+class Simulacao:
+    def __init__(
+        self,
+        mapa: Mapa,
+        nomeMapa: str = "",
+        semente: int = None,
+        sheet=None,
+        orcamentoIAUs: int = None,
+    ) -> None:
+        self.mapa = mapa
+        self.nomeMapa = nomeMapa
+        self.sheet = sheet  # Folha de sprites (None na simulação sem tela)
+        self.rng = random.Random(semente)
+        self.orcamentoIAUs = orcamentoIAUs  # None: replaneja sem limite de tempo
+
+        self.ticks = 0
+        self.estado = JOGANDO
+        self.powerupAtivo = False
+        self.powerupTimer = 0
+
+        # Pacman
+        if self.mapa.posicaoInicialPacman:
+            px, py = self.mapa.posicaoInicialPacman
+        else:
+            px, py = 1, 1
+        self.pacman = Pacman(px, py, sheet)
+
+        # Fantasmas, guardados juntos em arrays no armazém
+        self.lojaFantasmas = ArmazemFantasmas()
+        for fx, fy in self.mapa.posicaoInicialFantasmas:
+            Fantasma(fx, fy, sheet, self.lojaFantasmas)
+        self.fantasmas = self.lojaFantasmas.fantasmas
+
+        self.espacial = HashEspacial(cfg.TILE_SIZE)  # Fase larga das colisões
+        self.indexarFantasmas()
+
+        self.servicoCaminhos = None
+        self.prepararIA()
+
+    # Cria a simulação a partir de um arquivo de fase
+    @classmethod
+    def deArquivo(cls, caminho: str, **opcoes) -> "Simulacao":
+        nomeMapa = caminho.replace("\\", "/").split("/")[-1]
+        return cls(Mapa(caminho), nomeMapa, **opcoes)
+
+    # Prepara a IA compartilhada do mapa atual: o campo de distâncias do Pacman,
+    # o escalonador (se houver orçamento) e, com ele, em mapas muito grandes,
+    # o serviço de caminhos em processos separados
+    def prepararIA(self) -> None:
+        self.campo = CampoDistancia(self.mapa)
+
+        self.escalonador = None
+        if self.orcamentoIAUs is not None:
+            self.escalonador = EscalonadorIA(self.orcamentoIAUs)
+
+        if self.servicoCaminhos:
+            self.servicoCaminhos.encerrar()
+        self.servicoCaminhos = None
+
+        celulas = self.mapa.lin * self.mapa.col
+        if self.escalonador and (
+            cfg.IA_ASSINCRONA or celulas >= cfg.CELULAS_IA_ASSINCRONA
+        ):
+            self.servicoCaminhos = ServicoCaminhosAssincrono(
+                self.mapa, cfg.TRABALHADORES_IA
+            )
+
+        self.lojaFantasmas.rng = self.rng
+
+    # Refaz o hash espacial com os fantasmas atuais (chave = índice na lista).
+    # Necessário quando os fantasmas são movidos por fora do step (um save)
+    def indexarFantasmas(self) -> None:
+        self.espacial.limpar()
+        for i, celula in enumerate(self.lojaFantasmas.celulas()):
+            self.espacial.atualizarCelula(i, celula)
+
+    # Libera os processos da IA assíncrona, se existirem
+    def encerrar(self) -> None:
+        if self.servicoCaminhos:
+            self.servicoCaminhos.encerrar()
+            self.servicoCaminhos = None
+
+    # Avança um tick. 'entrada' é a direção pedida pelo jogador neste tick
+    # (ou None para manter a anterior)
+    def step(self, entrada: tuple = None) -> list:
+        eventos = []
+        if self.estado != JOGANDO:
+            return eventos
+
+        self.ticks += 1
+        self.pacman.guardarPosicao()
+        self.lojaFantasmas.guardarPosicoes()
+
+        if entrada is not None:
+            self.pacman.definirDirecao(entrada)
+
+        self.pacman.update(self.mapa)
+        self._moverFantasmas()
+
+        if self._colisoes(eventos):
+            return eventos
+        if self._comer(eventos):
+            return eventos
+        self._timerPowerup(eventos)
+        return eventos
+
+    def _moverFantasmas(self) -> None:
+        # Campo de distâncias do Pacman, refeito só quando ele troca de célula
+        self.campo.atualizar(*self.pacman.getPosGrad())
+
+        # Pede os replanejamentos e executa os que couberem no orçamento
+        if self.escalonador:
+            for fantasma in self.fantasmas:
+                if fantasma.precisaPlano(self.mapa, self.campo):
+                    self.escalonador.solicitar(fantasma)
+            self.escalonador.executar(self.mapa, self.campo, self.servicoCaminhos)
+
+        # Só quem trocou de célula muda no hash espacial
+        loja = self.lojaFantasmas
+        loja.update(self.mapa, self.campo, self.escalonador)
+        for i in loja.mudaram:
+            self.espacial.atualizarCelula(i, (loja.xGrid[i], loja.yGrid[i]))
+
+    # Colisão Pacman x fantasmas. Retorna True se a partida acabou. Só os
+    # fantasmas nas células vizinhas à do Pacman são testados de verdade
+    def _colisoes(self, eventos: list) -> bool:
+        pacman = self.pacman
+        if pacman.invencivel:
+            return False  # Invencível ignora colisões
+        hitboxPacman = pacman.rect.inflate(-10, -10)
+
+        for i in self.espacial.consultar(pacman.rect):
+            fantasma = self.fantasmas[i]
+            if not hitboxPacman.colliderect(fantasma.rect.inflate(-10, -10)):
+                continue
+
+            if fantasma.assustado:
+                # Pacman come o fantasma
+                pacman.pontos += PONTOS_FANTASMA
+                fantasma.rect.x = fantasma.xInicio * cfg.TILE_SIZE
+                fantasma.rect.y = fantasma.yInicio * cfg.TILE_SIZE
+                fantasma.assustado = False
+                fantasma.tempoPreso = TEMPO_PRESO_COMIDO
+                self.espacial.atualizar(i, fantasma.rect)
+                eventos.append(("fantasma_comido", i))
+                continue
+
+            # Perde vida
+            eventos.append(("morte",))
+            if pacman.morrer():
+                # Se acabou as vidas → GAME OVER
+                self.estado = DERROTA
+                eventos.append(("derrota",))
+                return True
+
+            # O Pacman voltou ao início invencível: nada mais colide neste tick
+            pacman.proximaDirecao = (0, 0)
+            break
+        return False
+
+    # Pares (i, j), i < j, de fantasmas que estão se tocando
+    def colisoesEntreFantasmas(self) -> list:
+        pares = []
+        for i, fantasma in enumerate(self.fantasmas):
+            hitbox = fantasma.rect.inflate(-10, -10)
+            for j in self.espacial.consultar(fantasma.rect):
+                outro = self.fantasmas[j].rect.inflate(-10, -10)
+                if j > i and hitbox.colliderect(outro):
+                    pares.append((i, j))
+        return pares
+
+    # Lógica de comer pontos (baseada na grade). Retorna True em caso de vitória
+    def _comer(self, eventos: list) -> bool:
+        if not self.pacman.esta_centralizado():
+            return False
+
+        px, py = self.pacman.getPosGrad()
+        # Verifica limites para evitar sair do mapa
+        if not (0 <= py < self.mapa.lin and 0 <= px < self.mapa.col):
+            return False
+
+        # O índice de itens diz o que há aqui sem olhar a grade
+        i = self.mapa.indice(px, py)
+        itens = self.mapa.itens
+        if i in itens.pontos:
+            self.mapa.atualizarConteudo(px, py, " ")
+            self.pacman.pontos += PONTOS_PONTO
+            eventos.append(("ponto", px, py))
+
+        elif i in itens.powerups:
+            self.mapa.atualizarConteudo(px, py, " ")
+            self.pacman.pontos += PONTOS_POWERUP
+            eventos.append(("powerup", px, py))
+
+            # Deixa todos os fantasmas assustados
+            self.powerupAtivo = True
+            self.powerupTimer = DURACAO_POWERUP
+            self.lojaFantasmas.definirAssustados(True, 1)  # mais lentos
+
+        # --- Verifica a vitoria ---
+        if self.mapa.pontosRestantes <= 0:
+            # Adiciona um bônus por completar a fase
+            self.pacman.pontos += BONUS_VITORIA
+            self.estado = VITORIA
+            eventos.append(("vitoria",))
+            return True
+        return False
+
+    def _timerPowerup(self, eventos: list) -> None:
+        if not self.powerupAtivo:
+            return
+        self.powerupTimer -= 1
+        if self.powerupTimer <= 0:
+            self.powerupAtivo = False
+            # Velocidade normal
+            self.lojaFantasmas.definirAssustados(False, cfg.VELOCIDADE - 1)
+            eventos.append(("fim_powerup",))
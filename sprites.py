@@ -0,0 +1,63 @@
+import pygame
+
+from config import PRETO, TILE_SIZE
+
+# Posições na folha de sprites (pixels, quadros de 16x16)
+QUADROS_PACMAN = [(0, 0), (16, 0), (32, 0), (16, 0)]  # Fechado, Meio, Aberto, Meio
+QUADROS_FANTASMA = [(0, 64), (16, 64)]  # Vermelho
+QUADROS_ASSUSTADO = [(128, 64), (144, 64)]  # Azul
+
+# Orientações do Pacman: índice -> ângulo de rotação do quadro original
+DIREITA = 0
+CIMA = 1
+ESQUERDA = 2
+BAIXO = 3
+ANGULOS = (0, 90, 180, 270)
+ORIENTACAO = {(1, 0): DIREITA, (0, -1): CIMA, (-1, 0): ESQUERDA, (0, 1): BAIXO}
+
+_atlas = {}  # id da folha -> AtlasSprites (um por folha no processo inteiro)
+
+
+# Todos os quadros do jogo recortados, escalados, com a cor de fundo
+# transparente, convertidos para o formato da tela e (os do Pacman) já
+# girados para cada direção. É feito uma vez por folha; as entidades
+# guardam só índices de quadro e orientação.
+class AtlasSprites:
+    def __init__(self, folha) -> None:
+        self.folha = folha
+        # pacman[orientacao][quadro]
+        self.pacman = [
+            [self._girar(self._recortar(x, y), angulo) for x, y in QUADROS_PACMAN]
+            for angulo in ANGULOS
+        ]
+        self.fantasma = [self._recortar(x, y) for x, y in QUADROS_FANTASMA]
+        self.assustado = [self._recortar(x, y) for x, y in QUADROS_ASSUSTADO]
+
+    # Recorta um quadro 16x16 da folha e escala para o tamanho do tile
+    def _recortar(self, x: int, y: int, w: int = 16, h: int = 16):
+        sprite = pygame.Surface((w, h))
+        sprite.blit(self.folha, (0, 0), (x, y, w, h))
+        sprite.set_colorkey(PRETO)  # Define o preto como transparente
+        return self._converter(pygame.transform.scale(sprite, (TILE_SIZE, TILE_SIZE)))
+
+    def _girar(self, sprite, angulo: int):
+        if angulo == 0:
+            return sprite
+        return self._converter(pygame.transform.rotate(sprite, angulo))
+
+    # Converte para o formato da tela (blits mais rápidos), se já houver uma
+    def _converter(self, sprite):
+        if pygame.display.get_surface() is None:
+            return sprite
+        return sprite.convert()
+
+
+# Atlas da folha de sprites, criado na primeira vez que a folha é usada
+def atlasDe(folha):
+    if folha is None:
+        return None
+    atlas = _atlas.get(id(folha))
+    if atlas is None or atlas.folha is not folha:
+        atlas = AtlasSprites(folha)
+        _atlas[id(folha)] = atlas
+    return atlas
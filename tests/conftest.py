@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# Os testes importam os módulos do jogo direto da raiz do repositório
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FASES = os.path.join(RAIZ, "fases")
+sys.path.insert(0, RAIZ)
+
+
+# Cada teste roda numa pasta temporária: caches e saves não sujam o repositório
+@pytest.fixture(autouse=True)
+def pastaTemporaria(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,108 @@
+import os
+import random
+
+import salvamento
+from autosave import EVENTOS_ENTIDADES, Autosave
+from conftest import FASES
+from simulacao import JOGANDO, Simulacao
+
+DIRECOES = [(1, 0), (-1, 0), (0, 1), (0, -1), None]
+
+
+def _dadosAtuais(sim: Simulacao) -> dict:
+    return salvamento.desserializar(salvamento.serializar(sim))
+
+
+def _conferir(recuperado: dict, esperado: dict, entidades: bool) -> None:
+    assert recuperado["pontos"] == esperado["pontos"]
+    assert recuperado["powerups"] == esperado["powerups"]
+    assert recuperado["pacman"]["pontos"] == esperado["pacman"]["pontos"]
+    assert recuperado["pacman"]["vidas"] == esperado["pacman"]["vidas"]
+    if entidades:
+        for chave in ("ticks", "powerupAtivo", "powerupTimer", "pacman", "fantasmas"):
+            assert recuperado[chave] == esperado[chave], chave
+
+
+def test_recuperacao_reproduz_a_partida(pastaTemporaria):
+    conferidos = 0
+    for semente in range(6):
+        fase = os.path.join(FASES, f"fase{semente % 3 + 1}.txt")
+        sim = Simulacao.deArquivo(fase, semente=semente)
+        autosave = Autosave(str(pastaTemporaria / f"partida{semente}"), 60, 10)
+        autosave.iniciar(sim)
+        sorteio = random.Random(semente)
+        for _ in range(2400):
+            eventos = sim.step(sorteio.choice(DIRECOES))
+            autosave.registrar(sim, eventos)
+            if sim.estado != JOGANDO:
+                break
+            # Queda depois deste tick: o que foi escrito tem que bastar
+            if sim.ticks % 97 == 0 or any(e[0] in EVENTOS_ENTIDADES for e in eventos):
+                dados, _ = autosave.recuperar()
+                entidades = sim.ticks % 60 == 0 or any(
+                    e[0] in EVENTOS_ENTIDADES for e in eventos
+                )
+                _conferir(dados, _dadosAtuais(sim), entidades)
+                conferidos += 1
+        assert autosave.compactacoes > 1
+        autosave.descartar()
+        autosave.encerrar()
+        assert not autosave.existe()
+        sim.encerrar()
+    assert conferidos > 20
+
+
+def test_escrita_cortada_perde_so_o_ultimo_registro(pastaTemporaria):
+    sim = Simulacao.deArquivo(os.path.join(FASES, "fase1.txt"), semente=0)
+    autosave = Autosave(str(pastaTemporaria / "partida"), 60, 600)
+    autosave.iniciar(sim)
+    for tick in range(300):
+        autosave.registrar(sim, sim.step((1, 0) if tick % 40 < 20 else (0, 1)))
+    _, aplicados = autosave.recuperar()
+    assert aplicados > 1
+
+    tamanho = os.path.getsize(autosave.caminhoDiario)
+    with open(autosave.caminhoDiario, "r+b") as arq:
+        arq.truncate(tamanho - 5)
+    _, cortados = autosave.recuperar()
+    assert cortados == aplicados - 1
+    autosave.encerrar()
+    sim.encerrar()
+
+
+def test_diario_de_outra_foto_e_ignorado(pastaTemporaria):
+    sim = Simulacao.deArquivo(os.path.join(FASES, "fase1.txt"), semente=0)
+    autosave = Autosave(str(pastaTemporaria / "partida"), 60, 600)
+    autosave.iniciar(sim)
+    for _ in range(120):
+        autosave.registrar(sim, sim.step((1, 0)))
+    autosave.esperar()
+    with open(autosave.caminhoFoto, "wb") as arq:
+        arq.write(salvamento.serializar(sim))  # Foto nova sem o diário dela
+    dados, aplicados = autosave.recuperar()
+    assert aplicados == 0
+    assert dados["ticks"] == sim.ticks
+    autosave.encerrar()
+    sim.encerrar()
+
+
+def test_paredes_mudadas_desligam_o_autosave(pastaTemporaria):
+    sim = Simulacao.deArquivo(os.path.join(FASES, "fase1.txt"), semente=0)
+    autosave = Autosave(str(pastaTemporaria / "partida"), 60, 600)
+    autosave.iniciar(sim)
+    autosave.registrar(sim, sim.step((1, 0)))
+    x, y = next(
+        (x, y)
+        for y in range(sim.mapa.lin)
+        for x in range(sim.mapa.col)
+        if sim.mapa.conteudo(x, y) == "."
+    )
+    sim.mapa.atualizarConteudo(x, y, "#")
+
+    autosave.iniciar(sim)
+    assert not autosave.ativo
+    autosave.registrar(sim, sim.step((1, 0)))
+    autosave.esperar()
+    assert not autosave.existe()
+    autosave.encerrar()
+    sim.encerrar()
@@ -0,0 +1,23 @@
+import os
+
+from conftest import FASES
+from mapa import Mapa
+
+
+def test_escrita_pela_matriz_avisa_como_atualizarConteudo():
+    mapa = Mapa(os.path.join(FASES, "fase1.txt"))
+    avisos = []
+    mapa.adicionarObservador(lambda *aviso: avisos.append(aviso))
+    x, y = next(
+        (x, y)
+        for y in range(mapa.lin)
+        for x in range(mapa.col)
+        if mapa.conteudo(x, y) == "."
+    )
+
+    mapa.matriz[y][x] = "#"
+
+    assert mapa.conteudo(x, y) == "#"
+    assert not mapa.passavel(x, y)
+    assert mapa.versao == 1 and mapa.versaoParedes == 1
+    assert avisos == [(x, y, ".", "#")]
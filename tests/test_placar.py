@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from placar import NIVEIS, Placar
+
+
+@pytest.fixture
+def placar(pastaTemporaria):
+    placar = Placar(str(pastaTemporaria / "placar.db"))
+    yield placar
+    placar.encerrar()
+
+
+def _posicaoContada(partidas: list, pontos: int, mapa: str = None) -> int:
+    return 1 + sum(1 for p in partidas if p[1] > pontos and mapa in (None, p[2]))
+
+
+def test_posicao_confere_com_a_contagem(placar):
+    sorteio = random.Random(0)
+    mapas = ["fase1.txt", "fase2.txt", ""]  # "" é um nome de mapa como outro
+    partidas = [
+        (f"J{i}", sorteio.choice([sorteio.randrange(5000), 2**20 + i]), m, 0.0)
+        for i, m in enumerate(sorteio.choices(mapas, k=3000))
+    ]
+    placar.registrarVarias(partidas[:2000]).result()
+    for nome, pontos, mapa, _ in partidas[2000:]:
+        placar.registrar(nome, pontos, mapa)
+    placar.registrar("fim", 0, "fase1.txt").result()
+    partidas.append(("fim", 0, "fase1.txt", 0.0))
+
+    consultas = [0, 1, 4999, 5000, 2**20, 2**21, -1] + [
+        sorteio.randrange(6000) for _ in range(300)
+    ]
+    for pontos in consultas:
+        assert placar.posicao(pontos) == _posicaoContada(partidas, pontos)
+        for mapa in mapas:
+            assert placar.posicao(pontos, mapa) == _posicaoContada(
+                partidas, pontos, mapa
+            )
+    assert placar.total() == len(partidas)
+    assert placar.total("fase2.txt") == sum(1 for p in partidas if p[2] == "fase2.txt")
+    assert placar.posicao(2**NIVEIS - 1) == 1
+
+
+def test_topo_em_ordem_com_empates_por_chegada(placar):
+    placar.registrarVarias(
+        [("A", 100, "f1", 0.0), ("B", 300, "f2", 0.0), ("C", 100, "f1", 0.0)]
+    ).result()
+    assert placar.topo(10) == [("B", 300, "f2"), ("A", 100, "f1"), ("C", 100, "f1")]
+    assert placar.topo(1, 1, "f1") == [("C", 100, "f1")]
+    assert placar.mapas() == ["f1", "f2"]
+
+
+def test_importa_o_texto_antigo(placar, pastaTemporaria):
+    arquivo = pastaTemporaria / "scores.txt"
+    arquivo.write_text("Ana;300;fase1.txt\nBia;200\nCaio;100;\nlixo\n")
+    placar.importarTexto(str(arquivo)).result()
+    assert placar.total() == 3
+    assert placar.mapas() == ["Desconhecido", "fase1.txt"]
+    assert placar.posicao(150) == 3
+    assert placar.posicao(150, "Desconhecido") == 2
+    assert placar.importarTexto(str(arquivo)) is None  # Só com o placar vazio
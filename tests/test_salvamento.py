@@ -0,0 +1,98 @@
+import os
+import random
+
+import pytest
+
+import salvamento
+from conftest import FASES
+from salvamento import ErroSave
+from simulacao import JOGANDO, Simulacao
+
+DIRECOES = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+
+def _entradas(semente: int, total: int) -> list:
+    sorteio = random.Random(semente)
+    return [sorteio.choice(DIRECOES) if n % 12 == 0 else None for n in range(total)]
+
+
+def _estado(sim: Simulacao) -> tuple:
+    return (
+        sim.ticks,
+        sim.estado,
+        sim.pacman.pontos,
+        sim.pacman.vidas,
+        (sim.pacman.rect.x, sim.pacman.rect.y),
+        sim.pacman.invencivel,
+        sim.powerupAtivo,
+        sim.powerupTimer,
+        sorted(sim.mapa.itens),
+        [
+            (f.rect.x, f.rect.y, f.direcao, f.tempoPreso, f.assustado, f.plano)
+            for f in sim.fantasmas
+        ],
+    )
+
+
+def _jogar(fase: str, ticks: int, entradas: list) -> Simulacao:
+    sim = Simulacao.deArquivo(os.path.join(FASES, fase), semente=7)
+    for n in range(ticks):
+        sim.step(entradas[n])
+        if sim.estado != JOGANDO:
+            break
+    return sim
+
+
+@pytest.mark.parametrize("fase", ["fase1.txt", "fase3.txt"])
+@pytest.mark.parametrize("corte", [50, 400])
+def test_partida_carregada_segue_igual_a_original(fase, corte):
+    entradas = _entradas(2, corte + 600)
+    original = _jogar(fase, corte, entradas)
+    dados = salvamento.desserializar(salvamento.serializar(original))
+    carregada = salvamento.montarSimulacao(dados, FASES)
+    assert _estado(carregada) == _estado(original)
+
+    for n in range(corte, corte + 600):
+        original.step(entradas[n])
+        carregada.step(entradas[n])
+        assert _estado(carregada) == _estado(original)
+        if original.estado != JOGANDO:
+            break
+    original.encerrar()
+    carregada.encerrar()
+
+
+def test_serializar_de_novo_da_os_mesmos_dados():
+    sim = _jogar("fase2.txt", 300, _entradas(5, 300))
+    dados = salvamento.desserializar(salvamento.serializar(sim))
+    carregada = salvamento.montarSimulacao(dados, FASES)
+    assert salvamento.desserializar(salvamento.serializar(carregada)) == dados
+    sim.encerrar()
+    carregada.encerrar()
+
+
+def test_save_corrompido_ou_estranho_e_recusado():
+    sim = _jogar("fase1.txt", 100, _entradas(1, 100))
+    dados = bytearray(salvamento.serializar(sim))
+    dados[len(dados) // 2] ^= 1
+    with pytest.raises(ErroSave):
+        salvamento.desserializar(bytes(dados))
+    with pytest.raises(ErroSave):
+        salvamento.desserializar(b"junk" * 10)
+    with pytest.raises(ErroSave):
+        salvamento.desserializar(bytes(dados[:20]))
+    sim.encerrar()
+
+
+def test_paredes_mudadas_nao_sao_salvas():
+    sim = _jogar("fase1.txt", 10, _entradas(1, 10))
+    x, y = next(
+        (x, y)
+        for y in range(sim.mapa.lin)
+        for x in range(sim.mapa.col)
+        if sim.mapa.conteudo(x, y) == "."
+    )
+    sim.mapa.atualizarConteudo(x, y, "#")
+    with pytest.raises(ErroSave):
+        salvamento.serializar(sim)
+    sim.encerrar()
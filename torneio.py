@@ -0,0 +1,169 @@
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import multiprocessing
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from caminhos import DIRECOES
+from simulacao import JOGANDO, Simulacao
+
+MAX_TICKS = 5 * 60 * 60  # 5 minutos de jogo a 60 ticks por segundo
+INTERVALO_ALEATORIA = 20  # Ticks entre trocas de direção da política aleatória
+
+CAMPOS = [
+    "fase",
+    "semente",
+    "politica",
+    "resultado",
+    "pontos",
+    "ticks",
+    "mortes",
+    "comidos",
+]
+
+
+# --- POLÍTICAS DO JOGADOR ---
+# Cada política recebe a simulação e um gerador de números aleatórios e
+# retorna a direção pedida neste tick (ou None para manter a anterior)
+
+
+# Troca para uma direção qualquer de tempos em tempos
+def politicaAleatoria(sim: Simulacao, rng: random.Random):
+    if sim.ticks % INTERVALO_ALEATORIA == 0:
+        return rng.choice(DIRECOES)
+    return None
+
+
+# Vai sempre para o ponto (ou powerup) mais próximo, ignorando os fantasmas.
+# Empates entre pontos à mesma distância são decididos pela semente
+def politicaGulosa(sim: Simulacao, rng: random.Random):
+    pacman = sim.pacman
+    if not pacman.esta_centralizado():
+        return None
+
+    mapa = sim.mapa
+    ordem = rng.sample(DIRECOES, len(DIRECOES))
+    inicio = pacman.getPosGrad()
+    primeiro = {inicio: None}  # Célula -> direção do primeiro passo
+    fila = deque([inicio])
+    while fila:
+        x, y = fila.popleft()
+        if mapa.indice(x, y) in mapa.itens and (x, y) != inicio:
+            return primeiro[(x, y)]
+        for direcao in ordem:
+            nx, ny = x + direcao[0], y + direcao[1]
+            if (nx, ny) not in primeiro and pacman.podeMover(mapa, nx, ny):
+                primeiro[(nx, ny)] = primeiro[(x, y)] or direcao
+                fila.append((nx, ny))
+    return politicaAleatoria(sim, rng)
+
+
+# Não se mexe (mede quanto tempo os fantasmas levam para pegar o Pacman)
+def politicaParada(sim: Simulacao, rng: random.Random):
+    return None
+
+
+POLITICAS = {
+    "aleatoria": politicaAleatoria,
+    "gulosa": politicaGulosa,
+    "parada": politicaParada,
+}
+
+
+# Joga uma partida inteira sem tela. Roda nos processos trabalhadores
+def jogarPartida(arquivo: str, semente: int, politica: str, maxTicks: int) -> dict:
+    # As mensagens de carregamento do mapa só poluiriam a saída do torneio
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim = Simulacao.deArquivo(arquivo, semente=semente)
+    escolher = POLITICAS[politica]
+    rng = random.Random(semente)
+
+    mortes = 0
+    comidos = 0
+    try:
+        while sim.estado == JOGANDO and sim.ticks < maxTicks:
+            for evento in sim.step(escolher(sim, rng)):
+                if evento[0] == "morte":
+                    mortes += 1
+                elif evento[0] in ("ponto", "powerup"):
+                    comidos += 1
+    finally:
+        sim.encerrar()
+
+    return {
+        "fase": os.path.basename(arquivo),
+        "semente": semente,
+        "politica": politica,
+        "resultado": sim.estado,
+        "pontos": sim.pacman.pontos,
+        "ticks": sim.ticks,
+        "mortes": mortes,
+        "comidos": comidos,
+    }
+
+
+def lerArgumentos():
+    parser = argparse.ArgumentParser(
+        description="Roda várias partidas sem tela em paralelo e grava os resultados."
+    )
+    parser.add_argument(
+        "fases", nargs="*", help="Arquivos de fase (padrão: todos em fases/)"
+    )
+    parser.add_argument(
+        "-s", "--sementes", type=int, default=10, help="Partidas por fase"
+    )
+    parser.add_argument("-p", "--politica", choices=sorted(POLITICAS), default="gulosa")
+    parser.add_argument(
+        "-j", "--processos", type=int, default=os.cpu_count(), help="Processos"
+    )
+    parser.add_argument("-t", "--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("-o", "--saida", default="torneio.csv")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = lerArgumentos()
+    fases = args.fases or sorted(glob.glob(os.path.join("fases", "*.txt")))
+    tarefas = [(fase, semente) for fase in fases for semente in range(args.sementes)]
+    print(f"Torneio: {len(tarefas)} partidas em {args.processos} processos")
+
+    inicio = time.perf_counter()
+    resultados = []
+    with ProcessPoolExecutor(
+        max_workers=args.processos,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        futuros = [
+            pool.submit(jogarPartida, fase, semente, args.politica, args.max_ticks)
+            for fase, semente in tarefas
+        ]
+        for futuro in as_completed(futuros):
+            resultados.append(futuro.result())
+    duracao = time.perf_counter() - inicio
+
+    resultados.sort(key=lambda r: (r["fase"], r["semente"]))
+    with open(args.saida, "w", newline="") as arq:
+        escritor = csv.DictWriter(arq, fieldnames=CAMPOS, delimiter=";")
+        escritor.writeheader()
+        escritor.writerows(resultados)
+
+    # Resumo por fase
+    for fase in sorted({r["fase"] for r in resultados}):
+        daFase = [r for r in resultados if r["fase"] == fase]
+        vitorias = sum(1 for r in daFase if r["resultado"] == "vitoria")
+        media = sum(r["pontos"] for r in daFase) / len(daFase)
+        print(f"{fase}: {vitorias}/{len(daFase)} vitórias, média de {media:.0f} pontos")
+
+    ticks = sum(r["ticks"] for r in resultados)
+    print(f"{ticks} ticks em {duracao:.1f} s ({ticks / duracao:,.0f} ticks/s)")
+    print(f"Resultados salvos em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()